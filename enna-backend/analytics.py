@@ -0,0 +1,339 @@
+"""Optional in-memory analytics over the transactions table
+
+TransactionColumns mirrors the live transactions as NumPy columns, one array
+per field, ordered by day:
+
+  * id       - int64, to find rows again on update and delete
+  * day      - int32 days since 1970-01-01
+  * cents    - int64 amount
+  * category - int16 category id, 0 for uncategorized (as in the rollup)
+  * type     - int8, 1 for income and 0 for expense
+
+EnnaDatabase(analytics=True) loads it once when it opens and then hands it
+every row its write methods insert, update or delete, after the commit.
+Because the columns are in day order a date range is a slice found by
+binary search; range sums read running totals, and per-category group-bys
+and bucketed series are one bincount over the slice. Results match the SQL
+over the daily_category_totals rollup exactly.
+
+Rows the columns cannot hold - a date that is not YYYY-MM-DD, an amount
+that is not whole cents, a category id out of int16 range - are only
+tracked by id; while any are live the database keeps answering from SQL.
+NumPy is optional: without it AVAILABLE is False and analytics=True falls
+back to SQL with a warning.
+"""
+import datetime as dt
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AVAILABLE = np is not None
+
+# (name, dtype) of every column
+COLUMNS = (('id', 'int64'), ('day', 'int32'), ('cents', 'int64'), ('category', 'int16'), ('type', 'int8'))
+TYPES = {'expense': 0, 'income': 1}
+TYPE_NAMES = {code: name for name, code in TYPES.items()}
+MAX_CATEGORY = 2 ** 15 - 1
+# Grouped sums go through float64 bincounts, which are exact below this many cents
+EXACT_CENTS = 2 ** 53
+
+LOAD_CHUNK = 50000
+MIN_CAPACITY = 1024
+
+EPOCH = dt.date(1970, 1, 1)
+
+# transactions as the columns hold them; day, cents, category and type are
+# NULL when the row cannot be represented
+ROWS_SQL = f'''
+    SELECT id,
+           CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' AND date(date) = date
+                THEN CAST(julianday(date) - 2440587.5 AS INTEGER) END AS day,
+           CASE WHEN typeof(amount) = 'integer' THEN amount END AS cents,
+           CASE WHEN IFNULL(category_id, 0) BETWEEN 0 AND {MAX_CATEGORY} THEN IFNULL(category_id, 0) END AS category,
+           CASE type WHEN 'income' THEN 1 WHEN 'expense' THEN 0 END AS type
+    FROM transactions
+'''
+
+
+def to_day(date):
+    """YYYY-MM-DD -> days since 1970-01-01, or None if it is not a valid date in that form"""
+    if not isinstance(date, str) or len(date) != 10:
+        return None
+    try:
+        return (dt.date.fromisoformat(date) - EPOCH).days
+    except ValueError:
+        return None
+
+
+def _empty():
+    return {name: np.empty(0, dtype) for name, dtype in COLUMNS}
+
+
+def _split(rows):
+    """Column arrays for the representable rows, in day order, and the ids of the rest"""
+    if not rows:
+        return _empty(), set()
+    ids, days, cents, categories, types = zip(*rows)
+    odd = set()
+    if None in days or None in cents or None in categories or None in types:
+        odd = {row[0] for row in rows if None in row}
+        rows = [row for row in rows if None not in row]
+        if not rows:
+            return _empty(), odd
+        ids, days, cents, categories, types = zip(*rows)
+    columns = {}
+    for (name, dtype), values in zip(COLUMNS, (ids, days, cents, categories, types)):
+        columns[name] = np.array(values, dtype=dtype)
+    return _sorted(columns), odd
+
+
+def _sorted(columns):
+    order = np.argsort(columns['day'], kind='stable')
+    return {name: column[order] for name, column in columns.items()}
+
+
+class TransactionColumns:
+    """The transactions table as NumPy columns, kept in step by EnnaDatabase"""
+
+    def __init__(self):
+        # Serializes mutations; readers take the published (size, columns)
+        # pair without locking, since rows below its size never change in place
+        self._lock = threading.Lock()
+        self._state = (0, _empty())
+        self._irregular = set()
+        self._max_id = 0
+        # Upper bound on the sum of absolute amounts, to keep float sums exact
+        self._magnitude = 0
+        # (state, running income and expense totals), built on first use
+        self._running = None
+        self.load_ms = None
+        self.writes = 0
+
+    # ============= LOADING AND WRITES =============
+
+    def load(self, conn):
+        """Read every transaction from a connection, replacing what is held"""
+        started = time.perf_counter()
+        cursor = conn.execute(ROWS_SQL)
+        parts = []
+        irregular = set()
+        while True:
+            rows = cursor.fetchmany(LOAD_CHUNK)
+            if not rows:
+                break
+            columns, odd = _split(rows)
+            parts.append(columns)
+            irregular |= odd
+
+        columns = _sorted({name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype)
+                           for name, dtype in COLUMNS})
+        with self._lock:
+            self._state = (len(columns['id']), columns)
+            self._irregular = irregular
+            self._max_id = max(int(columns['id'].max()) if len(columns['id']) else 0, max(irregular, default=0))
+            self._magnitude = int(np.abs(columns['cents']).sum(dtype=np.float64))
+        self.load_ms = (time.perf_counter() - started) * 1000
+        return len(columns['id'])
+
+    def apply(self, rows):
+        """Insert or replace rows selected with ROWS_SQL"""
+        rows = list(rows)
+        if not rows:
+            return
+        new, odd = _split(rows)
+        changed = [row[0] for row in rows]
+
+        with self._lock:
+            size, columns = self._state
+            # Ids past every id seen are inserts, with nothing to replace
+            inserts = min(changed) > self._max_id
+            if inserts and (not size or not len(new['day']) or new['day'][0] >= columns['day'][size - 1]):
+                self._state = self._append(size, columns, new)
+            else:
+                current = {name: columns[name][:size] for name, _ in COLUMNS}
+                if not inserts:
+                    current = self._without(current, changed)
+                    self._irregular.difference_update(changed)
+                positions = np.searchsorted(current['day'], new['day'], side='right')
+                merged = {name: np.insert(current[name], positions, new[name]) for name, _ in COLUMNS}
+                self._state = (len(merged['id']), merged)
+            self._irregular |= odd
+            self._max_id = max(self._max_id, max(changed))
+            self._magnitude += int(np.abs(new['cents']).sum(dtype=np.float64))
+            self.writes += 1
+
+    def delete(self, ids):
+        """Drop rows by id"""
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            size, columns = self._state
+            current = self._without({name: columns[name][:size] for name, _ in COLUMNS}, ids)
+            self._state = (len(current['id']), current)
+            self._irregular.difference_update(ids)
+            self.writes += 1
+
+    def clear(self):
+        with self._lock:
+            self._state = (0, _empty())
+            self._irregular = set()
+            self._magnitude = 0
+            self.writes += 1
+
+    def _append(self, size, columns, new):
+        """Write rows past the published size, growing into new arrays when full"""
+        count = len(new['id'])
+        capacity = len(columns['id'])
+        if size + count > capacity:
+            capacity = max(size + count, capacity + capacity // 2, MIN_CAPACITY)
+            grown = {}
+            for name, dtype in COLUMNS:
+                grown[name] = np.empty(capacity, dtype)
+                grown[name][:size] = columns[name][:size]
+            columns = grown
+        for name, _ in COLUMNS:
+            columns[name][size:size + count] = new[name]
+        return size + count, columns
+
+    def _without(self, columns, ids):
+        """Copies of the columns without the given ids"""
+        keep = ~np.isin(columns['id'], np.array(ids, dtype=np.int64))
+        return {name: column[keep] for name, column in columns.items()}
+
+    # ============= QUERIES =============
+
+    def covers(self, *dates):
+        """Whether queries over these date bounds (None or empty for open) match SQL exactly"""
+        return (not self._irregular and self._magnitude < EXACT_CENTS
+                and all(not date or to_day(date) is not None for date in dates))
+
+    def _view(self, start_date=None, end_date=None):
+        """The columns for a date range, as slices"""
+        size, columns = self._state
+        days = columns['day'][:size]
+        # Searching with an int32 keeps NumPy from converting the whole column
+        low = int(np.searchsorted(days, np.int32(to_day(start_date)))) if start_date else 0
+        high = int(np.searchsorted(days, np.int32(to_day(end_date)), side='right')) if end_date else size
+        return {name: columns[name][low:max(low, high)] for name, _ in COLUMNS}
+
+    def grouped(self, start_date=None, end_date=None, bucket=None, by_category=True,
+                category_id=None, type=None):
+        """Totals grouped like a GROUP BY over the rollup
+
+        Returns one dict per non-empty group: {'period', 'type', 'category_id',
+        'total', 'count'} with the total in cents. `period` is the first day
+        of the day, week (Monday) or month bucket - counted from start_date,
+        which a bucket needs - or None without one; category_id is 0 for
+        uncategorized, or when not grouping by category.
+        """
+        view = self._view(start_date, end_date)
+        conditions = []
+        if category_id is not None:
+            conditions.append(view['category'] == category_id)
+        if type is not None:
+            conditions.append(view['type'] == TYPES[type])
+        if conditions:
+            mask = np.logical_and.reduce(conditions)
+            view = {name: column[mask] for name, column in view.items()}
+        if not len(view['id']):
+            return []
+
+        # Group key: type, then category, then bucket
+        key = view['type'].astype(np.intp)
+        width = 2
+        categories = first = None
+        if by_category and bucket:
+            # Category ids compressed to 0..k-1, so the key space stays small
+            categories = np.flatnonzero(np.bincount(view['category']))
+            codes = np.zeros(int(categories[-1]) + 1, np.intp)
+            codes[categories] = np.arange(len(categories))
+            key += codes[view['category']] * width
+            width *= len(categories)
+        elif by_category:
+            # At most 2 * 2**15 groups, so the ids serve as they are
+            key += view['category'].astype(np.intp) * width
+            categories = np.arange(int(view['category'].max()) + 1)
+        if bucket:
+            first, buckets = self._buckets(view['day'], start_date, bucket)
+            key += buckets * width
+
+        totals = np.bincount(key, weights=view['cents'])
+        counts = np.bincount(key)
+        groups = np.flatnonzero(counts)
+        index, kinds = np.divmod(groups, 2)
+        category_ids = np.zeros(len(groups), np.intp)
+        if by_category:
+            index, codes = np.divmod(index, len(categories))
+            category_ids = categories[codes]
+        periods = self._periods(first, index, bucket) if bucket else [None] * len(groups)
+        return [{
+            'period': period,
+            'type': TYPE_NAMES[kind],
+            'category_id': category,
+            'total': int(total),
+            'count': count
+        } for period, kind, category, total, count in zip(
+            periods, kinds.tolist(), category_ids.tolist(), totals[groups].tolist(), counts[groups].tolist())]
+
+    def _buckets(self, days, start_date, bucket):
+        """(first bucket, bucket index of every day) counted from start_date's bucket"""
+        start = to_day(start_date)
+        if bucket == 'day':
+            return start, (days - start).astype(np.intp)
+        if bucket == 'week':
+            # 1970-01-01 was a Thursday, weekday 3
+            first = start - (start + 3) % 7
+            return first, (days - first).astype(np.intp) // 7
+        # Month of every day from the start to the last one, looked up per row
+        first = int(np.datetime64(start, 'D').astype('datetime64[M]').astype(np.intp))
+        span = np.arange(start, int(days[-1]) + 1).astype('datetime64[D]')
+        months = span.astype('datetime64[M]').astype(np.intp) - first
+        return first, months[days - start]
+
+    def _periods(self, first, index, bucket):
+        """First day of each bucket index, as ISO strings"""
+        if bucket == 'month':
+            starts = (first + index).astype('datetime64[M]').astype('datetime64[D]')
+        else:
+            starts = (first + index * (7 if bucket == 'week' else 1)).astype('datetime64[D]')
+        return np.datetime_as_string(starts).tolist()
+
+    def range_totals(self, periods):
+        """(income, expenses, count) in cents for each (start_date, end_date); either may be None
+
+        Running totals over the day-ordered columns make each period two
+        binary searches and two subtractions, in exact integers.
+        """
+        state = self._state
+        size, columns = state
+        running = self._running
+        if running is None or running[0] is not state:
+            cents, income = columns['cents'][:size], columns['type'][:size] == TYPES['income']
+            running = (state, [np.concatenate(([0], np.cumsum(np.where(is_type, cents, 0))))
+                               for is_type in (income, ~income)])
+            self._running = running
+
+        days = columns['day'][:size]
+        first, last = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+        lows = np.searchsorted(days, np.array([to_day(s) if s else first for s, _ in periods], np.int32))
+        highs = np.searchsorted(days, np.array([to_day(e) if e else last for _, e in periods], np.int32),
+                                side='right')
+        highs = np.maximum(highs, lows)
+        income, expenses = ((sums[highs] - sums[lows]).tolist() for sums in running[1])
+        return list(zip(income, expenses, (highs - lows).tolist()))
+
+    def get_stats(self):
+        size, columns = self._state
+        return {
+            'rows': size,
+            'irregular_rows': len(self._irregular),
+            'bytes': sum(column.nbytes for column in columns.values()),
+            'load_ms': round(self.load_ms, 1) if self.load_ms is not None else None,
+            'writes': self.writes,
+            'exact': self.covers()
+        }
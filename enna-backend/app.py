@@ -1,13 +1,100 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from database import EnnaDatabase
-from datetime import datetime
+from database import MAX_PAGE, ArchiveConflict, EnnaDatabase, parse_date
+from categorizer import Categorizer
+from connection_pool import DEFAULT_READERS
+from export import FORMATS, export_archives, export_transactions
+from ingestion import import_csv
+import metrics
+from profiling import RequestProfiler, SlowQueryLog
+import scoring
+from datetime import date, datetime, timedelta
+import hashlib
+import os
+import time
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize database
-db = EnnaDatabase('enna.db')
+# Opt-in diagnostics, both off by default (see profiling.py)
+profiler = RequestProfiler(
+    os.environ.get('ENNA_PROFILE_DIR', 'profiles'),
+    os.environ.get('ENNA_PROFILE', 'off')
+)
+slow_query_log = SlowQueryLog(
+    float(os.environ['ENNA_SLOW_QUERY_MS']),
+    os.environ.get('ENNA_SLOW_QUERY_LOG', 'slow_queries.log')
+) if os.environ.get('ENNA_SLOW_QUERY_MS') else None
+
+# Initialize database (the enna.py launcher sets these to configure serving)
+db = EnnaDatabase(
+    os.environ.get('ENNA_DB_PATH', 'enna.db'),
+    readers=int(os.environ.get('ENNA_DB_READERS', DEFAULT_READERS)),
+    slow_query_log=slow_query_log,
+    # Aggregates from NumPy columns instead of SQL (see analytics.py)
+    analytics=os.environ.get('ENNA_ANALYTICS', 'sql') == 'numpy'
+)
+# Category suggestions learned from the categorized history (see categorizer.py)
+categorizer = Categorizer(db)
+
+@app.before_request
+def start_request_metrics():
+    """Start the request clock, the per-request SQL counters and the profiler if asked"""
+    request.environ['enna.started'] = time.perf_counter()
+    db.metrics.start_request()
+    if profiler.enabled and profiler.wants(request.headers):
+        profile = profiler.start()
+        if profile is not None:
+            request.environ['enna.profile'] = profile
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, status and SQL totals under the route pattern, not the raw path"""
+    started = request.environ.get('enna.started')
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - started
+        db.metrics.finish_request(request.method, endpoint, response.status_code, elapsed)
+        profile = request.environ.pop('enna.profile', None)
+        if profile is not None:
+            response.headers['X-Enna-Profile-File'] = profiler.finish(
+                profile, request.method, endpoint, elapsed)
+    return response
+
+@app.teardown_request
+def release_profiler(error=None):
+    """Stop a profile that after_request never reached, so the next request can be profiled"""
+    profile = request.environ.pop('enna.profile', None)
+    if profile is not None:
+        profiler.stop(profile)
+
+def page_limit_arg(default):
+    """The `limit` query argument, ValueError unless it is between 1 and MAX_PAGE"""
+    limit = int(request.args.get('limit', default))
+    if not 1 <= limit <= MAX_PAGE:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE}')
+    return limit
+
+def versioned_json(build_payload, depends_on=None):
+    """JSON response tagged with the data version, or 304 if the client has it
+
+    The version is read before building the payload, so data written while
+    the response is built can only make the ETag older, never newer.
+    `depends_on` is anything else the payload depends on that the URL does
+    not pin, such as a window resolved from today's date; it is folded into
+    the ETag so the response changes when it does.
+    """
+    etag = db.cache.etag()
+    if depends_on is not None:
+        etag += '-' + hashlib.blake2b(repr(depends_on).encode(), digest_size=8).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate with If-None-Match every time
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/')
 def home():
@@ -27,16 +114,64 @@ def hello():
 
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
-    """Get all transactions"""
+    """Get transactions, newest first, one page at a time"""
     try:
         type_filter = request.args.get('type')  # 'income' or 'expense'
-        limit = int(request.args.get('limit', 100))
-        
-        transactions = db.get_transactions(limit=limit, type=type_filter)
+
+        try:
+            limit = page_limit_arg(100)
+            category_id = request.args.get('category_id', type=int)
+            min_amount = request.args.get('min_amount', type=float)
+            max_amount = request.args.get('max_amount', type=float)
+
+            page = db.get_transactions_page(
+                limit=limit,
+                type=type_filter,
+                start_date=request.args.get('start_date'),
+                end_date=request.args.get('end_date'),
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                search=request.args.get('search'),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
         return jsonify({
             'status': 'success',
-            'transactions': transactions,
-            'count': len(transactions)
+            'transactions': page['transactions'],
+            'count': len(page['transactions']),
+            'next_cursor': page['next_cursor']
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/transactions/search', methods=['GET'])
+def search_transactions():
+    """Full-text search over transaction descriptions, one page at a time"""
+    try:
+        try:
+            page = db.search_transactions(
+                request.args.get('q', ''),
+                limit=page_limit_arg(50),
+                scope=request.args.get('scope', 'transactions'),
+                type=request.args.get('type'),
+                category_id=request.args.get('category_id', type=int),
+                start_date=request.args.get('start_date'),
+                end_date=request.args.get('end_date'),
+                sort=request.args.get('sort', 'relevance'),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        return jsonify({
+            'status': 'success',
+            'transactions': page['transactions'],
+            'count': len(page['transactions']),
+            'next_cursor': page['next_cursor'],
+            'sort': page['sort']
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -70,6 +205,59 @@ def add_transaction():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/transactions/bulk', methods=['POST'])
+def add_transactions_bulk():
+    """Add many transactions in one request and one database transaction"""
+    try:
+        data = request.json
+
+        if not data or not isinstance(data.get('transactions'), list):
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required field: transactions (list)'
+            }), 400
+
+        results = db.add_transactions_bulk(data['transactions'])
+        inserted = sum(1 for r in results if r['status'] == 'success')
+        duplicates = sum(1 for r in results if r['status'] == 'duplicate')
+
+        return jsonify({
+            'status': 'success',
+            'message': f'Imported {inserted} of {len(results)} transactions, skipped {duplicates} duplicates',
+            'inserted': inserted,
+            'duplicates': duplicates,
+            'failed': len(results) - inserted - duplicates,
+            'results': results
+        }), 201
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/transactions/import', methods=['POST'])
+def import_transactions_csv():
+    """Stream an uploaded bank CSV export straight into the transactions table"""
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required file upload: file'
+            }), 400
+
+        try:
+            stats = import_csv(db, upload.stream, bank=request.form.get('bank') or None,
+                               categorize=categorizer.matcher())
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        return jsonify({
+            'status': 'success',
+            'message': f"Imported {stats['rows_inserted']} transactions, "
+                       f"skipped {stats['rows_duplicate']} duplicates",
+            **stats
+        }), 201
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
     """Delete a transaction"""
@@ -128,10 +316,9 @@ def update_transaction(transaction_id):
 def get_categories():
     """Get all categories"""
     try:
-        categories = db.get_categories()
-        return jsonify({
+        return versioned_json(lambda: {
             'status': 'success',
-            'categories': categories
+            'categories': db.get_categories()
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -162,16 +349,49 @@ def add_category():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# Keeps one categorize request to a bounded amount of work
+MAX_CATEGORIZE_DESCRIPTIONS = 10000
+
+@app.route('/api/categorize/batch', methods=['POST'])
+def categorize_batch():
+    """Suggest a category for each description, learned from categorized transactions
+
+    Body: {"descriptions": ["Starbucks #734", ...]}
+    Results come back in the same order.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        descriptions = data.get('descriptions')
+
+        if not isinstance(descriptions, list) or not all(isinstance(d, str) for d in descriptions):
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required field: descriptions (list of strings)'
+            }), 400
+        if len(descriptions) > MAX_CATEGORIZE_DESCRIPTIONS:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {MAX_CATEGORIZE_DESCRIPTIONS} descriptions per request'
+            }), 400
+
+        results = categorizer.categorize_many(descriptions)
+        return jsonify({
+            'status': 'success',
+            'results': results,
+            'count': len(results)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 # ============= BUDGET ENDPOINTS =============
 
 @app.route('/api/budgets', methods=['GET'])
 def get_budgets():
     """Get all budget allocations"""
     try:
-        budgets = db.get_budget_allocations()
-        return jsonify({
+        return versioned_json(lambda: {
             'status': 'success',
-            'budgets': budgets
+            'budgets': db.get_budget_allocations()
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -203,29 +423,57 @@ def save_budget():
 
 @app.route('/api/budgets/bulk', methods=['POST'])
 def save_budgets_bulk():
-    """Save multiple budget allocations at once"""
+    """Save multiple budget allocations at once, in one transaction"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         
-        if 'budgets' not in data:
+        if not isinstance(data.get('budgets'), list):
             return jsonify({
                 'status': 'error',
-                'message': 'Missing required field: budgets'
+                'message': 'Missing required field: budgets (list)'
             }), 400
         
-        for budget in data['budgets']:
-            db.save_budget_allocation(
-                category_id=int(budget['category_id']),
-                percentage=float(budget['percentage'])
-            )
+        try:
+            allocations = [(int(b['category_id']), float(b['percentage'])) for b in data['budgets']]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({
+                'status': 'error',
+                'message': 'Each budget needs a numeric category_id and percentage'
+            }), 400
+        
+        saved = db.save_budget_allocations(allocations)
         
         return jsonify({
             'status': 'success',
-            'message': f'Saved {len(data["budgets"])} budget allocations'
+            'message': f'Saved {saved} budget allocations',
+            'saved': saved
         }), 201
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/budgets/status', methods=['GET'])
+def get_budget_status():
+    """Budget vs actual spending per category for a period (all time by default)"""
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        for value in (start_date, end_date):
+            if value:
+                try:
+                    date.fromisoformat(value)
+                except ValueError:
+                    return jsonify({
+                        'status': 'error',
+                        'message': f"Invalid date '{value}', expected YYYY-MM-DD"
+                    }), 400
+
+        return versioned_json(lambda: {
+            'status': 'success',
+            'data': db.get_budget_status(start_date, end_date)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/categories/<int:category_id>/spending', methods=['GET'])
 def get_category_spending(category_id):
     """Get spending history for a category"""
@@ -248,10 +496,9 @@ def get_summary():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        summary = db.get_summary(start_date, end_date)
-        return jsonify({
+        return versioned_json(lambda: {
             'status': 'success',
-            'summary': summary
+            'summary': db.get_summary(start_date, end_date)
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -260,12 +507,100 @@ def get_summary():
 def get_budget():
     """Get budget overview (legacy endpoint - now uses summary)"""
     try:
-        summary = db.get_summary()
-        return jsonify({
-            'total_income': summary['total_income'],
-            'total_expenses': summary['total_expenses'],
-            'remaining': summary['net']
-        })
+        def build():
+            summary = db.get_summary()
+            return {
+                'total_income': summary['total_income'],
+                'total_expenses': summary['total_expenses'],
+                'remaining': summary['net']
+            }
+        return versioned_json(build)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# ============= SCORE ENDPOINTS =============
+
+# Upper bound on periods scored by one request (each one is a bound parameter triple)
+MAX_SCORE_PERIODS = 500
+
+def parse_periods(value):
+    """Parse 'YYYY-MM-DD:YYYY-MM-DD,...' into (start, end) tuples, raising ValueError"""
+    return [parse_period(item) for item in value.split(',')]
+
+def parse_period(period):
+    """(start, end) from 'YYYY-MM-DD:YYYY-MM-DD' or a [start, end] pair, raising ValueError"""
+    try:
+        start, end = period.split(':') if isinstance(period, str) else period
+        parse_date(start)
+        parse_date(end)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid period '{period}', expected YYYY-MM-DD:YYYY-MM-DD")
+    return (start, end)
+
+def check_period_count(periods):
+    if len(periods) > MAX_SCORE_PERIODS:
+        raise ValueError(f'At most {MAX_SCORE_PERIODS} periods can be scored at once')
+
+@app.route('/api/scores', methods=['GET'])
+def get_scores():
+    """Financial health scores for many periods in one call
+
+    Query params (first match wins):
+        periods=2024-01-01:2024-01-31,...  explicit date ranges
+        scope=archives                      every archive, from its archived transactions
+        months=6                            the last N calendar months (default)
+    """
+    try:
+        try:
+            if request.args.get('periods'):
+                periods = parse_periods(request.args['periods'])
+            elif request.args.get('scope') == 'archives':
+                periods = None
+            else:
+                periods = scoring.rolling_months(int(request.args.get('months', 6)))
+            if periods is not None:
+                check_period_count(periods)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        # The default window moves with today's date, not just with the data
+        return versioned_json(lambda: {
+            'status': 'success',
+            'scores': scoring.score_archives(db) if periods is None else scoring.score_periods(db, periods)
+        }, depends_on=periods)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# ============= REPORT ENDPOINTS =============
+
+# Default look-back per bucket when no start_date is given
+TIMESERIES_DEFAULT_DAYS = {'day': 30, 'week': 7 * 12, 'month': 365}
+
+@app.route('/api/reports/timeseries', methods=['GET'])
+def get_timeseries():
+    """Bucketed income/expense series, zero-filled, with an optional per-category pivot
+
+    Query params: bucket=day|week|month, start_date, end_date (default today),
+    by_category=true, type=expense|income (the pivoted totals)
+    """
+    try:
+        bucket = request.args.get('bucket', 'day')
+        end_date = request.args.get('end_date') or date.today().isoformat()
+        start_date = request.args.get('start_date')
+        by_category = request.args.get('by_category', '').lower() in ('1', 'true', 'yes')
+        type = request.args.get('type', 'expense')
+
+        try:
+            if not start_date:
+                days = TIMESERIES_DEFAULT_DAYS.get(bucket, 30)
+                start_date = (date.fromisoformat(end_date) - timedelta(days=days - 1)).isoformat()
+            # end_date defaults to today, so the window is part of the ETag
+            return versioned_json(lambda: {
+                'status': 'success',
+                **db.get_timeseries(start_date, end_date, bucket, by_category, type)
+            }, depends_on=(start_date, end_date))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -279,7 +614,10 @@ def get_streaks():
         login_date = request.args.get('login_date')  # Date to record login
         current_date = request.args.get('current_date')  # Date to calculate from
         
-        streak_data = db.get_streak_data(login_date, current_date)
+        try:
+            streak_data = db.get_streak_data(login_date, current_date)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         return jsonify({
             'status': 'success',
             'streaks': streak_data
@@ -299,17 +637,126 @@ def get_login_days():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# ============= BATCH ENDPOINTS =============
+
+def batch_timeseries(params):
+    bucket = params.get('bucket', 'day')
+    end_date = params.get('end_date') or date.today().isoformat()
+    start_date = params.get('start_date') or (
+        date.fromisoformat(end_date) - timedelta(days=TIMESERIES_DEFAULT_DAYS.get(bucket, 30) - 1)
+    ).isoformat()
+    return db.get_timeseries(start_date, end_date, bucket, bool(params.get('by_category')),
+                             params.get('type', 'expense'))
+
+def batch_scores(params):
+    if params.get('periods'):
+        periods = params['periods']
+        if not isinstance(periods, list):
+            raise ValueError('periods must be a list of [start, end] pairs')
+        check_period_count(periods)
+        return scoring.score_periods(db, [parse_period(period) for period in periods])
+    if params.get('scope') == 'archives':
+        return scoring.score_archives(db)
+    return scoring.score_periods(db, scoring.rolling_months(int(params.get('months', 6))))
+
+# Read operations available to POST /api/batch, each taking a params dict
+BATCH_OPERATIONS = {
+    'summary': lambda p: db.get_summary(p.get('start_date'), p.get('end_date')),
+    'transactions': lambda p: db.get_transactions_page(**{'limit': 100, **p}),
+    'search': lambda p: db.search_transactions(**{'limit': 50, **p}),
+    'categories': lambda p: db.get_categories(),
+    'budgets': lambda p: db.get_budget_allocations(),
+    'budget_status': lambda p: db.get_budget_status(p.get('start_date'), p.get('end_date')),
+    'category_spending': lambda p: db.get_category_spending(int(p['category_id']), int(p.get('days', 30))),
+    'timeseries': batch_timeseries,
+    'scores': batch_scores,
+    'streaks': lambda p: db.get_streak_state(p.get('current_date')),
+    'login_days': lambda p: db.get_login_days(),
+    'user_name': lambda p: db.get_user_name(),
+    'user_emoji': lambda p: db.get_user_emoji(),
+    'archives': lambda p: db.get_monthly_archives(int(p.get('limit', 12))),
+    'archive_transactions': lambda p: db.get_archive_transactions(
+        int(p['archive_id']), int(p.get('limit', 100)), p.get('cursor')),
+    'monthly_spending': lambda p: db.get_monthly_spending_chart_data(int(p.get('months', 6))),
+    'next_archive_start_date': lambda p: db.get_next_archive_start_date(),
+}
+
+MAX_BATCH_OPERATIONS = 20
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Run several read operations against one database snapshot in one round trip
+
+    Body: {"operations": [{"op": "summary", "params": {...}, "key": "optional"}, ...]}
+    Results are keyed by `key` (default: the op name), each with its own
+    status and timing, so one failing operation does not fail the batch.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        operations = data.get('operations')
+
+        if not isinstance(operations, list) or not operations:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required field: operations (list)'
+            }), 400
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {MAX_BATCH_OPERATIONS} operations per batch'
+            }), 400
+        for operation in operations:
+            if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Unknown operation: {operation.get('op') if isinstance(operation, dict) else operation}",
+                    'available': sorted(BATCH_OPERATIONS)
+                }), 400
+            if operation.get('params') is not None and not isinstance(operation['params'], dict):
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Operation {operation['op']}: params must be an object"
+                }), 400
+
+        results = {}
+        started = time.perf_counter()
+        with db.snapshot():
+            for operation in operations:
+                key = operation.get('key') or operation['op']
+                op_started = time.perf_counter()
+                try:
+                    result = {
+                        'status': 'success',
+                        'data': BATCH_OPERATIONS[operation['op']](operation.get('params') or {})
+                    }
+                except (ValueError, TypeError, KeyError) as e:
+                    result = {'status': 'error', 'message': str(e)}
+                result['ms'] = round((time.perf_counter() - op_started) * 1000, 3)
+                results[key] = result
+
+        return jsonify({
+            'status': 'success',
+            'results': results,
+            'total_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 # ============= HEALTH CHECK =============
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Check if database is working"""
+    """Check if database is working and report connection pool and cache stats"""
     try:
         categories = db.get_categories()
         return jsonify({
             'status': 'success',
             'database': 'connected',
-            'categories_count': len(categories)
+            'categories_count': len(categories),
+            'pool': db.pool.get_stats(),
+            'cache': db.cache.get_stats(),
+            'categorizer': categorizer.get_stats(),
+            'analytics': db.analytics.get_stats() if db.analytics is not None else None
         })
     except Exception as e:
         return jsonify({
@@ -318,6 +765,54 @@ def health_check():
             'message': str(e)
         }), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Read cache hit/miss counters for tuning"""
+    return jsonify({
+        'status': 'success',
+        'cache': db.cache.get_stats()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request latency, SQL and connection pool metrics in Prometheus text format"""
+    pool = db.pool.get_stats()
+    cache = db.cache.get_stats()
+    extra = [
+        ('enna_db_pool_writes_total', 'counter', 'Writer scopes completed', pool['writes']),
+        ('enna_db_pool_reads_total', 'counter', 'Reader connection checkouts', pool['reads']),
+        ('enna_db_pool_readers_open', 'gauge', 'Reader connections open', pool['readers_open']),
+        ('enna_db_pool_readers_idle', 'gauge', 'Reader connections idle in the pool', pool['readers_idle']),
+        ('enna_db_pool_readers_max', 'gauge', 'Maximum reader connections', pool['max_readers']),
+        ('enna_cache_hits_total', 'counter', 'Read cache hits', cache['hits']),
+        ('enna_cache_misses_total', 'counter', 'Read cache misses', cache['misses']),
+        ('enna_cache_evictions_total', 'counter', 'Read cache LRU evictions', cache['evictions']),
+        ('enna_cache_bypasses_total', 'counter', 'Snapshot reads that bypassed the cache', cache['bypasses']),
+        ('enna_cache_entries', 'gauge', 'Read cache entries', cache['entries']),
+        ('enna_cache_data_version', 'gauge', 'Data version (bumped by every write)', cache['version']),
+    ]
+    return app.response_class(db.metrics.render(extra), mimetype=None,
+                              content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/debug/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """Most recent statements over the slow-query threshold, with their query plans"""
+    if slow_query_log is None:
+        return jsonify({
+            'status': 'success',
+            'enabled': False,
+            'message': 'Set ENNA_SLOW_QUERY_MS (or serve --slow-query-ms) to log slow queries',
+            'queries': []
+        })
+    return jsonify({
+        'status': 'success',
+        'enabled': True,
+        'threshold_ms': slow_query_log.threshold_seconds * 1000,
+        'log_file': slow_query_log.path,
+        'count': slow_query_log.count,
+        'queries': slow_query_log.get_recent()
+    })
+
 # ============= USER ENDPOINTS =============
 
 @app.route('/api/user/name', methods=['GET'])
@@ -395,10 +890,9 @@ def get_archives():
     """Get all monthly archives"""
     try:
         limit = int(request.args.get('limit', 12))
-        archives = db.get_monthly_archives(limit)
-        return jsonify({
+        return versioned_json(lambda: {
             'status': 'success',
-            'archives': archives
+            'archives': db.get_monthly_archives(limit)
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -421,46 +915,87 @@ def get_archive(month_year):
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/archives/<int:archive_id>/transactions', methods=['GET'])
+def get_archive_transactions(archive_id):
+    """Get an archive's transactions one page at a time (keyset pagination)"""
+    try:
+        try:
+            limit = page_limit_arg(100)
+            page = db.get_archive_transactions(archive_id, limit=limit, cursor=request.args.get('cursor'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        return jsonify({
+            'status': 'success',
+            'transactions': page['transactions'],
+            'count': len(page['transactions']),
+            'next_cursor': page['next_cursor']
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @app.route('/api/archives', methods=['POST'])
 def create_archive():
-    """Create monthly archive"""
+    """Archive a date range: snapshot, summarize and clear its transactions atomically
+
+    Body: {"date_range": {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}, "month_year"?, "name"?}
+    Legacy clients without a date range may still post summary_data, scores
+    and transactions_json, which are stored as given. A range overlapping an
+    existing archive, or a second legacy archive for a month, is a 409.
+    """
     try:
-        data = request.json
-        
+        data = request.json or {}
+        date_range = data.get('date_range')
+
+        if date_range:
+            if not date_range.get('start') or not date_range.get('end'):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'date_range needs start and end'
+                }), 400
+            try:
+                archive = db.archive_period(
+                    date_range['start'],
+                    date_range['end'],
+                    month_year=data.get('month_year'),
+                    name=data.get('name')
+                )
+            except ArchiveConflict as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 409
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+
+            return jsonify({
+                'status': 'success',
+                'message': 'Archive created successfully',
+                'archive_id': archive['archive_id'],
+                'summary_data': archive['summary_data'],
+                'scores': archive['scores'],
+                'transactions_cleared': archive['transactions_archived']
+            }), 201
+
         if 'month_year' not in data or 'summary_data' not in data or 'scores' not in data:
             return jsonify({
                 'status': 'error',
-                'message': 'Missing required fields: month_year, summary_data, scores'
+                'message': 'Missing required fields: date_range (or month_year, summary_data, scores)'
             }), 400
         
-        # Get transactions JSON, date_range, and name if provided
-        transactions_json = data.get('transactions_json')
-        date_range = data.get('date_range')
-        name = data.get('name')
-        
-        archive_id = db.create_monthly_archive(
-            month_year=data['month_year'],
-            summary_data=data['summary_data'],
-            scores=data['scores'],
-            transactions_json=transactions_json,
-            date_range=date_range,
-            name=name
-        )
-        
-        # Clear transactions in the archived date range
-        if date_range:
-            cleared_count = db.clear_transactions_in_range(
-                date_range.get('start'),
-                date_range.get('end')
+        try:
+            archive_id = db.create_monthly_archive(
+                month_year=data['month_year'],
+                summary_data=data['summary_data'],
+                scores=data['scores'],
+                transactions_json=data.get('transactions_json'),
+                name=data.get('name')
             )
-        else:
-            cleared_count = 0
+        except ArchiveConflict as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 409
         
         return jsonify({
             'status': 'success',
             'message': 'Archive created successfully',
             'archive_id': archive_id,
-            'transactions_cleared': cleared_count
+            'transactions_cleared': 0
         }), 201
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -482,10 +1017,9 @@ def get_monthly_spending_chart():
     """Get monthly spending data for charts"""
     try:
         months = int(request.args.get('months', 6))
-        data = db.get_monthly_spending_chart_data(months)
-        return jsonify({
+        return versioned_json(lambda: {
             'status': 'success',
-            'data': data
+            'data': db.get_monthly_spending_chart_data(months)
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -529,6 +1063,45 @@ def get_next_archive_start_date():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# ============= EXPORT ENDPOINTS =============
+
+def export_response(export, name, **filters):
+    """Stream an export.py generator as a download, or 400 for bad parameters
+
+    Query params: format=csv|jsonl (default csv), start_date, end_date,
+    category_id, type, plus the export's own filters.
+    """
+    try:
+        try:
+            format = request.args.get('format', 'csv')
+            chunks = export(
+                db, format,
+                start_date=request.args.get('start_date'),
+                end_date=request.args.get('end_date'),
+                category_id=request.args.get('category_id', type=int),
+                type=request.args.get('type'),
+                **filters
+            )
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        mimetype, extension = FORMATS[format]
+        response = app.response_class(chunks, mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="enna-{name}.{extension}"'
+        return response
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/export/transactions', methods=['GET'])
+def export_transactions_route():
+    """Download every matching transaction, oldest first, as CSV or JSON Lines"""
+    return export_response(export_transactions, 'transactions')
+
+@app.route('/api/export/archives', methods=['GET'])
+def export_archives_route():
+    """Download archived transactions, archive by archive; archive_id narrows it to one"""
+    return export_response(export_archives, 'archives', archive_id=request.args.get('archive_id', type=int))
+
 @app.route('/api/database/reset', methods=['POST'])
 def reset_database():
     """Reset all data in the database"""
@@ -541,6 +1114,22 @@ def reset_database():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/database/check-rollup', methods=['POST'])
+def check_rollup():
+    """Diff the daily totals rollup against raw transactions (optionally repair it)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        mismatches = db.check_daily_totals(repair=bool(data.get('repair')))
+        return jsonify({
+            'status': 'success',
+            'consistent': not mismatches,
+            'repaired': bool(mismatches and data.get('repair')),
+            'mismatches': mismatches[:100],
+            'mismatch_count': len(mismatches)
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 if __name__ == '__main__':
     print("🚀 Starting Enna Backend...")
     print("📊 Database initialized")
@@ -0,0 +1,158 @@
+"""Compare the NumPy analytics columns against the SQL rollup path
+
+Opens the same datagen.py database twice - once reading aggregates from
+SQL (the daily_category_totals rollup), once with analytics=True - and
+times the aggregate reads on both, read cache bypassed. Every result is
+compared; the script exits 1 if the two paths disagree anywhere.
+
+Also reports the one-time load, the columns' memory and what the write
+hooks cost: appending a row, replacing one and deleting one.
+
+Dates are relative to the newest transaction, so a reused database gives
+the same ranges. category_spending counts back from today, like the SQL.
+
+Usage (from enna-backend/):
+    python benchmarks/bench_analytics.py [--size 10k|100k|1m] [--data PATH] [--repeats 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS, '..'))
+
+from database import EnnaDatabase
+import analytics
+import datagen
+
+
+def cases(last, category_id):
+    """(name, method, args) for every aggregate read, dates counted back from `last`"""
+    def ago(days):
+        return (last - timedelta(days=days)).isoformat()
+    end = last.isoformat()
+    months = [(ago(30 * (i + 1)), ago(30 * i + 1)) for i in range(12)]
+    return [
+        ('summary, all time', 'get_summary', ()),
+        ('summary, last 90 days', 'get_summary', (ago(90), end)),
+        ('summary, one year', 'get_summary', (ago(365), end)),
+        ('period totals, 12 months', 'get_period_totals', (months,)),
+        ('period totals, 120 x 30 days', 'get_period_totals',
+         ([(ago(30 * (i + 1)), ago(30 * i + 1)) for i in range(120)],)),
+        ('timeseries, 90 days by day', 'get_timeseries', (ago(90), end, 'day')),
+        ('timeseries, 1 year by week + categories', 'get_timeseries', (ago(365), end, 'week', True)),
+        ('timeseries, 5 years by month + categories', 'get_timeseries', (ago(5 * 365), end, 'month', True)),
+        ('timeseries, 5 years by day', 'get_timeseries', (ago(5 * 365), end, 'day')),
+        ('budget status, all time', 'get_budget_status', ()),
+        ('budget status, one month', 'get_budget_status', months[0]),
+        ('category spending, 365 days', 'get_category_spending', (category_id, 365)),
+    ]
+
+
+def median_ms(db, method, args, repeats):
+    times = []
+    for _ in range(repeats):
+        db.cache.bump()
+        t0 = time.perf_counter()
+        result = getattr(db, method)(*args)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, result
+
+
+def write_hooks(store, repeats):
+    """Median ms to append, replace and delete one row, all removed again afterwards
+
+    The appends are new ids on the newest day, as transactions entered
+    today are; only the first of them grows the arrays. Replacing and
+    deleting copy the columns.
+    """
+    day = int(store._view()['day'][-1])
+    ids = [store._max_id + 1 + i for i in range(repeats + 1)]
+    timings = {'append': [], 'replace': [], 'delete': []}
+    store.apply([(ids[0], day, 1234, 1, 0)])
+    for row_id in ids[1:]:
+        t0 = time.perf_counter()
+        store.apply([(row_id, day, 1234, 1, 0)])
+        timings['append'].append(time.perf_counter() - t0)
+    for row_id in ids[1:]:
+        t0 = time.perf_counter()
+        store.apply([(row_id, day - 1, 999, 2, 1)])
+        timings['replace'].append(time.perf_counter() - t0)
+    for row_id in ids[1:]:
+        t0 = time.perf_counter()
+        store.delete([row_id])
+        timings['delete'].append(time.perf_counter() - t0)
+    store.delete(ids[:1])
+    return {name: round(statistics.median(values) * 1000, 3) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark NumPy analytics against SQL')
+    parser.add_argument('--size', choices=sorted(datagen.SIZES), default='1m')
+    parser.add_argument('--data', help='Reuse a datagen.py database instead of generating one')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    if not analytics.AVAILABLE:
+        print("❌ NumPy is not installed: pip install numpy")
+        return 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.data
+        if not path:
+            path = os.path.join(directory, 'analytics.db')
+            print(f"⏳ Generating {args.size} transactions...")
+            datagen.generate(path, datagen.SIZES[args.size], datagen.ARCHIVES[args.size])
+
+        with redirect_stdout(open(os.devnull, 'w')):
+            sql_db = EnnaDatabase(path)
+            numpy_db = EnnaDatabase(path, analytics=True)
+        store = numpy_db.analytics
+        conn = sql_db.get_connection()
+        total = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+        last = date.fromisoformat(conn.execute('SELECT MAX(date) FROM transactions').fetchone()[0])
+        category_id = conn.execute(
+            "SELECT category_id FROM transactions WHERE type = 'expense' AND category_id IS NOT NULL LIMIT 1"
+        ).fetchone()[0]
+        if numpy_db._analytics_for() is None:
+            print(f"❌ The analytics columns cannot answer for this database: {store.get_stats()}")
+            return 1
+
+        results = []
+        mismatches = 0
+        for name, method, method_args in cases(last, category_id):
+            sql_ms, expected = median_ms(sql_db, method, method_args, args.repeats)
+            numpy_ms, actual = median_ms(numpy_db, method, method_args, args.repeats)
+            same = actual == expected
+            mismatches += not same
+            results.append({'name': name, 'method': method, 'sql_ms': round(sql_ms, 3),
+                            'numpy_ms': round(numpy_ms, 3), 'same': same})
+        hooks = write_hooks(store, args.repeats)
+        stats = store.get_stats()
+        sql_db.close()
+        numpy_db.close()
+
+    print(f"📊 Aggregates over {total:,} transactions, SQL rollup vs NumPy columns (median of {args.repeats})")
+    print(f"   loaded in {stats['load_ms']:.0f}ms, {stats['bytes'] / 1024 / 1024:.1f} MB of columns")
+    print(f"   {'case':44} {'SQL':>10} {'NumPy':>10} {'speedup':>8}  same")
+    for r in results:
+        print(f"   {r['name']:44} {r['sql_ms']:8.2f}ms {r['numpy_ms']:8.2f}ms "
+              f"{r['sql_ms'] / max(r['numpy_ms'], 1e-3):7.2f}x  {'✅' if r['same'] else '❌'}")
+    print(f"   write hooks: append {hooks['append']:.3f}ms, replace {hooks['replace']:.3f}ms, "
+          f"delete {hooks['delete']:.3f}ms")
+    if mismatches:
+        print(f"❌ {mismatches} results differ between SQL and NumPy")
+    else:
+        print("✅ Every NumPy result matches SQL")
+    print(json.dumps({'transactions': total, 'columns': stats, 'write_hooks': hooks, 'results': results}))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
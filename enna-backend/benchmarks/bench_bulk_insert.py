@@ -0,0 +1,84 @@
+"""Benchmark: per-row add_transaction vs add_transactions_bulk
+
+Usage (from enna-backend/):
+    python benchmarks/bench_bulk_insert.py [--rows 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import EnnaDatabase
+
+
+def make_rows(count, seed=42):
+    """Build a deterministic list of transaction dicts"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        rows.append({
+            'type': 'income' if rng.random() < 0.1 else 'expense',
+            'amount': round(rng.uniform(1, 500), 2),
+            'description': f'Merchant {rng.randint(1, 200)}',
+            'category_id': rng.randint(1, 9),
+            'date': (start + timedelta(days=rng.randint(0, 364))).isoformat(),
+        })
+    return rows
+
+
+def fresh_db(directory, name):
+    with redirect_stdout(open(os.devnull, 'w')):
+        return EnnaDatabase(os.path.join(directory, name))
+
+
+def bench_per_row(directory, rows):
+    db = fresh_db(directory, 'per_row.db')
+    started = time.perf_counter()
+    for row in rows:
+        db.add_transaction(
+            type=row['type'],
+            amount=row['amount'],
+            description=row['description'],
+            category_id=row['category_id'],
+            date=row['date']
+        )
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed
+
+
+def bench_bulk(directory, rows):
+    db = fresh_db(directory, 'bulk.db')
+    started = time.perf_counter()
+    results = db.add_transactions_bulk(rows)
+    elapsed = time.perf_counter() - started
+    assert all(r['status'] == 'success' for r in results)
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row inserts against add_transactions_bulk')
+    parser.add_argument('--rows', type=int, default=5000)
+    count = parser.parse_args().rows
+    rows = make_rows(count)
+
+    with tempfile.TemporaryDirectory() as directory:
+        per_row = bench_per_row(directory, rows)
+        bulk = bench_bulk(directory, rows)
+
+    print(f"📊 Inserting {count} transactions")
+    print(f"   per-row add_transaction: {per_row:8.3f}s  {count / per_row:12,.0f} rows/sec")
+    print(f"   add_transactions_bulk:   {bulk:8.3f}s  {count / bulk:12,.0f} rows/sec")
+    print(f"   speedup: {per_row / bulk:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""Concurrency stress test and read-scaling benchmark for EnnaDatabase
+
+1. Stress: writer and reader threads hammer one database at the same time;
+   afterwards the row count, PRAGMA integrity_check and the daily totals
+   rollup must all be exact.
+2. Scaling: read throughput (get_summary + a transactions page) with 1..N threads.
+3. Isolation: reader latency while a large bulk import holds the writer.
+
+Scaling and isolation invalidate the read cache before every read, so the
+reads run their SQL against the database instead of returning a result
+cached before the import started.
+
+Usage (from enna-backend/):
+    python benchmarks/bench_concurrency.py [--seconds 2] [--import-rows 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import EnnaDatabase
+
+START = date(2020, 1, 1)
+
+
+def open_db(path, readers=8):
+    with redirect_stdout(open(os.devnull, 'w')):
+        return EnnaDatabase(path, readers=readers)
+
+
+def random_rows(rng, count):
+    return [{
+        'type': 'income' if rng.random() < 0.1 else 'expense',
+        'amount': round(rng.uniform(1, 500), 2),
+        'description': f'Merchant {rng.randint(1, 300)}',
+        'category_id': rng.randint(1, 9),
+        'date': (START + timedelta(days=rng.randint(0, 3 * 365))).isoformat(),
+    } for _ in range(count)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def stress(directory, writers=4, readers=8, batches=25):
+    """Concurrent writes and reads; returns (ok, details)"""
+    db = open_db(os.path.join(directory, 'stress.db'))
+    errors = []
+    inserted = [0] * writers
+    stop = threading.Event()
+
+    def write(worker):
+        rng = random.Random(worker)
+        try:
+            for _ in range(batches):
+                rows = random_rows(rng, 200)
+                results = db.add_transactions_bulk(rows)
+                inserted[worker] += sum(1 for r in results if r['status'] == 'success')
+                for row in random_rows(rng, 5):
+                    db.add_transaction(row['type'], row['amount'], row['description'],
+                                       row['category_id'], row['date'])
+                    inserted[worker] += 1
+        except Exception as e:
+            errors.append(f'writer {worker}: {e!r}')
+
+    def read(worker):
+        last_expenses = 0
+        try:
+            while not stop.is_set():
+                summary = db.get_summary()
+                by_category = sum(c['total'] for c in summary['expenses_by_category'])
+                if by_category - summary['total_expenses'] > 0.01:
+                    errors.append(f'reader {worker}: category totals exceed expenses')
+                # Writers only insert positive amounts, so committed totals never shrink
+                if summary['total_expenses'] < last_expenses - 0.01:
+                    errors.append(f'reader {worker}: total expenses went backwards')
+                last_expenses = summary['total_expenses']
+                db.get_transactions_page(limit=50)
+        except Exception as e:
+            errors.append(f'reader {worker}: {e!r}')
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    reader_threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    started = time.perf_counter()
+    for t in threads + reader_threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    for t in reader_threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    conn = db.get_connection()
+    count = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+    integrity = conn.execute('PRAGMA integrity_check').fetchone()[0]
+    rollup_mismatches = len(db.check_daily_totals())
+    db.close()
+
+    expected = sum(inserted)
+    ok = not errors and count == expected and integrity == 'ok' and rollup_mismatches == 0
+    details = (f'{expected} rows written by {writers} writers alongside {readers} readers in {elapsed:.2f}s; '
+               f'count={count}, integrity={integrity}, rollup mismatches={rollup_mismatches}, '
+               f'errors={len(errors)}')
+    for error in errors[:5]:
+        details += f'\n      {error}'
+    return ok, details
+
+
+def read_scaling(directory, seconds, thread_counts=(1, 2, 4, 8)):
+    path = os.path.join(directory, 'scaling.db')
+    db = open_db(path)
+    db.add_transactions_bulk(random_rows(random.Random(1), 50000))
+    results = []
+
+    for threads in thread_counts:
+        counts = [0] * threads
+        stop = threading.Event()
+
+        def read(worker):
+            while not stop.is_set():
+                db.cache.bump()
+                db.get_summary('2021-01-01', '2021-12-31')
+                db.get_transactions_page(limit=50, start_date='2021-06-01')
+                counts[worker] += 1
+
+        workers = [threading.Thread(target=read, args=(i,)) for i in range(threads)]
+        for t in workers:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in workers:
+            t.join()
+        results.append((threads, sum(counts) / seconds))
+
+    db.close()
+    return results
+
+
+def read_latency_during_import(directory, rows=200000):
+    db = open_db(os.path.join(directory, 'isolation.db'))
+    db.add_transactions_bulk(random_rows(random.Random(2), 10000))
+    big_batch = random_rows(random.Random(3), rows)
+    latencies = []
+    done = threading.Event()
+
+    def importer():
+        db.add_transactions_bulk(big_batch)
+        done.set()
+
+    thread = threading.Thread(target=importer)
+    hits = db.cache.get_stats()['hits']
+    started = time.perf_counter()
+    thread.start()
+    while not done.is_set():
+        db.cache.bump()
+        t0 = time.perf_counter()
+        db.get_summary()
+        db.get_transactions_page(limit=50)
+        latencies.append(time.perf_counter() - t0)
+    thread.join()
+    import_seconds = time.perf_counter() - started
+    hits = db.cache.get_stats()['hits'] - hits
+    db.close()
+    return import_seconds, latencies, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress and benchmark concurrent EnnaDatabase access')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Length of each read-scaling step')
+    parser.add_argument('--import-rows', type=int, default=200000,
+                        help='Rows in the bulk import the isolation reads run against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ok, details = stress(directory)
+        print(f"{'✅' if ok else '❌'} Stress: {details}")
+
+        print("📊 Read throughput (get_summary + transactions page):")
+        baseline = None
+        for threads, per_second in read_scaling(directory, args.seconds):
+            baseline = baseline or per_second
+            print(f"   {threads} thread(s): {per_second:10,.0f} ops/sec  ({per_second / baseline:.2f}x)")
+
+        import_seconds, latencies, hits = read_latency_during_import(directory, args.import_rows)
+        print(f"📊 Reads (summary + transactions page) during a {import_seconds:.2f}s bulk import: "
+              f"{len(latencies)} reads, {hits} cache hits, "
+              f"p50 {percentile(latencies, 50) * 1000:.2f}ms, "
+              f"p99 {percentile(latencies, 99) * 1000:.2f}ms, "
+              f"max {max(latencies) * 1000:.2f}ms")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
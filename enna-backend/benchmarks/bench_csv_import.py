@@ -0,0 +1,80 @@
+"""Benchmark: streaming CSV ingestion of a large bank export
+
+Usage (from enna-backend/):
+    python benchmarks/bench_csv_import.py [--rows 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import EnnaDatabase
+from ingestion import import_csv
+
+MERCHANTS = ['STARBUCKS', 'SHELL GAS', 'AMAZON MKTP', 'NETFLIX.COM', 'CVS PHARMACY',
+             'COMCAST INTERNET', 'WHOLE FOODS MARKET', 'UBER TRIP', 'PAYROLL DEPOSIT']
+
+
+def write_chase_export(path, count, seed=42):
+    """Write a Chase checking style export with `count` rows"""
+    rng = random.Random(seed)
+    start = date(2019, 1, 1)
+    with open(path, 'w', newline='') as f:
+        f.write('Details,Posting Date,Description,Amount,Type,Balance,Check or Slip #\n')
+        for _ in range(count):
+            day = start + timedelta(days=rng.randint(0, 5 * 365))
+            merchant = rng.choice(MERCHANTS)
+            if merchant == 'PAYROLL DEPOSIT':
+                details, amount = 'CREDIT', rng.uniform(1000, 3000)
+            else:
+                details, amount = 'DEBIT', -rng.uniform(1, 300)
+            f.write(f'{details},{day.strftime("%m/%d/%Y")},"{merchant} #{rng.randint(1, 999)}",'
+                    f'{amount:.2f},ACH_DEBIT,1000.00,\n')
+
+
+def run_import(directory, name, csv_path):
+    with redirect_stdout(open(os.devnull, 'w')):
+        db = EnnaDatabase(os.path.join(directory, name))
+    with open(csv_path, 'rb') as f:
+        stats = import_csv(db, f)
+    db.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming CSV import')
+    parser.add_argument('--rows', type=int, default=100000, help='Transactions in the generated CSV')
+    args = parser.parse_args()
+    count = args.rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'chase.csv')
+        write_chase_export(csv_path, count)
+        size_mb = os.path.getsize(csv_path) / 1024 / 1024
+
+        started = time.perf_counter()
+        stats = run_import(directory, 'timed.db', csv_path)
+        elapsed = time.perf_counter() - started
+
+        # Memory is measured on a second run, tracemalloc slows allocation down
+        tracemalloc.start()
+        run_import(directory, 'traced.db', csv_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"📊 Imported {size_mb:.1f} MB Chase export ({stats['profile']})")
+    print(f"   parsed {stats['rows_parsed']}, skipped {stats['rows_skipped']}, "
+          f"inserted {stats['rows_inserted']}, duplicate {stats['rows_duplicate']}, failed {stats['rows_failed']}")
+    print(f"   {elapsed:.2f}s  {stats['rows_inserted'] / elapsed:,.0f} rows/sec")
+    print(f"   peak traced memory: {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Compare the streaming export routes with paging through GET /api/transactions
+
+Each case runs in a fresh process against the same datagen.py database,
+through Flask's test client with the body left unbuffered, reading it
+chunk by chunk and discarding it the way a socket would. Reported per case:
+
+  * first byte - time until the first body chunk is available
+  * total      - time until the last one
+  * rows/s     - transactions delivered per second
+  * peak RSS   - growth of the process's peak resident memory over the
+                 request (ru_maxrss after the app is imported and warmed)
+
+The list route is paged through with its cursor, MAX_PAGE rows a page,
+so both deliver every transaction; its first byte is the first page.
+
+Usage (from enna-backend/):
+    python benchmarks/bench_export.py [--size 10k|100k|1m] [--data PATH]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS, '..'))
+
+import datagen
+from database import MAX_PAGE
+
+# (name, path, header lines); the list route's pages are JSON, so its
+# header count is None and its rows are counted from the pages instead
+CASES = [
+    ('GET /api/transactions, all pages', '/api/transactions?limit={page}', None),
+    ('export CSV', '/api/export/transactions', 1),
+    ('export JSON Lines', '/api/export/transactions?format=jsonl', 0),
+    ('export CSV, last year', '/api/export/transactions?start_date={year_ago}', 1),
+    ('export archives CSV', '/api/export/archives', 1),
+]
+
+
+def run_case(data, path):
+    """Child process: fetch one URL and print its timings as JSON"""
+    os.environ['ENNA_DB_PATH'] = data
+    with redirect_stdout(open(os.devnull, 'w')):
+        import app
+    client = app.app.test_client()
+    client.get('/api/health')
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    t0 = time.perf_counter()
+    first_byte = None
+    size = 0
+    lines = 0
+    rows = 0
+    url = path
+    while url:
+        response = client.get(url, buffered=False)
+        url = None
+        body = []
+        for chunk in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - t0
+            size += len(chunk)
+            lines += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+            if response.is_json:
+                body.append(chunk)
+        response.close()
+        if body:
+            page = json.loads(b''.join(body))
+            rows += page['count']
+            if page['next_cursor']:
+                url = f"{path}&cursor={page['next_cursor']}"
+    total = time.perf_counter() - t0
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'status': response.status_code,
+        'first_byte_ms': round((first_byte or total) * 1000, 1),
+        'total_ms': round(total * 1000, 1),
+        'bytes': size,
+        'lines': lines,
+        'rows': rows,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round((rss_after - rss_before) / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming exports against the list route')
+    parser.add_argument('--size', choices=sorted(datagen.SIZES), default='1m')
+    parser.add_argument('--data', help='Reuse a datagen.py database instead of generating one')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.data, args.case)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.data
+        if not path:
+            path = os.path.join(directory, 'export.db')
+            print(f"⏳ Generating {args.size} transactions...")
+            datagen.generate(path, datagen.SIZES[args.size], datagen.ARCHIVES[args.size])
+
+        import sqlite3
+        conn = sqlite3.connect(path)
+        rows, archived = (conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                          for table in ('transactions', 'archived_transactions'))
+        year_ago = conn.execute("SELECT date(MAX(date), '-1 year') FROM transactions").fetchone()[0]
+        conn.close()
+
+        results = []
+        for name, url, header in CASES:
+            url = url.format(page=MAX_PAGE, year_ago=year_ago)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--data', os.path.abspath(path), '--case', url],
+                cwd=directory, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result['name'] = name
+            if header is not None:
+                result['rows'] = result['lines'] - header
+            results.append(result)
+
+    print(f"📊 Exporting {rows:,} transactions and {archived:,} archived ones, one process per case")
+    print(f"   {'case':32} {'first byte':>11} {'total':>10} {'rows/s':>10} {'MB':>8} {'peak RSS':>9}")
+    for r in results:
+        print(f"   {r['name']:32} {r['first_byte_ms']:9.1f}ms {r['total_ms']:8.0f}ms "
+              f"{r['rows'] / max(r['total_ms'] / 1000, 1e-6):10,.0f} {r['bytes'] / 1e6:8.1f} "
+              f"{r['peak_rss_mb']:7.1f}MB")
+    print(json.dumps({'transactions': rows, 'archived': archived, 'results': results}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Compare REAL dollar amounts with INTEGER cents: exactness, aggregate speed and size
+
+Writes the same random transactions into two SQLite files that differ
+only in how `amount` is stored - REAL dollars, as before migration 7, and
+INTEGER cents, as now - each with an index covering the aggregates.
+
+  * exactness - the grand total and every per-category, per-month and
+    per-day total is compared with the exact sum of the integer cents
+    computed in Python. Every cents total must match; for REAL the number
+    of totals that are not the exact value (and that are still wrong after
+    rounding to the cent) and the largest drift are reported. Exits 1 if a
+    cents total is off.
+  * speed     - median time of each aggregate query on both files
+  * size      - both database files
+
+Usage (from enna-backend/):
+    python benchmarks/bench_money.py [--rows 2000000] [--repeats 5] [--seed 42]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import from_cents
+
+DAYS = 10 * 365
+CHUNK = 100000
+
+# (name, SQL); results are (group key, total) rows
+QUERIES = [
+    ('grand total', "SELECT 'all', SUM(amount) FROM transactions"),
+    ('per category', 'SELECT category_id, SUM(amount) FROM transactions GROUP BY category_id'),
+    ('per month', 'SELECT substr(date, 1, 7), SUM(amount) FROM transactions GROUP BY 1'),
+    ('per day', 'SELECT date, SUM(amount) FROM transactions GROUP BY date'),
+    ('one category, one year', "SELECT 'range', SUM(amount) FROM transactions "
+                               "WHERE category_id = 3 AND date BETWEEN '2020-01-01' AND '2020-12-31'"),
+]
+
+
+def generate(rows, seed):
+    """Yield (category_id, cents, date) rows: mostly small purchases, some large payments"""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    for _ in range(rows):
+        if rng.random() < 0.05:
+            cents = rng.randint(50000, 500000)
+        else:
+            cents = rng.randint(1, 20000)
+        yield rng.randint(1, 9), cents, (start + timedelta(days=rng.randrange(DAYS))).isoformat()
+
+
+def build(path, column_type, rows, seed):
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute(f'''
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY,
+            category_id INTEGER,
+            amount {column_type} NOT NULL,
+            date DATE NOT NULL
+        )
+    ''')
+    dollars = column_type == 'REAL'
+    batch = []
+    for category_id, cents, day in generate(rows, seed):
+        batch.append((category_id, cents / 100 if dollars else cents, day))
+        if len(batch) == CHUNK:
+            conn.executemany('INSERT INTO transactions (category_id, amount, date) VALUES (?, ?, ?)', batch)
+            batch = []
+    conn.executemany('INSERT INTO transactions (category_id, amount, date) VALUES (?, ?, ?)', batch)
+    conn.execute('CREATE INDEX idx_category_date_amount ON transactions (category_id, date, amount)')
+    conn.execute('CREATE INDEX idx_date_amount ON transactions (date, amount)')
+    conn.commit()
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.execute('ANALYZE')
+    return conn
+
+
+def exact_totals(rows, seed):
+    """The exact integer-cent total of every query's groups, computed in Python"""
+    totals = {name: defaultdict(int) for name, _ in QUERIES}
+    for category_id, cents, day in generate(rows, seed):
+        totals['grand total']['all'] += cents
+        totals['per category'][category_id] += cents
+        totals['per month'][day[:7]] += cents
+        totals['per day'][day] += cents
+        if category_id == 3 and '2020-01-01' <= day <= '2020-12-31':
+            totals['one category, one year']['range'] += cents
+    return totals
+
+
+def median_ms(conn, sql, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = conn.execute(sql).fetchall()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark REAL dollars against INTEGER cents')
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"⏳ Writing {args.rows:,} transactions twice...")
+        paths = {kind: os.path.join(directory, f'{kind}.db') for kind in ('real', 'cents')}
+        dbs = {
+            'real': build(paths['real'], 'REAL', args.rows, args.seed),
+            'cents': build(paths['cents'], 'INTEGER', args.rows, args.seed),
+        }
+        sizes = {kind: os.path.getsize(path) for kind, path in paths.items()}
+        exact = exact_totals(args.rows, args.seed)
+
+        results = []
+        cents_errors = 0
+        for name, sql in QUERIES:
+            real_ms, real_rows = median_ms(dbs['real'], sql, args.repeats)
+            cents_ms, cents_rows = median_ms(dbs['cents'], sql, args.repeats)
+            want = exact[name]
+
+            wrong = sum(1 for key, total in cents_rows if total != want[key])
+            cents_errors += wrong
+            # The REAL sums against the decimal value they stand for
+            not_exact = rounds_wrong = 0
+            drift = Decimal(0)
+            for key, total in real_rows:
+                if total != from_cents(want[key]):
+                    not_exact += 1
+                if round(total * 100) != want[key]:
+                    rounds_wrong += 1
+                drift = max(drift, abs(Decimal(total) - Decimal(want[key]) / 100))
+
+            results.append({
+                'name': name, 'groups': len(want),
+                'real_ms': round(real_ms, 3), 'cents_ms': round(cents_ms, 3),
+                'cents_wrong': wrong, 'real_not_exact': not_exact, 'real_wrong_after_rounding': rounds_wrong,
+                'real_max_drift': float(drift),
+            })
+        for conn in dbs.values():
+            conn.close()
+
+    print(f"📊 Aggregates over {args.rows:,} transactions (median of {args.repeats})")
+    print(f"   {'query':24} {'groups':>7} {'REAL':>10} {'cents':>10} {'speedup':>8}"
+          f" {'REAL inexact':>13} {'off a cent':>11} {'max drift':>11}")
+    for r in results:
+        print(f"   {r['name']:24} {r['groups']:7} {r['real_ms']:8.2f}ms {r['cents_ms']:8.2f}ms "
+              f"{r['real_ms'] / max(r['cents_ms'], 1e-3):7.2f}x {r['real_not_exact']:13} "
+              f"{r['real_wrong_after_rounding']:11} {r['real_max_drift']:11.2e}")
+    print(f"   database size: REAL {sizes['real'] / 1024 / 1024:.1f} MB, "
+          f"cents {sizes['cents'] / 1024 / 1024:.1f} MB")
+    if cents_errors:
+        print(f"❌ {cents_errors} integer-cent totals differ from the exact sum")
+    else:
+        print("✅ Every integer-cent total is exact")
+    print(json.dumps({'rows': args.rows, 'sizes': sizes, 'results': results}))
+    return 1 if cents_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Compare full-text search against the LIKE '%q%' baseline
+
+Times EnnaDatabase.search_transactions (FTS5) and get_transactions_page's
+`search` filter (description LIKE '%q%') for the same queries on a
+datagen.py database, first page of 50 rows each, read cache bypassed.
+
+Queries range from words in a large share of the history ('star', every
+Starbucks row) to rare tokens and no match at all - the LIKE scan stops
+early when the page fills quickly but reads the whole table otherwise.
+
+Usage (from enna-backend/):
+    python benchmarks/bench_search.py [--size 10k|100k|1m] [--data PATH] [--repeats 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS, '..'))
+
+from database import EnnaDatabase
+import datagen
+
+PAGE = 50
+
+# (name, query, search_transactions kwargs)
+QUERIES = [
+    ('common word', 'starbucks', {}),
+    ('common prefix', 'star', {}),
+    ('two-letter prefix', 'st', {}),
+    ('two words', 'whole foods', {}),
+    ('newest first', 'star', {'sort': 'date'}),
+    ('rare token', '734', {}),
+    ('rare token, newest first', '734', {'sort': 'date'}),
+    ('no match', 'zzzz', {}),
+    ('common word, category + year', 'uber', {'category': 'Transportation', 'days': 365}),
+    ('income, all scopes', 'payroll', {'scope': 'all'}),
+]
+
+
+def median_ms(call, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transaction search')
+    parser.add_argument('--size', choices=sorted(datagen.SIZES), default='100k')
+    parser.add_argument('--data', help='Reuse a datagen.py database instead of generating one')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.data
+        if not path:
+            path = os.path.join(directory, 'search.db')
+            print(f"⏳ Generating {args.size} transactions...")
+            datagen.generate(path, datagen.SIZES[args.size], datagen.ARCHIVES[args.size])
+
+        with redirect_stdout(open(os.devnull, 'w')):
+            db = EnnaDatabase(path)
+        conn = db.get_connection()
+        total = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+        last_date = conn.execute('SELECT MAX(date) FROM transactions').fetchone()[0]
+        category_ids = {c['name']: c['id'] for c in db.get_categories()}
+
+        results = []
+        for name, query, options in QUERIES:
+            kwargs = {key: value for key, value in options.items() if key in ('sort', 'scope')}
+            filters = {}
+            if 'category' in options:
+                filters['category_id'] = category_ids[options['category']]
+            if 'days' in options:
+                filters['start_date'] = conn.execute(
+                    'SELECT date(?, ?)', (last_date, f"-{options['days']} days")).fetchone()[0]
+
+            fts_ms, page = median_ms(
+                lambda: db.search_transactions(query, limit=PAGE, **kwargs, **filters), args.repeats)
+            # LIKE cannot search archives, so the baseline covers live transactions only
+            like_ms, like_rows = median_ms(
+                lambda: db.get_transactions_page(limit=PAGE, search=query, **filters)['transactions'],
+                args.repeats)
+            results.append({
+                'name': name, 'query': query, **kwargs,
+                'fts_ms': round(fts_ms, 3), 'like_ms': round(like_ms, 3),
+                'rows': len(page['transactions']), 'like_rows': len(like_rows), 'order': page['sort'],
+            })
+        db.close()
+
+    print(f"📊 Transaction search, first {PAGE} rows of {total} transactions (median of {args.repeats})")
+    print(f"   {'case':30} {'query':12} {'order':10} {'FTS5':>10} {'LIKE':>10} {'speedup':>8}")
+    for r in results:
+        print(f"   {r['name']:30} {r['query']:12} {r['order']:10} {r['fts_ms']:8.2f}ms {r['like_ms']:8.2f}ms "
+              f"{r['like_ms'] / max(r['fts_ms'], 1e-3):7.1f}x")
+    print(json.dumps({'transactions': total, 'results': results}))
+
+
+if __name__ == '__main__':
+    main()
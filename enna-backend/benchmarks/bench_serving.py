@@ -0,0 +1,154 @@
+"""Compare the Flask development server with the production launcher
+
+Starts `python -m enna serve --dev` (debug + reloader, what `python app.py`
+does) and `python -m enna serve` (waitress) against the same synthetic
+database, drives each with keep-alive HTTP clients hitting the endpoints a
+page load uses, and reports requests/sec and latency percentiles.
+
+Usage (from enna-backend/):
+    python benchmarks/bench_serving.py [--seconds 10] [--clients 8] [--rows 50000]
+"""
+import argparse
+import http.client
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+from database import EnnaDatabase
+
+PORT = 5077
+PATHS = [
+    '/api/summary',
+    '/api/transactions?limit=50',
+    '/api/categories',
+    '/api/budgets',
+    '/api/reports/timeseries?bucket=day',
+]
+
+
+def populate(path, rows, seed=7):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    with redirect_stdout(open(os.devnull, 'w')):
+        db = EnnaDatabase(path)
+    db.add_transactions_bulk([{
+        'type': 'income' if rng.random() < 0.1 else 'expense',
+        'amount': round(rng.uniform(1, 500), 2),
+        'description': f'Merchant {rng.randint(1, 300)}',
+        'category_id': rng.randint(1, 9),
+        'date': (start + timedelta(days=rng.randint(0, 3 * 365))).isoformat(),
+    } for _ in range(rows)])
+    db.close()
+
+
+def start_server(args, db_path):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'enna', 'serve', '--port', str(PORT), '--db', db_path] + args,
+        cwd=BACKEND, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        # The reloader forks a child; a session lets us stop both
+        start_new_session=True
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=1)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"Server {' '.join(args) or '(waitress)'} did not start")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    process.wait(timeout=10)
+    time.sleep(0.5)
+
+
+def drive(seconds, clients):
+    """Keep-alive clients looping over PATHS; returns (requests, errors, latencies)"""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    stop = threading.Event()
+
+    def client(worker):
+        conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=10)
+        i = worker
+        while not stop.is_set():
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[worker] += 1
+            except (OSError, http.client.HTTPException):
+                errors[worker] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=10)
+                continue
+            latencies[worker].append(time.perf_counter() - t0)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    merged = sorted(l for per_client in latencies for l in per_client)
+    return len(merged), sum(errors), merged
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dev server against waitress')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Load duration per server')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent keep-alive clients')
+    parser.add_argument('--rows', type=int, default=50000, help='Transactions in the database')
+    args = parser.parse_args()
+    seconds, clients, rows = args.seconds, args.clients, args.rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'serving.db')
+        populate(db_path, rows)
+        print(f"📊 {clients} keep-alive clients for {seconds:.0f}s over {len(PATHS)} endpoints, {rows} transactions")
+
+        for label, args in (('Flask dev server (debug)', ['--dev']),
+                            ('waitress, 8 threads', ['--threads', '8'])):
+            process = start_server(args, db_path)
+            try:
+                drive(1.0, clients)  # let caches and connections settle
+                count, errors, latencies = drive(seconds, clients)
+            finally:
+                stop_server(process)
+            print(f"   {label:26} {count / seconds:8.0f} req/s  "
+                  f"p50 {percentile(latencies, 50) * 1000:6.2f}ms  "
+                  f"p99 {percentile(latencies, 99) * 1000:7.2f}ms  "
+                  f"errors {errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Measure EnnaDatabase() construction time
+
+Three cases:
+  * empty file       - base schema, seeding and every migration
+  * old schema       - a large database as shipped before user_version was
+                       tracked (no indexes, rollup, archived_transactions or
+                       streak columns, archives without name/date range)
+  * already migrated - the common case, a restart of an up-to-date database
+
+Usage (from enna-backend/):
+    python benchmarks/bench_startup.py [--rows 200000] [--repeats 20]
+"""
+import json
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database
+from connection_pool import ConnectionPool
+from database import EnnaDatabase
+
+
+class CountingPool(ConnectionPool):
+    """ConnectionPool that records every statement from the first connection on"""
+    statements = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trace_callback = CountingPool.statements.append
+
+
+# The schema created by the original init_database(), before any migration
+OLD_SCHEMA = '''
+    CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+        color TEXT DEFAULT '#34d399', icon TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER,
+        type TEXT NOT NULL CHECK(type IN ('income', 'expense')), amount REAL NOT NULL,
+        description TEXT, date DATE NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE budget_goals (id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER,
+        monthly_limit REAL NOT NULL, start_date DATE NOT NULL, end_date DATE);
+    CREATE TABLE budget_allocations (id INTEGER PRIMARY KEY AUTOINCREMENT, category_id INTEGER UNIQUE,
+        percentage REAL NOT NULL DEFAULT 0, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE user_stats (id INTEGER PRIMARY KEY AUTOINCREMENT, longest_streak INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE login_days (id INTEGER PRIMARY KEY AUTOINCREMENT, login_date DATE NOT NULL UNIQUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE monthly_archives (id INTEGER PRIMARY KEY AUTOINCREMENT, month_year TEXT NOT NULL UNIQUE,
+        total_income REAL DEFAULT 0, total_expenses REAL DEFAULT 0, net REAL DEFAULT 0,
+        financial_health_score INTEGER DEFAULT 0, savings_score INTEGER DEFAULT 0,
+        budget_score INTEGER DEFAULT 0, consistency_score INTEGER DEFAULT 0,
+        balance_score INTEGER DEFAULT 0, transaction_count INTEGER DEFAULT 0,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+'''
+
+
+def build_old_database(path, rows, seed=11):
+    """A pre-migration database with `rows` transactions, login days and archives"""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.executemany('INSERT INTO categories (name, color, icon) VALUES (?, ?, ?)',
+                     [(f'Category {i}', '#34d399', '📦') for i in range(1, 10)])
+    conn.execute('INSERT INTO user_stats (longest_streak) VALUES (0)')
+    conn.executemany(
+        'INSERT INTO transactions (category_id, type, amount, description, date) VALUES (?, ?, ?, ?, ?)',
+        ((rng.randint(1, 9), 'income' if rng.random() < 0.1 else 'expense',
+          round(rng.uniform(1, 500), 2), f'Merchant {rng.randint(1, 300)}',
+          (start + timedelta(days=rng.randint(0, 3 * 365))).isoformat()) for _ in range(rows))
+    )
+    conn.executemany('INSERT INTO login_days (login_date) VALUES (?)',
+                     [((start + timedelta(days=d)).isoformat(),) for d in range(0, 3 * 365, 2)])
+    conn.executemany('INSERT INTO monthly_archives (month_year) VALUES (?)',
+                     [(f'{year}-{month:02d}',) for year in (2023, 2024) for month in range(1, 13)])
+    conn.commit()
+    conn.close()
+
+
+def count_statements(path):
+    """Statements a restart runs, excluding the per-connection PRAGMA setup"""
+    CountingPool.statements.clear()
+    database.ConnectionPool = CountingPool
+    try:
+        with redirect_stdout(open(os.devnull, 'w')):
+            EnnaDatabase(path).close()
+    finally:
+        database.ConnectionPool = ConnectionPool
+    setup = ('PRAGMA busy_timeout', 'PRAGMA cache_size', 'PRAGMA temp_store',
+             'PRAGMA journal_mode', 'PRAGMA synchronous')
+    return [sql for sql in CountingPool.statements if not sql.startswith(setup)]
+
+
+def time_open(path):
+    t0 = time.perf_counter()
+    with redirect_stdout(open(os.devnull, 'w')):
+        db = EnnaDatabase(path)
+    elapsed = time.perf_counter() - t0
+    version = db.get_connection().execute('PRAGMA user_version').fetchone()[0]
+    db.close()
+    return elapsed, version
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark database startup and migration')
+    parser.add_argument('--rows', type=int, default=200000, help='Transactions in the old-schema database')
+    parser.add_argument('--repeats', type=int, default=20, help='Restarts to time')
+    args = parser.parse_args()
+    rows, repeats = args.rows, args.repeats
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        empty = os.path.join(directory, 'empty.db')
+        results['empty_file_ms'], version = time_open(empty)
+
+        old = os.path.join(directory, 'old.db')
+        build_old_database(old, rows)
+        results['old_schema_ms'], old_version = time_open(old)
+        assert old_version == version, (old_version, version)
+
+        restarts = sorted(time_open(old)[0] for _ in range(repeats))
+        results['migrated_restart_ms'] = restarts[len(restarts) // 2]
+        restart_statements = count_statements(old)
+
+        conn = sqlite3.connect(old)
+        checks = {
+            'categories': conn.execute('SELECT COUNT(*) FROM categories').fetchone()[0],
+            'user_stats_rows': conn.execute('SELECT COUNT(*) FROM user_stats').fetchone()[0],
+            'rollup_rows': conn.execute('SELECT SUM(count) FROM daily_category_totals').fetchone()[0],
+        }
+        conn.close()
+        # Seeding must not add defaults to a database that already has categories
+        assert checks['categories'] == 9 and checks['user_stats_rows'] == 1, checks
+        assert checks['rollup_rows'] == rows, checks
+
+    print(f"📊 EnnaDatabase() startup (schema version {version}, {rows} old-schema transactions)")
+    for name, seconds in results.items():
+        print(f"   {name:22} {seconds * 1000:9.2f}ms")
+    print(f"   restart statements     {len(restart_statements):6d}  ({'; '.join(restart_statements)})")
+    print(json.dumps({**{name: round(seconds * 1000, 3) for name, seconds in results.items()},
+                      'restart_statements': len(restart_statements)}))
+
+
+if __name__ == '__main__':
+    main()
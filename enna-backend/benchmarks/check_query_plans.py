@@ -0,0 +1,208 @@
+"""Verify that EnnaDatabase queries use indexes on a large synthetic dataset
+
+Runs every EnnaDatabase method against a database with many transactions,
+captures each SQL statement it issues, and prints its EXPLAIN QUERY PLAN.
+Exits non-zero if any statement SCANs a large table - with or without an
+index - outside a LIMIT or the methods in ALLOWED_SCANS.
+
+Usage (from enna-backend/):
+    python benchmarks/check_query_plans.py [--rows 200000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import EnnaDatabase, encode_cursor, encode_search_cursor
+
+# Tables that grow with the user's history; small lookup tables may be scanned
+LARGE_TABLES = {'transactions': 't', 'login_days': None, 'monthly_archives': None,
+                'archived_transactions': None}
+
+# Methods whose full-table statements are intentional, and why
+ALLOWED_SCANS = {
+    'reset_database': 'deletes everything',
+    'rebuild_daily_totals': 'rebuilds the rollup from every transaction',
+    'check_daily_totals': 'compares the rollup with every transaction',
+    'get_categorization_state': 'counts archived rows for the categorizer staleness check',
+    'get_archive_totals': 'one stored row per archive, for archive scores',
+    'get_login_days': 'returns every login day',
+    'rebuild_streak_state': 'replays every login day',
+    'record_login': 'an out-of-order login falls back to rebuild_streak_state',
+}
+
+
+def populate(db, count, seed=42):
+    """Fill the database with `count` transactions and some archives/logins"""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    rows = []
+    for _ in range(count):
+        rows.append((
+            'income' if rng.random() < 0.1 else 'expense',
+            rng.randint(100, 50000),
+            f'Merchant {rng.randint(1, 500)}',
+            rng.randint(1, 9),
+            (start + timedelta(days=rng.randint(0, 10 * 365))).isoformat(),
+        ))
+    conn = db.get_connection()
+    conn.executemany(
+        'INSERT INTO transactions (type, amount, description, category_id, date) VALUES (?, ?, ?, ?, ?)',
+        rows
+    )
+    conn.executemany(
+        'INSERT OR IGNORE INTO login_days (login_date) VALUES (?)',
+        [((start + timedelta(days=i)).isoformat(),) for i in range(0, 10 * 365, 2)]
+    )
+    for month in range(120):
+        year, mon = 2015 + month // 12, month % 12 + 1
+        conn.execute(
+            'INSERT INTO monthly_archives (month_year, date_range_start, date_range_end) VALUES (?, ?, ?)',
+            (f'{year}-{mon:02d}', f'{year}-{mon:02d}-01', f'{year}-{mon:02d}-28')
+        )
+    conn.executemany(
+        'INSERT INTO archived_transactions (archive_id, type, amount, description, category_id, date) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        [(1 + i % 120, row[0], row[1], row[2], row[3], row[4]) for i, row in enumerate(rows)]
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+
+
+def method_calls():
+    """(method name, args) for every EnnaDatabase method that touches the DB"""
+    return [
+        ('get_transactions', (), {}),
+        ('get_transactions', (), {'limit': 50, 'type': 'expense'}),
+        ('get_transactions_page', (), {'limit': 50, 'cursor': encode_cursor('2020-06-01', 1000)}),
+        ('get_transactions_page', (), {'type': 'income', 'start_date': '2020-01-01', 'end_date': '2020-12-31',
+                                       'cursor': encode_cursor('2020-06-01', 1000)}),
+        ('get_transactions_page', (), {'category_id': 3, 'min_amount': 10, 'max_amount': 100}),
+        ('search_transactions', ('Merchant 42',), {}),
+        ('search_transactions', ('merch',), {'sort': 'date'}),
+        ('search_transactions', ('merch',), {'cursor': encode_search_cursor('date', 0.0, '2020-06-01', 'transaction', 1000)}),
+        ('search_transactions', ('merchant 7',), {'scope': 'all', 'category_id': 3, 'start_date': '2020-01-01'}),
+        ('add_transaction', ('expense', 12.5, 'Coffee', 1, '2024-05-01'), {}),
+        ('add_transactions_bulk', ([{'type': 'expense', 'amount': 5, 'date': '2024-05-02'}],), {}),
+        ('update_transaction', (1,), {'amount': 10.0}),
+        ('delete_transaction', (2,), {}),
+        ('get_categories', (), {}),
+        ('get_categorization_state', (), {}),
+        ('get_categorized_descriptions', (), {}),
+        ('get_categorized_descriptions', (15000, 100), {}),
+        ('add_category', ('Pets',), {}),
+        ('save_budget_allocation', (1, 25.0), {}),
+        ('get_budget_allocations', (), {}),
+        ('get_budget_status', (), {}),
+        ('get_budget_status', ('2020-01-01', '2020-12-31'), {}),
+        ('save_budget_allocations', ([(1, 20.0), (2, 15.0)],), {}),
+        ('get_category_spending', (1, 3650), {}),
+        ('get_summary', (), {}),
+        ('get_summary', ('2020-01-01', '2020-01-31'), {}),
+        ('get_summary', ('2020-01-01',), {}),
+        ('get_period_totals', ([('2020-01-01', '2020-01-31'), ('2020-02-01', '2020-02-29'), (None, None)],), {}),
+        ('get_archive_totals', (), {}),
+        ('get_timeseries', ('2018-01-01', '2020-12-31', 'week'), {'by_category': True}),
+        ('get_timeseries', ('2020-01-01', '2020-03-31', 'day'), {}),
+        ('check_daily_totals', (), {}),
+        ('rebuild_daily_totals', (), {}),
+        ('get_streak_data', ('2024-12-30', '2024-12-30'), {}),
+        ('record_login', ('2024-12-20',), {}),
+        ('rebuild_streak_state', (), {}),
+        ('get_login_days', (), {}),
+        ('get_user_name', (), {}),
+        ('set_user_name', ('Sam',), {}),
+        ('get_user_emoji', (), {}),
+        ('set_user_emoji', ('🌸',), {}),
+        ('create_monthly_archive', ('2030-01', {}, {}),
+         {'transactions_json': '[{"type": "expense", "amount": 5, "date": "2030-01-02"}]'}),
+        ('archive_period', ('2016-03-29', '2016-03-31'), {'month_year': '2031-01'}),
+        ('get_monthly_archives', (), {}),
+        ('get_archive_by_month', ('2020-01',), {}),
+        ('get_archive_transactions', (5,), {'limit': 50}),
+        ('get_archive_transactions', (5,), {'limit': 50, 'cursor': encode_cursor('2020-06-01', 1000)}),
+        ('check_if_current_month_archived', (), {}),
+        ('get_monthly_spending_chart_data', (), {}),
+        ('get_next_archive_start_date', (), {}),
+        ('update_archive_name', (1, 'Renamed'), {}),
+        ('clear_transactions_in_range', ('2016-01-01', '2016-01-07'), {}),
+        ('clear_current_month_transactions', (), {}),
+        ('reset_database', (), {}),
+    ]
+
+
+def full_scans(plan, sql):
+    """Return the plan lines that scan a large table
+
+    SEARCH seeks an index; any SCAN of a large table reads all of it, even
+    USING (COVERING) INDEX, unless a LIMIT stops an ordered index walk early
+    - which it cannot when the same step sorts the rows afterwards.
+    `plan` is EXPLAIN QUERY PLAN's (id, parent, detail) rows.
+    """
+    limited = re.search(r'\bLIMIT\b', sql, re.IGNORECASE) is not None
+    sorted_steps = {parent for _, parent, line in plan if line.startswith('USE TEMP B-TREE FOR ORDER BY')}
+    bad = []
+    for _, parent, line in plan:
+        match = re.match(r'SCAN (\w+)', line)
+        if not match:
+            continue
+        if limited and 'INDEX' in line and parent not in sorted_steps:
+            continue
+        name = match.group(1)
+        if name in LARGE_TABLES or name in LARGE_TABLES.values():
+            bad.append(line)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check EnnaDatabase query plans for full table scans')
+    parser.add_argument('--rows', type=int, default=200000, help='Transactions to populate')
+    args = parser.parse_args()
+    count = args.rows
+    failures = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        with redirect_stdout(open(os.devnull, 'w')):
+            db = EnnaDatabase(os.path.join(directory, 'plans.db'))
+        populate(db, count)
+        conn = db.get_connection()
+
+        for name, args, kwargs in method_calls():
+            statements = []
+            db.pool.set_trace_callback(statements.append)
+            with redirect_stdout(open(os.devnull, 'w')):
+                getattr(db, name)(*args, **kwargs)
+            db.pool.set_trace_callback(None)
+
+            # Trigger sub-statements are reported again under the same SQL text
+            for sql in dict.fromkeys(statements):
+                if not re.match(r'\s*(WITH|SELECT|UPDATE|DELETE|INSERT)', sql, re.IGNORECASE):
+                    continue
+                plan = [(row[0], row[1], row[3]) for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+                scans = full_scans(plan, sql)
+                flag = '❌' if scans and name not in ALLOWED_SCANS else '✅'
+                print(f"{flag} {name}: {' '.join(sql.split())[:100]}")
+                if scans and name in ALLOWED_SCANS:
+                    print(f"      (full scan allowed: {ALLOWED_SCANS[name]})")
+                for *_, line in plan:
+                    print(f"      {line}")
+                if scans and name not in ALLOWED_SCANS:
+                    failures.append((name, sql, scans))
+
+        db.close()
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} statement(s) fall back to a full table scan on {count} rows")
+        sys.exit(1)
+    print(f"✅ No full scans of large tables on {count} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Deterministic synthetic data for the benchmarks
+
+Builds an Enna database through EnnaDatabase itself, so the rollup, streak
+state and archived transactions are exactly what the app would have written:
+
+  * transactions spread over five years across the default categories
+  * years of login_days with realistic gaps, and the streak state for them
+  * hundreds of monthly_archives created from a transactions_json payload,
+    the way the frontend archived months before archive_period existed
+  * a budget allocation for every category
+
+The same seed and end date always produce the same database.
+
+Usage (from enna-backend/):
+    python benchmarks/datagen.py PATH [--size 10k|100k|1m] [--seed 42] [--end YYYY-MM-DD]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database import EnnaDatabase
+import scoring
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+# Archives grow with the dataset but stay in the hundreds
+ARCHIVES = {'10k': 120, '100k': 240, '1m': 360}
+TRANSACTION_YEARS = 5
+LOGIN_YEARS = 4
+ARCHIVED_PER_MONTH = 40
+CHUNK_SIZE = 50_000
+
+# (merchant, category name, low amount, high amount)
+MERCHANTS = [
+    ('Whole Foods Market', 'Food & Dining', 8, 180),
+    ('Starbucks', 'Food & Dining', 3, 15),
+    ('Chipotle', 'Food & Dining', 9, 40),
+    ('Shell Gas', 'Transportation', 25, 80),
+    ('Uber Trip', 'Transportation', 7, 60),
+    ('Netflix.com', 'Entertainment', 10, 23),
+    ('Steam Games', 'Entertainment', 5, 70),
+    ('Comcast Internet', 'Bills & Utilities', 60, 120),
+    ('City Water', 'Bills & Utilities', 30, 90),
+    ('Amazon Mktp', 'Shopping', 5, 300),
+    ('Target', 'Shopping', 10, 200),
+    ('CVS Pharmacy', 'Healthcare', 5, 90),
+    ('Visa Card Payment', 'Debt', 100, 900),
+    ('Misc Purchase', 'Other', 1, 100),
+]
+PAYERS = ['Payroll Deposit', 'Freelance Invoice', 'Interest Payment']
+
+
+def _transactions(rng, count, start, days, category_ids):
+    """Yield `count` transaction dicts dated between start and start + days"""
+    for _ in range(count):
+        when = (start + timedelta(days=rng.randrange(days))).isoformat()
+        if rng.random() < 0.08:
+            yield {
+                'type': 'income',
+                'amount': round(rng.uniform(200, 4000), 2),
+                'description': rng.choice(PAYERS),
+                'category_id': category_ids['Income'],
+                'date': when,
+            }
+        else:
+            merchant, category, low, high = rng.choice(MERCHANTS)
+            yield {
+                'type': 'expense',
+                'amount': round(rng.uniform(low, high), 2),
+                'description': f'{merchant} #{rng.randint(1, 999)}',
+                'category_id': category_ids[category],
+                'date': when,
+            }
+
+
+def _months_before(first, count):
+    """(year, month) of the `count` calendar months before `first`, newest first"""
+    year, month = first.year, first.month
+    for _ in range(count):
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        yield year, month
+
+
+def generate(path, transactions, archives=None, seed=42, end=None):
+    """Create a populated database at path; returns a description of its contents"""
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=TRANSACTION_YEARS * 365)
+    archives = ARCHIVES['10k'] if archives is None else archives
+
+    with redirect_stdout(open(os.devnull, 'w')):
+        db = EnnaDatabase(path)
+    try:
+        category_ids = {c['name']: c['id'] for c in db.get_categories()}
+
+        rows = _transactions(rng, transactions, start, (end - start).days + 1, category_ids)
+        inserted = 0
+        # Shared across chunks, so identical generated rows are all kept
+        occurrences = {}
+        while inserted < transactions:
+            chunk = [next(rows) for _ in range(min(CHUNK_SIZE, transactions - inserted))]
+            db.add_transactions_bulk(chunk, occurrences)
+            inserted += len(chunk)
+
+        # Log in on roughly two days out of three, with the odd week away
+        login_start = end - timedelta(days=LOGIN_YEARS * 365)
+        login_days, away = [], 0
+        for offset in range((end - login_start).days + 1):
+            if away:
+                away -= 1
+            elif rng.random() < 0.01:
+                away = rng.randint(3, 10)
+            elif rng.random() < 0.67:
+                login_days.append(((login_start + timedelta(days=offset)).isoformat(),))
+        with db.pool.writer() as conn:
+            conn.executemany('INSERT OR IGNORE INTO login_days (login_date) VALUES (?)', login_days)
+            conn.commit()
+        db.rebuild_streak_state()
+
+        # Archived months precede the live transactions
+        category_names = {v: k for k, v in category_ids.items()}
+        for year, month in _months_before(start, archives):
+            month_start = date(year, month, 1)
+            archived = [{
+                'id': None,
+                'category_name': category_names[t['category_id']],
+                **t
+            } for t in _transactions(rng, ARCHIVED_PER_MONTH, month_start, 28, category_ids)]
+            income = sum(t['amount'] for t in archived if t['type'] == 'income')
+            expenses = sum(t['amount'] for t in archived if t['type'] == 'expense')
+            db.create_monthly_archive(
+                f'{year}-{month:02d}',
+                {'total_income': income, 'total_expenses': expenses,
+                 'net': income - expenses, 'transaction_count': len(archived)},
+                scoring.calculate_scores(income, expenses, len(archived)),
+                transactions_json=json.dumps(archived),
+                date_range={'start': month_start.isoformat(),
+                            'end': (month_start + timedelta(days=27)).isoformat()},
+                name=f'Archive {year}-{month:02d}'
+            )
+
+        for category_id in category_ids.values():
+            db.save_budget_allocation(category_id, round(100 / len(category_ids), 2))
+
+        with db.pool.writer() as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        db.close()
+
+    return {
+        'transactions': transactions,
+        'archives': archives,
+        'archived_transactions': archives * ARCHIVED_PER_MONTH,
+        'login_days': len(login_days),
+        'seed': seed,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Enna database')
+    parser.add_argument('path')
+    parser.add_argument('--size', choices=sorted(SIZES), default='10k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end', type=date.fromisoformat, default=None,
+                        help='Last transaction date (default: today)')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    info = generate(args.path, SIZES[args.size], ARCHIVES[args.size], args.seed, args.end)
+    print(f"✅ Generated {args.path} in {time.perf_counter() - t0:.1f}s")
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == '__main__':
+    main()
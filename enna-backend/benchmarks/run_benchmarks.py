@@ -0,0 +1,398 @@
+"""Time every EnnaDatabase method and every Flask route on synthetic data
+
+Generates (or reuses) a datagen.py database, then times each case
+`--repeats` times with the read cache cleared before every call, so cached
+aggregates are measured doing their real work. Routes go through Flask's
+test client against their own copy of the database. Write cases run after
+the reads; the destructive ones (archiving, clearing, reset) run last.
+
+Results are written as JSON. With --baseline, each case's median is compared
+against a stored result file and regressions beyond --threshold are listed;
+the exit status is 1 if any were found.
+
+Usage (from enna-backend/):
+    python benchmarks/run_benchmarks.py [--size 10k|100k|1m] [--repeats 5]
+        [--data PATH] [--output results.json] [--baseline baseline.json]
+        [--threshold 0.25] [--only methods|routes]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS, '..'))
+
+from database import EnnaDatabase
+import datagen
+import scoring
+
+# A slower median only counts as a regression if it is also this much slower
+MIN_REGRESSION_MS = 0.2
+
+
+class Context:
+    """Shared state for cases: the database and the values cases draw from"""
+
+    def __init__(self, db, info):
+        self.db = db
+        self.info = info
+        end = date.fromisoformat(info['end_date'])
+        self.end = end
+        self.year_ago = (end - timedelta(days=365)).isoformat()
+        conn = db.get_connection()
+        self.transaction_ids = [row[0] for row in conn.execute(
+            'SELECT id FROM transactions ORDER BY id DESC LIMIT 1000')]
+        self.archive_id, self.archive_month = conn.execute(
+            'SELECT id, month_year FROM monthly_archives ORDER BY month_year DESC LIMIT 1').fetchone()
+        self.second_page = db.get_transactions_page(limit=100)['next_cursor']
+        # Whole months at the start of the live data, consumed by the archiving cases
+        self._month = (date.fromisoformat(info['start_date']) + timedelta(days=32)).replace(day=1)
+        self._counter = 0
+
+    def next_id(self):
+        """A transaction id no earlier case has deleted"""
+        return self.transaction_ids.pop()
+
+    def next_month(self):
+        """(start, end) of the next unused calendar month of live data"""
+        first = self._month
+        self._month = (first + timedelta(days=32)).replace(day=1)
+        return first.isoformat(), (self._month - timedelta(days=1)).isoformat()
+
+    def unique(self):
+        self._counter += 1
+        return self._counter
+
+
+def method_cases():
+    """(name, call(ctx), repeat?) for every EnnaDatabase method, reads first"""
+    return [
+        ('get_transactions', lambda c: c.db.get_transactions(limit=100), True),
+        ('get_transactions_page', lambda c: c.db.get_transactions_page(limit=100), True),
+        ('get_transactions_page[cursor]',
+         lambda c: c.db.get_transactions_page(limit=100, cursor=c.second_page), True),
+        ('get_transactions_page[search]',
+         lambda c: c.db.get_transactions_page(limit=100, search='Starbucks'), True),
+        ('search_transactions', lambda c: c.db.search_transactions('starbucks'), True),
+        ('search_transactions[rare]', lambda c: c.db.search_transactions('734'), True),
+        ('search_transactions[all scopes]',
+         lambda c: c.db.search_transactions('payroll', scope='all', sort='date'), True),
+        ('get_categories', lambda c: c.db.get_categories(), True),
+        ('get_categorization_state', lambda c: c.db.get_categorization_state(), True),
+        ('get_categorized_descriptions', lambda c: c.db.get_categorized_descriptions(), True),
+        ('get_budget_allocations', lambda c: c.db.get_budget_allocations(), True),
+        ('get_budget_status', lambda c: c.db.get_budget_status(), True),
+        ('get_budget_status[year]', lambda c: c.db.get_budget_status(c.year_ago, c.end.isoformat()), True),
+        ('get_category_spending', lambda c: c.db.get_category_spending(1, days=30), True),
+        ('get_summary', lambda c: c.db.get_summary(), True),
+        ('get_summary[year]',
+         lambda c: c.db.get_summary(c.year_ago, c.end.isoformat()), True),
+        ('get_period_totals[12 months]',
+         lambda c: c.db.get_period_totals(scoring.rolling_months(12, c.end)), True),
+        ('get_archive_totals', lambda c: c.db.get_archive_totals(), True),
+        ('get_timeseries[day]',
+         lambda c: c.db.get_timeseries(c.year_ago, c.end.isoformat(), 'day'), True),
+        ('get_timeseries[month, by_category]',
+         lambda c: c.db.get_timeseries(c.info['start_date'], c.end.isoformat(), 'month',
+                                       by_category=True), True),
+        ('check_daily_totals', lambda c: c.db.check_daily_totals(), True),
+        ('get_streak_state', lambda c: c.db.get_streak_state(), True),
+        ('get_current_streak', lambda c: c.db.get_current_streak(), True),
+        ('get_longest_streak', lambda c: c.db.get_longest_streak(), True),
+        ('get_streak_data', lambda c: c.db.get_streak_data(), True),
+        ('get_login_days', lambda c: c.db.get_login_days(), True),
+        ('get_user_name', lambda c: c.db.get_user_name(), True),
+        ('get_user_emoji', lambda c: c.db.get_user_emoji(), True),
+        ('get_monthly_archives', lambda c: c.db.get_monthly_archives(), True),
+        ('get_archive_by_month', lambda c: c.db.get_archive_by_month(c.archive_month), True),
+        ('get_archive_transactions', lambda c: c.db.get_archive_transactions(c.archive_id), True),
+        ('check_if_current_month_archived', lambda c: c.db.check_if_current_month_archived(), True),
+        ('get_monthly_spending_chart_data', lambda c: c.db.get_monthly_spending_chart_data(), True),
+        ('get_next_archive_start_date', lambda c: c.db.get_next_archive_start_date(), True),
+        ('warm_up', lambda c: c.db.warm_up(), True),
+
+        ('add_transaction',
+         lambda c: c.db.add_transaction('expense', 12.5, 'Benchmark', 1, c.end.isoformat()), True),
+        ('add_transactions_bulk[100]', lambda c: c.db.add_transactions_bulk([
+            {'type': 'expense', 'amount': 1.0 + i, 'description': f'Benchmark bulk {c.unique()}',
+             'category_id': 1 + i % 9, 'date': c.end.isoformat()} for i in range(100)]), True),
+        # The same rows every call, so all but the first call skip them as duplicates
+        ('add_transactions_bulk[100 duplicates]', lambda c: c.db.add_transactions_bulk([
+            {'type': 'expense', 'amount': 1.0 + i, 'description': 'Benchmark reimport',
+             'category_id': 1 + i % 9, 'date': c.end.isoformat()} for i in range(100)]), True),
+        ('update_transaction', lambda c: c.db.update_transaction(c.next_id(), amount=42.0), True),
+        ('delete_transaction', lambda c: c.db.delete_transaction(c.next_id()), True),
+        ('add_category', lambda c: c.db.add_category(f'Benchmark {c.unique()}'), True),
+        ('save_budget_allocation', lambda c: c.db.save_budget_allocation(1, 10.0), True),
+        ('save_budget_allocations[9]',
+         lambda c: c.db.save_budget_allocations([(i, 11.0) for i in range(1, 10)]), True),
+        ('record_login',
+         lambda c: c.db.record_login((c.end + timedelta(days=c.unique())).isoformat()), True),
+        ('rebuild_streak_state', lambda c: c.db.rebuild_streak_state(), True),
+        ('update_longest_streak', lambda c: c.db.update_longest_streak(1), True),
+        ('set_user_name', lambda c: c.db.set_user_name('Benchmark'), True),
+        ('set_user_emoji', lambda c: c.db.set_user_emoji('🌸'), True),
+        ('rebuild_daily_totals', lambda c: c.db.rebuild_daily_totals(), True),
+        ('create_monthly_archive', lambda c: c.db.create_monthly_archive(
+            f'1900-{c.unique():02d}', {'total_income': 0, 'total_expenses': 0, 'net': 0,
+                                       'transaction_count': 0},
+            {'overall': 0, 'savings': 0, 'budget': 0, 'consistency': 0, 'balance': 0}), True),
+        ('update_archive_name', lambda c: c.db.update_archive_name(c.archive_id, 'Renamed'), True),
+        ('archive_period', lambda c: c.db.archive_period(*c.next_month()), True),
+        ('clear_transactions_in_range', lambda c: c.db.clear_transactions_in_range(*c.next_month()), True),
+        ('clear_current_month_transactions', lambda c: c.db.clear_current_month_transactions(), False),
+        ('reset_database', lambda c: c.db.reset_database(), False),
+    ]
+
+
+def route_cases():
+    """(name, call(client, ctx), repeat?) for every route, reads first"""
+    def get(path):
+        return lambda client, c: client.get(path.format(c=c))
+
+    def post(path, body):
+        return lambda client, c: client.post(path.format(c=c), json=body(c) if callable(body) else body)
+
+    def csv_upload(client, c):
+        # Fresh descriptions each call, or every call after the first would only skip duplicates
+        rows = ''.join(f'{c.end:%m/%d/%Y},Starbucks #{c.unique()},-{i}.25\n' for i in range(1, 201))
+        return client.post('/api/transactions/import', content_type='multipart/form-data', data={
+            'file': (io.BytesIO(f'Date,Description,Amount\n{rows}'.encode()), 'export.csv')})
+
+    batch = {'operations': [{'op': 'summary'}, {'op': 'transactions', 'params': {'limit': 50}},
+                            {'op': 'categories'}, {'op': 'budgets'}]}
+    # Two thousand import-style descriptions, a few merchants the history has never seen
+    merchants = [merchant for merchant, *_ in datagen.MERCHANTS] + ['Corner Bakery', 'ACH Transfer']
+    descriptions = {'descriptions': [f'{merchants[i % len(merchants)]} #{i}' for i in range(2000)]}
+    return [
+        ('GET /', get('/'), True),
+        ('GET /api/hello', get('/api/hello'), True),
+        ('GET /api/health', get('/api/health'), True),
+        ('GET /api/cache/stats', get('/api/cache/stats'), True),
+        ('GET /api/metrics', get('/api/metrics'), True),
+        ('GET /api/debug/slow-queries', get('/api/debug/slow-queries'), True),
+        ('GET /api/transactions', get('/api/transactions?limit=100'), True),
+        ('GET /api/transactions?search', get('/api/transactions?limit=100&search=Starbucks'), True),
+        ('GET /api/transactions/search', get('/api/transactions/search?q=whole+fo'), True),
+        ('GET /api/categories', get('/api/categories'), True),
+        ('GET /api/budgets', get('/api/budgets'), True),
+        ('GET /api/budget', get('/api/budget'), True),
+        ('GET /api/budgets/status', get('/api/budgets/status'), True),
+        ('GET /api/categories/<id>/spending', get('/api/categories/1/spending?days=30'), True),
+        ('GET /api/summary', get('/api/summary'), True),
+        ('GET /api/scores?months', get('/api/scores?months=12'), True),
+        ('GET /api/scores?scope=archives', get('/api/scores?scope=archives'), True),
+        ('GET /api/reports/timeseries', get('/api/reports/timeseries?bucket=day'), True),
+        ('GET /api/reports/timeseries?by_category',
+         get('/api/reports/timeseries?bucket=month&by_category=true'), True),
+        ('GET /api/streaks', get('/api/streaks'), True),
+        ('GET /api/login-days', get('/api/login-days'), True),
+        ('POST /api/batch', post('/api/batch', batch), True),
+        ('POST /api/categorize/batch', post('/api/categorize/batch', descriptions), True),
+        ('GET /api/user/name', get('/api/user/name'), True),
+        ('GET /api/user/emoji', get('/api/user/emoji'), True),
+        ('GET /api/archives', get('/api/archives'), True),
+        ('GET /api/archives/<month_year>', get('/api/archives/{c.archive_month}'), True),
+        ('GET /api/archives/<id>/transactions', get('/api/archives/{c.archive_id}/transactions'), True),
+        ('GET /api/archives/check-current', get('/api/archives/check-current'), True),
+        ('GET /api/archives/monthly-spending', get('/api/archives/monthly-spending'), True),
+        ('GET /api/archives/next-start-date', get('/api/archives/next-start-date'), True),
+
+        ('POST /api/transactions', post('/api/transactions', lambda c: {
+            'type': 'expense', 'amount': 12.5, 'description': 'Benchmark',
+            'category_id': 1, 'date': c.end.isoformat()}), True),
+        ('POST /api/transactions/bulk', post('/api/transactions/bulk', lambda c: {'transactions': [
+            {'type': 'expense', 'amount': 1.0 + i, 'description': f'Benchmark bulk {c.unique()}',
+             'category_id': 1 + i % 9, 'date': c.end.isoformat()} for i in range(100)]}), True),
+        ('POST /api/transactions/import', csv_upload, True),
+        ('PUT /api/transactions/<id>',
+         lambda client, c: client.put(f'/api/transactions/{c.next_id()}', json={'amount': 42.0}), True),
+        ('DELETE /api/transactions/<id>',
+         lambda client, c: client.delete(f'/api/transactions/{c.next_id()}'), True),
+        ('POST /api/categories',
+         post('/api/categories', lambda c: {'name': f'Benchmark {c.unique()}'}), True),
+        ('POST /api/budgets', post('/api/budgets', {'category_id': 1, 'percentage': 10}), True),
+        ('POST /api/budgets/bulk', post('/api/budgets/bulk', {'budgets': [
+            {'category_id': i, 'percentage': 11} for i in range(1, 10)]}), True),
+        ('POST /api/user/name', post('/api/user/name', {'name': 'Benchmark'}), True),
+        ('POST /api/user/emoji', post('/api/user/emoji', {'emoji': '🌸'}), True),
+        ('PUT /api/archives/<id>/rename',
+         lambda client, c: client.put(f'/api/archives/{c.archive_id}/rename', json={'name': 'Renamed'}), True),
+        ('POST /api/database/check-rollup', post('/api/database/check-rollup', {}), True),
+        ('POST /api/archives', post('/api/archives', lambda c: dict(zip(
+            ('month_year', 'date_range'), archive_body(c.next_month())))), True),
+        ('POST /api/database/reset', post('/api/database/reset', {}), False),
+    ]
+
+
+def archive_body(month):
+    start, end = month
+    return start[:7], {'start': start, 'end': end}
+
+
+def time_case(call, repeats, clear_cache, check=None):
+    """Milliseconds for each of `repeats` calls, clearing the read cache before each"""
+    samples = []
+    for _ in range(repeats):
+        clear_cache()
+        t0 = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - t0) * 1000)
+        if check:
+            check(result)
+    return {
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'max_ms': round(max(samples), 4),
+        'repeats': len(samples),
+    }
+
+
+def run_methods(path, info, repeats):
+    with redirect_stdout(io.StringIO()):
+        db = EnnaDatabase(path)
+    ctx = Context(db, info)
+    results = {}
+    try:
+        for name, call, repeat in method_cases():
+            results[f'method:{name}'] = time_case(lambda: call(ctx), repeats if repeat else 1,
+                                                  db.cache.clear)
+            print(f"   {name:40} {results[f'method:{name}']['median_ms']:10.3f}ms")
+    finally:
+        db.close()
+    return results
+
+
+def run_routes(path, info, repeats):
+    os.environ['ENNA_DB_PATH'] = path
+    with redirect_stdout(io.StringIO()):
+        import app as app_module
+    client = app_module.app.test_client()
+    ctx = Context(app_module.db, info)
+
+    def check(response):
+        if response.status_code >= 400:
+            raise RuntimeError(f'{response.status_code}: {response.get_data(as_text=True)[:200]}')
+
+    results = {}
+    try:
+        for name, call, repeat in route_cases():
+            results[f'route:{name}'] = time_case(lambda: call(client, ctx), repeats if repeat else 1,
+                                                 app_module.db.cache.clear, check)
+            print(f"   {name:40} {results[f'route:{name}']['median_ms']:10.3f}ms")
+    finally:
+        app_module.db.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Cases whose median is more than `threshold` slower than the baseline's"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        if ratio > 1 + threshold and result['median_ms'] - before['median_ms'] > MIN_REGRESSION_MS:
+            regressions.append({
+                'case': name,
+                'baseline_ms': before['median_ms'],
+                'median_ms': result['median_ms'],
+                'ratio': round(ratio, 2),
+            })
+    return regressions
+
+
+def copy_database(source, directory, name):
+    """Copy a checkpointed database so each run starts from the same data"""
+    target = os.path.join(directory, name)
+    shutil.copyfile(source, target)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every EnnaDatabase method and route')
+    parser.add_argument('--size', choices=sorted(datagen.SIZES), default='10k')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data', help='Generated database to reuse (created there if missing)')
+    parser.add_argument('--output', help='Write results JSON here (default: stdout)')
+    parser.add_argument('--baseline', help='Results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Slowdown ratio above which a case is a regression (default 0.25)')
+    parser.add_argument('--only', choices=('methods', 'routes'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = args.data or os.path.join(directory, 'source.db')
+        info_path = source + '.json'
+        if os.path.exists(source) and os.path.exists(info_path):
+            with open(info_path) as f:
+                info = json.load(f)
+            print(f"📂 Reusing {source}", file=sys.stderr)
+        else:
+            t0 = time.perf_counter()
+            info = datagen.generate(source, datagen.SIZES[args.size], datagen.ARCHIVES[args.size],
+                                    args.seed)
+            with open(info_path, 'w') as f:
+                json.dump(info, f)
+            print(f"🏗️ Generated {info['transactions']} transactions in "
+                  f"{time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+        results = {}
+        with redirect_stdout(sys.stderr):
+            if args.only != 'routes':
+                print("⏱️ EnnaDatabase methods")
+                results.update(run_methods(copy_database(source, directory, 'methods.db'),
+                                           info, args.repeats))
+            if args.only != 'methods':
+                print("⏱️ Flask routes")
+                results.update(run_routes(copy_database(source, directory, 'routes.db'),
+                                          info, args.repeats))
+
+    report = {
+        'meta': {
+            **info,
+            'repeats': args.repeats,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report['regressions'] = regressions
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for r in regressions:
+                print(f"   {r['case']:48} {r['baseline_ms']:9.3f}ms -> {r['median_ms']:9.3f}ms "
+                      f"({r['ratio']}x)", file=sys.stderr)
+        else:
+            print(f"✅ No regressions beyond {args.threshold:.0%}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Versioned LRU cache for EnnaDatabase reads
+
+Every write bumps a monotonically increasing data version. Cached results
+are keyed on (method, arguments, data version), so a write invalidates
+everything at once without tracking which tables a read touched, and the
+version doubles as an HTTP ETag for the aggregate endpoints.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ReadCache:
+    """Thread-safe LRU cache invalidated by a global data version"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = 0
+        # Distinguishes versions across restarts so stale ETags never match
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    def bump(self):
+        """Record that the data changed; every cached entry becomes stale"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            return self.version
+
+    def etag(self, version=None):
+        """ETag value for a data version (the current one by default)"""
+        return f'{self.boot_id}-{self.version if version is None else version}'
+
+    def get_or_compute(self, key, compute, version=None):
+        """Return the cached value for key, computing and storing it on a miss
+
+        The version is read before computing, so a result that raced with a
+        write is filed under the old version and never served again. Callers
+        reading an older snapshot pass its version; once the data has moved
+        past it they bypass the cache.
+        """
+        with self._lock:
+            bypass = version is not None and version != self.version
+            if not bypass:
+                version = self.version
+                full_key = (key, version)
+                if full_key in self._entries:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return self._entries[full_key]
+            self.misses += 1
+            if bypass:
+                self.bypasses += 1
+
+        value = compute()
+        if bypass:
+            return value
+
+        with self._lock:
+            if version == self.version:
+                self._entries[full_key] = value
+                self._entries.move_to_end(full_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bypasses': self.bypasses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,211 @@
+"""Category suggestions learned from the user's categorized history
+
+CategoryModel indexes categorized descriptions two ways:
+
+  * merchant - the description's words with numbers and punctuation
+    dropped ("Starbucks #734" -> "starbucks"), which recurs exactly for the
+    same payee and decides on its own when it has been seen before
+  * tokens   - each word, weighted by how rare it is across the history,
+    voting for the categories it appeared under
+
+Categorizer keeps one model per EnnaDatabase in step with writes: when the
+data version moves it reads only rows past the last ids it has seen, and
+rebuilds from scratch if the per-category counts no longer add up (an edit,
+delete or archive). Descriptions the model cannot place with confidence fall
+back to the keyword rules the CSV import has always used.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from ingestion import build_category_matcher, default_category_id
+
+# Token votes below this share of the total defer to the keyword rules
+MIN_CONFIDENCE = 0.5
+# Classifications remembered per model, since imports repeat descriptions
+MEMO_ENTRIES = 50000
+
+_WORD = re.compile(r'[^\W\d_]{2,}')
+
+
+def tokenize(description):
+    """Lowercase words of two or more letters, in order"""
+    return _WORD.findall(description.lower()) if description else []
+
+
+class CategoryModel:
+    """Merchant and token counts per category, built up from (description, category_id, count) rows"""
+
+    def __init__(self):
+        self.merchants = defaultdict(Counter)
+        self.tokens = defaultdict(Counter)
+        self.token_rows = Counter()
+        self.rows = 0
+        # What has been read, to check against EnnaDatabase.get_categorization_state
+        self.live_counts = Counter()
+        self.archived_rows = 0
+        self.last_id = 0
+        self.last_archived_id = 0
+        self._memo = {}
+
+    def update(self, batch):
+        """Learn a batch from EnnaDatabase.get_categorized_descriptions"""
+        for description, category_id, count in batch['live']:
+            self.live_counts[category_id or 0] += count
+            self._learn(description, category_id, count)
+        for description, category_id, count in batch['archived']:
+            self.archived_rows += count
+            self._learn(description, category_id, count)
+        self.last_id = max(self.last_id, batch['last_id'])
+        self.last_archived_id = max(self.last_archived_id, batch['last_archived_id'])
+        self._memo.clear()
+
+    def _learn(self, description, category_id, count):
+        if category_id is None:
+            return
+        words = tokenize(description)
+        if not words:
+            return
+        self.merchants[' '.join(words)][category_id] += count
+        for word in set(words):
+            self.tokens[word][category_id] += count
+            self.token_rows[word] += count
+        self.rows += count
+
+    def matches(self, state):
+        """Whether the model has seen exactly the rows the database holds"""
+        live = {category_id: count for category_id, count in self.live_counts.items() if count}
+        return live == state['live'] and self.archived_rows == state['archived']
+
+    def classify(self, description):
+        """(category_id, confidence, source) or (None, 0.0, None) if nothing is known"""
+        result = self._memo.get(description)
+        if result is not None:
+            return result
+
+        words = tokenize(description)
+        merchant = self.merchants.get(' '.join(words)) if words else None
+        if merchant:
+            category_id, count = max(merchant.items(), key=lambda item: (item[1], -item[0]))
+            result = (category_id, count / sum(merchant.values()), 'merchant')
+        else:
+            scores = defaultdict(float)
+            for word in set(words):
+                counts = self.tokens.get(word)
+                if not counts:
+                    continue
+                total = self.token_rows[word]
+                # Words on every row ("payment", "purchase") barely count
+                weight = math.log(1 + self.rows / total)
+                for category_id, count in counts.items():
+                    scores[category_id] += weight * count / total
+            if scores:
+                category_id = max(scores, key=lambda c: (scores[c], -c))
+                result = (category_id, scores[category_id] / sum(scores.values()), 'tokens')
+            else:
+                result = (None, 0.0, None)
+
+        if len(self._memo) >= MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[description] = result
+        return result
+
+    def get_stats(self):
+        return {
+            'rows': self.rows,
+            'merchants': len(self.merchants),
+            'tokens': len(self.tokens),
+            'last_id': self.last_id,
+            'last_archived_id': self.last_archived_id,
+        }
+
+
+class Categorizer:
+    """Suggests categories for descriptions from a model cached on the data version"""
+
+    def __init__(self, db, min_confidence=MIN_CONFIDENCE):
+        self.db = db
+        self.min_confidence = min_confidence
+        self._model = None
+        self._version = None
+        self._keywords = None
+        self._default_id = None
+        # Guards syncing and classification, which read the model's counters
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+        self.updates = 0
+
+    def _sync(self):
+        """Bring the model up to the current data version"""
+        version = self.db.cache.version
+        if version == self._version:
+            return
+        with self.db.snapshot():
+            state = self.db.get_categorization_state()
+            model = self._model
+            if model is not None:
+                model.update(self.db.get_categorized_descriptions(model.last_id, model.last_archived_id))
+                self.updates += 1
+            if model is None or not model.matches(state):
+                model = CategoryModel()
+                model.update(self.db.get_categorized_descriptions())
+                self.rebuilds += 1
+            categories = self.db.get_categories()
+            self._keywords = build_category_matcher(categories, use_default=False)
+            self._default_id = default_category_id(categories)
+        self._model = model
+        # The version read before the snapshot, so a write during it triggers another sync
+        self._version = version
+
+    def _suggest(self, description):
+        category_id, confidence, source = self._model.classify(description)
+        if source != 'merchant' and confidence < self.min_confidence:
+            keyword_id = self._keywords(description or '')
+            if keyword_id is not None:
+                category_id, confidence, source = keyword_id, None, 'keywords'
+            elif category_id is None and self._default_id is not None:
+                category_id, confidence, source = self._default_id, None, 'default'
+        return {
+            'category_id': category_id,
+            'confidence': round(confidence, 4) if confidence is not None else None,
+            'source': source,
+        }
+
+    def categorize_many(self, descriptions):
+        """Classify descriptions in one pass
+
+        Returns a list of {'category_id', 'confidence', 'source'} in input
+        order; source is 'merchant', 'tokens', 'keywords', 'default' (the
+        Other category) or None.
+        """
+        with self._lock:
+            self._sync()
+            return [self._suggest(description) for description in descriptions]
+
+    def categorize(self, description):
+        """The suggested category id for one description, or None"""
+        return self.categorize_many([description])[0]['category_id']
+
+    def matcher(self):
+        """A categorize function for a long import: syncs now, not after every chunk
+
+        Otherwise each inserted chunk would move the data version and the
+        import would keep re-reading its own guesses.
+        """
+        with self._lock:
+            self._sync()
+
+        def match(description):
+            with self._lock:
+                return self._suggest(description)['category_id']
+        return match
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'version': self._version,
+                'rebuilds': self.rebuilds,
+                'updates': self.updates,
+                **(self._model.get_stats() if self._model else {}),
+            }
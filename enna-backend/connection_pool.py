@@ -0,0 +1,334 @@
+"""SQLite connection management for EnnaDatabase
+
+One writer connection, guarded by a lock, plus a bounded pool of read-only
+reader connections. The database runs in WAL mode, so readers see the last
+committed state and never wait behind a write (a CSV import, an archive)
+in progress on the writer.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+DEFAULT_READERS = 4
+BUSY_TIMEOUT_MS = 5000
+# Negative cache_size is in KiB: 16 MB page cache per connection
+CACHE_SIZE_KB = 16000
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports time spent in execute and fetch calls to the pool's metrics
+
+    With a slow-query log on the connection, execute and fetch time is also
+    summed per statement, and the statement is logged once the total crosses
+    the log's threshold.
+    """
+    _sql = None
+    _parameters = None
+    _elapsed = 0.0
+
+    def _record(self, started, statements):
+        elapsed = perf_counter() - started
+        conn = self.connection
+        conn.metrics.record_sql(elapsed, statements)
+        log = conn.slow_query_log
+        if log is not None and self._sql is not None:
+            before = self._elapsed
+            self._elapsed = before + elapsed
+            if before < log.threshold_seconds <= self._elapsed:
+                log.record(conn, self._sql, self._parameters, self._elapsed)
+
+    def execute(self, sql, parameters=()):
+        self._sql, self._parameters, self._elapsed = sql, parameters, 0.0
+        started = perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(started, 1)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql, self._parameters, self._elapsed = sql, None, 0.0
+        started = perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(started, 1)
+
+    def executescript(self, script):
+        self._sql, self._parameters, self._elapsed = script, None, 0.0
+        started = perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self._record(started, 1)
+
+    def fetchone(self):
+        started = perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._record(started, 0)
+
+    def fetchmany(self, size=None):
+        started = perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._record(started, 0)
+
+    def fetchall(self):
+        started = perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._record(started, 0)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements all go through TimedCursor
+
+    Iterating a cursor directly is not timed; the hot paths use fetchall().
+    """
+    metrics = None
+    # A profiling.SlowQueryLog, or None when slow-query logging is off
+    slow_query_log = None
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        started = perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.metrics.record_sql(perf_counter() - started, 0)
+
+
+class ConnectionPool:
+    """One writer connection plus a pool of read-only reader connections
+
+    EnnaDatabase methods run inside `writer()` or `reader()`; whichever
+    connection the current thread holds is available from `current()`, so
+    nested calls reuse it instead of checking out another one.
+    """
+
+    def __init__(self, db_path, readers=DEFAULT_READERS, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 cache_size_kb=CACHE_SIZE_KB, metrics=None, slow_query_log=None):
+        self.db_path = db_path
+        # A metrics.Metrics; when set, statements and connection waits are timed
+        self.metrics = metrics
+        # A profiling.SlowQueryLog (needs metrics); None leaves it off
+        self.slow_query_log = slow_query_log
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.max_readers = readers
+        # An in-memory database is private to its connection, so share the writer
+        self.shared_writer = db_path == ':memory:' or readers < 1
+
+        self._writer = None
+        self._write_lock = threading.RLock()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(readers, 1))
+        self._all_readers = []
+        self._local = threading.local()
+        self._trace_callback = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'writes': 0,
+            'reads': 0,
+            'readers_opened': 0,
+        }
+
+    def _connect(self, read_only):
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            factory=TimedConnection if self.metrics is not None else sqlite3.Connection
+        )
+        if self.metrics is not None:
+            conn.metrics = self.metrics
+            conn.slow_query_log = self.slow_query_log
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            if self.db_path != ':memory:':
+                conn.execute('PRAGMA journal_mode = WAL')
+            # NORMAL is durable across application crashes in WAL mode and
+            # avoids an fsync on every commit
+            conn.execute('PRAGMA synchronous = NORMAL')
+        if self._trace_callback is not None:
+            conn.set_trace_callback(self._trace_callback)
+        return conn
+
+    def writer_connection(self):
+        """Return the single writer connection, opening it on first use"""
+        if self._writer is None:
+            with self._write_lock:
+                if self._writer is None:
+                    self._writer = self._connect(read_only=False)
+        return self._writer
+
+    def current(self):
+        """Connection held by the current thread, or the writer outside any scope"""
+        conn = getattr(self._local, 'conn', None)
+        return conn if conn is not None else self.writer_connection()
+
+    @contextmanager
+    def writer(self):
+        """Hold the write lock and the writer connection for a unit of work
+
+        The outermost scope on a thread commits on success and rolls back on
+        error; nested scopes just reuse the connection.
+        """
+        local = self._local
+        started = perf_counter()
+        with self._write_lock:
+            depth = getattr(local, 'write_depth', 0)
+            if depth == 0 and self.metrics is not None:
+                self.metrics.record_wait('writer', perf_counter() - started)
+            conn = self.writer_connection()
+            previous = getattr(local, 'conn', None)
+            local.conn = conn
+            local.write_depth = depth + 1
+            try:
+                yield conn
+                if depth == 0 and conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                if depth == 0 and conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                local.write_depth = depth
+                local.conn = previous
+                if depth == 0:
+                    with self._stats_lock:
+                        self.stats['writes'] += 1
+
+    @contextmanager
+    def reader(self):
+        """Check out a read-only connection for the duration of the block
+
+        Inside a writer() scope the writer connection is reused, so a method
+        sees its own uncommitted changes.
+        """
+        local = self._local
+        held = getattr(local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+
+        if self.shared_writer:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        conn = self._checkout()
+        local.conn = conn
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            self._checkin(conn)
+
+    @contextmanager
+    def snapshot(self):
+        """Hold one reader inside a read transaction for the whole block
+
+        Every query in the block, including nested reader() scopes, sees the
+        same committed state even while the writer commits in between.
+        """
+        with self.reader() as conn:
+            started = not conn.in_transaction
+            if started:
+                conn.execute('BEGIN')
+            try:
+                yield conn
+            finally:
+                if started and conn.in_transaction:
+                    conn.rollback()
+
+    def open_readers(self):
+        """Open every reader connection up front, keeping setup off the request path"""
+        if self.shared_writer:
+            return 0
+        connections = [self._checkout() for _ in range(self.max_readers)]
+        for conn in connections:
+            self._checkin(conn)
+        return len(connections)
+
+    def _checkout(self):
+        started = perf_counter()
+        self._slots.acquire()
+        if self.metrics is not None:
+            self.metrics.record_wait('reader', perf_counter() - started)
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._connect(read_only=True)
+            except BaseException:
+                self._slots.release()
+                raise
+            with self._stats_lock:
+                self._all_readers.append(conn)
+                self.stats['readers_opened'] += 1
+        with self._stats_lock:
+            self.stats['reads'] += 1
+        return conn
+
+    def _checkin(self, conn):
+        self._idle.put(conn)
+        self._slots.release()
+
+    def set_trace_callback(self, callback):
+        """Install an sqlite3 trace callback on every current and future connection"""
+        self._trace_callback = callback
+        with self._stats_lock:
+            connections = list(self._all_readers)
+        if self._writer is not None:
+            connections.append(self._writer)
+        for conn in connections:
+            conn.set_trace_callback(callback)
+
+    def get_stats(self):
+        """Counters and pool occupancy for health checks"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+            stats['readers_open'] = len(self._all_readers)
+        stats['readers_idle'] = self._idle.qsize()
+        stats['max_readers'] = self.max_readers
+        return stats
+
+    def close(self):
+        """Close the writer and every reader connection"""
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._stats_lock:
+            readers, self._all_readers = self._all_readers, []
+        for conn in readers:
+            conn.close()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
@@ -1,16 +1,79 @@
-import sqlite3
+import base64
+from contextlib import contextmanager
+import datetime as dt
 from datetime import datetime
+import decimal
+import functools
 import hashlib
+import json
+import math
 import os
+import re
+import sqlite3
+import threading
+import analytics
+from cache import ReadCache
+from connection_pool import ConnectionPool, DEFAULT_READERS
+from metrics import Metrics
+import scoring
+
+def writes(method):
+    """Run a method on the writer connection under the write lock
+
+    Bumps the data version afterwards, invalidating every cached read.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            with self.pool.writer():
+                return method(self, *args, **kwargs)
+        finally:
+            self.cache.bump()
+    return wrapper
+
+def reads(method):
+    """Run a method on a pooled read-only connection"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.pool.reader():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def cached(method):
+    """Serve a read method from the versioned cache, keyed on its arguments
+
+    Cached results are shared between callers and must not be mutated.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        # Inside snapshot() the cache may only serve the version the snapshot started at
+        version = getattr(self._snapshot, 'version', None)
+        return self.cache.get_or_compute(key, lambda: method(self, *args, **kwargs), version)
+    return wrapper
+
+class ArchiveConflict(ValueError):
+    """An archive would overlap one already stored"""
 
 class EnnaDatabase:
-    def __init__(self, db_path='enna.db', password=None):
+    def __init__(self, db_path='enna.db', password=None, readers=DEFAULT_READERS, slow_query_log=None,
+                 analytics=False):
         self.db_path = db_path
         self.password = password
-        self.connection = None
-        self.init_database()
-        self._check_schema_updates()
-    
+        self.metrics = Metrics()
+        self.slow_query_log = slow_query_log
+        self.pool = ConnectionPool(db_path, readers=readers, metrics=self.metrics,
+                                   slow_query_log=slow_query_log)
+        self.cache = ReadCache()
+        self._snapshot = threading.local()
+        # Last login day written by record_login, so repeat visits skip the write
+        self._recorded_login_date = None
+        # Full-text indexed tables, looked up on the first search
+        self._search_tables = None
+        self._run_migrations()
+        # NumPy mirror of the transactions for aggregate reads (see analytics.py)
+        self.analytics = self._load_analytics() if analytics else None
+
     def _get_current_date(self):
         """Get current date, respecting frontend override if present"""
         # This would need to be passed from frontend, or we check a shared config
@@ -22,46 +85,144 @@ class EnnaDatabase:
         return datetime.now()
     
     def get_connection(self):
-        """Get database connection"""
-        if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row  # Return rows as dictionaries
-        return self.connection
-    
-    def _check_schema_updates(self):
-        """Check and update schema for existing databases"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Get the connection for the current read/write scope (the writer outside one)"""
+        return self.pool.current()
+
+    def warm_up(self):
+        """Open every pooled connection, refresh planner statistics and prime the read cache"""
+        self.pool.writer_connection()
+        readers = self.pool.open_readers()
+        with self.pool.writer() as conn:
+            conn.execute('PRAGMA optimize')
+
+        for prime in (self.get_categories, self.get_budget_allocations, self.get_summary,
+                      self.get_monthly_archives, self.get_monthly_spending_chart_data):
+            prime()
+
+        return {
+            'readers': readers,
+            'cache_entries': self.cache.get_stats()['entries']
+        }
+
+    @contextmanager
+    def snapshot(self):
+        """Run every read method called in the block against one consistent snapshot"""
+        if getattr(self._snapshot, 'version', None) is not None:
+            yield
+            return
+
+        # Read before the snapshot starts, so a later write always moves past it
+        self._snapshot.version = self.cache.version
         try:
-            # NEW: Check for 'name' and other new columns in monthly_archives
-            cursor.execute("PRAGMA table_info(monthly_archives)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'name' not in columns:
-                print("ℹ️ Migrating database: Adding 'name' column to archives")
-                cursor.execute('ALTER TABLE monthly_archives ADD COLUMN name TEXT')
-            if 'transactions_json' not in columns:
-                cursor.execute('ALTER TABLE monthly_archives ADD COLUMN transactions_json TEXT')
-            if 'date_range_start' not in columns:
-                cursor.execute('ALTER TABLE monthly_archives ADD COLUMN date_range_start TEXT')
-            if 'date_range_end' not in columns:
-                cursor.execute('ALTER TABLE monthly_archives ADD COLUMN date_range_end TEXT')
-                
-            # Check for user_name in user_stats
-            cursor.execute("PRAGMA table_info(user_stats)")
-            user_stats_columns = [row[1] for row in cursor.fetchall()]
-            if 'user_name' not in user_stats_columns:
-                cursor.execute('ALTER TABLE user_stats ADD COLUMN user_name TEXT DEFAULT "Friend"')
-            if 'user_emoji' not in user_stats_columns:
-                cursor.execute('ALTER TABLE user_stats ADD COLUMN user_emoji TEXT DEFAULT "👤"')
-            conn.commit()
-        except Exception as e:
-            print(f"Schema update error: {e}")
-    
-    def init_database(self):
-        """Initialize database with tables"""
+            with self.pool.snapshot():
+                yield
+        finally:
+            self._snapshot.version = None
+
+    # ============= ANALYTICS COLUMNS =============
+
+    def _load_analytics(self):
+        """Load the transactions into NumPy columns, or None without NumPy"""
+        if not analytics.AVAILABLE:
+            print("⚠️ NumPy is not installed, aggregates are read from SQL (pip install numpy)")
+            return None
+        store = analytics.TransactionColumns()
+        # Under the write lock, so no write lands between the load and the first hook
+        with self.pool.writer() as conn:
+            rows = store.load(conn)
+        print(f"📊 Loaded {rows} transactions into analytics columns in {store.load_ms:.0f}ms")
+        return store
+
+    def _analytics_for(self, *dates):
+        """The analytics columns if they answer a read over these date bounds exactly, else None
+
+        Reads inside snapshot() stay on SQL, which sees the snapshot's data.
+        """
+        store = self.analytics
+        if store is None or getattr(self._snapshot, 'version', None) is not None:
+            return None
+        return store if store.covers(*dates) else None
+
+    def _analytics_apply(self, cursor, where, params):
+        """Copy committed inserts and updates matching a WHERE clause into the columns"""
+        if self.analytics is not None:
+            self.analytics.apply(cursor.execute(f'{analytics.ROWS_SQL} WHERE {where}', params).fetchall())
+
+    def _analytics_ids(self, cursor, where, params):
+        """Ids a DELETE is about to remove, when the columns will need them"""
+        if self.analytics is None:
+            return None
+        return [row[0] for row in cursor.execute(f'SELECT id FROM transactions WHERE {where}', params)]
+
+    def _analytics_delete(self, ids):
+        if self.analytics is not None and ids:
+            self.analytics.delete(ids)
+
+    # ============= MIGRATIONS =============
+
+    def _migrations(self):
+        """Ordered schema migrations, keyed on PRAGMA user_version
+
+        Append new steps to the end and never renumber or edit a step that has
+        already shipped - existing databases skip everything at or below their
+        stored version.
+        """
+        return [
+            (1, self._migrate_transaction_indexes),
+            (2, self._migrate_daily_category_totals),
+            (3, self._migrate_archived_transactions),
+            (4, self._migrate_streak_state),
+            (5, self._migrate_transaction_search),
+            (6, self._migrate_transaction_fingerprints),
+            (7, self._migrate_integer_cents),
+            (8, self._migrate_archive_totals),
+            (9, self._migrate_archive_ids),
+        ]
+
+    def _run_migrations(self):
+        """Bring the schema up to date; a current database costs one PRAGMA read"""
+        conn = self.pool.writer_connection()
+        latest = self._migrations()[-1][0]
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= latest:
+            return
+        self._apply_migrations()
+
+    @writes
+    def _apply_migrations(self):
+        """Apply any migrations newer than the database's user_version"""
         conn = self.get_connection()
-        cursor = conn.cursor()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        # Version 0 is either a new file or a database from before user_version
+        # was tracked, so it gets the base schema before step 1
+        steps = self._migrations()
+        if version == 0:
+            steps = [(0, self._migrate_base_schema)] + steps
+
+        for target, migrate in steps:
+            if target and version >= target:
+                continue
+            cursor = conn.cursor()
+            try:
+                # DDL does not open a transaction implicitly, so make each step
+                # atomic; IMMEDIATE holds off a second process migrating too
+                cursor.execute('BEGIN IMMEDIATE')
+                current = cursor.execute('PRAGMA user_version').fetchone()[0]
+                if target and current >= target:
+                    conn.rollback()
+                    version = current
+                    continue
+                migrate(cursor)
+                cursor.execute(f'PRAGMA user_version = {int(target)}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"ℹ️ Migrated database to version {target}: {migrate.__doc__}")
+            version = target
+
+    def _migrate_base_schema(self, cursor):
+        """Create the base tables and seed the defaults"""
         
         # Users table (for future multi-user support)
         cursor.execute('''
@@ -163,17 +324,23 @@ class EnnaDatabase:
             )
         ''')
         
+        # Databases created before these columns existed
+        self._add_missing_columns(cursor, 'monthly_archives', {
+            'name': 'TEXT',
+            'transactions_json': 'TEXT',
+            'date_range_start': 'TEXT',
+            'date_range_end': 'TEXT',
+        })
+        self._add_missing_columns(cursor, 'user_stats', {
+            'user_name': "TEXT DEFAULT 'Friend'",
+            'user_emoji': "TEXT DEFAULT '👤'",
+        })
+        
         # Initialize user_stats if empty
         cursor.execute('SELECT COUNT(*) FROM user_stats')
         if cursor.fetchone()[0] == 0:
             cursor.execute('INSERT INTO user_stats (user_name, longest_streak) VALUES (?, ?)', ('Friend', 0))
         
-        # Add user_name column if it doesn't exist (for existing databases)
-        cursor.execute("PRAGMA table_info(user_stats)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'user_name' not in columns:
-            cursor.execute('ALTER TABLE user_stats ADD COLUMN user_name TEXT DEFAULT "Friend"')
-        
         # Insert default categories if none exist
         cursor.execute('SELECT COUNT(*) FROM categories')
         if cursor.fetchone()[0] == 0:
@@ -193,56 +360,581 @@ class EnnaDatabase:
                 default_categories
             )
 
-            
-        
-        conn.commit()
-        print("✅ Database initialized successfully!")
-    
+    def _add_missing_columns(self, cursor, table, columns):
+        """ALTER TABLE ADD COLUMN for each {name: definition} the table lacks"""
+        existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+
+    def _migrate_transaction_indexes(self, cursor):
+        """Add indexes for the transactions hot paths"""
+        # get_transactions ORDER BY date, clear_transactions_in_range, MIN(date)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)')
+        # get_summary income/expense totals, get_transactions filtered by type
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date)')
+        # get_category_spending and the per-category summary join
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_transactions_category_type_date
+            ON transactions (category_id, type, date)
+        ''')
+        # get_next_archive_start_date
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_monthly_archives_date_range_end
+            ON monthly_archives (date_range_end)
+        ''')
+
+    def _migrate_daily_category_totals(self, cursor):
+        """Add the daily_category_totals rollup and the triggers that maintain it"""
+        # category_id 0 stands for uncategorized so the primary key stays usable
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_category_totals (
+                date DATE NOT NULL,
+                category_id INTEGER NOT NULL DEFAULT 0,
+                type TEXT NOT NULL,
+                total REAL NOT NULL DEFAULT 0,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, category_id, type)
+            ) WITHOUT ROWID
+        ''')
+
+        add_new = '''
+                INSERT INTO daily_category_totals (date, category_id, type, total, count)
+                VALUES (NEW.date, IFNULL(NEW.category_id, 0), NEW.type, NEW.amount, 1)
+                ON CONFLICT (date, category_id, type)
+                DO UPDATE SET total = total + excluded.total, count = count + 1;
+        '''
+        remove_old = '''
+                UPDATE daily_category_totals
+                SET total = total - OLD.amount, count = count - 1
+                WHERE date = OLD.date AND category_id = IFNULL(OLD.category_id, 0) AND type = OLD.type;
+                DELETE FROM daily_category_totals
+                WHERE date = OLD.date AND category_id = IFNULL(OLD.category_id, 0) AND type = OLD.type
+                AND count <= 0;
+        '''
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_transactions_totals_insert
+            AFTER INSERT ON transactions
+            BEGIN {add_new} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_transactions_totals_delete
+            AFTER DELETE ON transactions
+            BEGIN {remove_old} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_transactions_totals_update
+            AFTER UPDATE OF date, category_id, type, amount ON transactions
+            BEGIN {remove_old} {add_new} END
+        ''')
+
+        cursor.execute('DELETE FROM daily_category_totals')
+        cursor.execute(
+            'INSERT INTO daily_category_totals (date, category_id, type, total, count) '
+            + self._daily_totals_from_transactions_sql()
+        )
+
+    def _migrate_archived_transactions(self, cursor):
+        """Move archived transactions out of the monthly_archives JSON blob"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archived_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                archive_id INTEGER NOT NULL,
+                original_id INTEGER,
+                type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                description TEXT,
+                category_id INTEGER,
+                category_name TEXT,
+                date DATE NOT NULL,
+                FOREIGN KEY (archive_id) REFERENCES monthly_archives (id)
+            )
+        ''')
+        # get_archive_transactions pages through one archive newest first
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_archived_transactions_archive_date
+            ON archived_transactions (archive_id, date, id)
+        ''')
+
+        # Convert one archive at a time so only a single blob is in memory
+        cursor.execute('SELECT id FROM monthly_archives WHERE transactions_json IS NOT NULL')
+        for (archive_id,) in cursor.fetchall():
+            blob = cursor.execute(
+                'SELECT transactions_json FROM monthly_archives WHERE id = ?', (archive_id,)
+            ).fetchone()[0]
+            try:
+                # Still dollars at this version; _migrate_integer_cents converts them
+                rows = self._archived_rows(archive_id, json.loads(blob), amount=float)
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"⚠️ Keeping unreadable transactions_json for archive {archive_id}: {e}")
+                continue
+            self._insert_archived_rows(cursor, rows)
+            cursor.execute('UPDATE monthly_archives SET transactions_json = NULL WHERE id = ?', (archive_id,))
+
+    def _migrate_streak_state(self, cursor):
+        """Keep the current login run in user_stats instead of recounting login_days"""
+        self._add_missing_columns(cursor, 'user_stats', {
+            'last_login_date': 'DATE',
+            'streak_start_date': 'DATE',
+        })
+        self._rebuild_streak_state(cursor)
+
+    def _migrate_transaction_search(self, cursor):
+        """Add FTS5 indexes over live and archived transaction descriptions"""
+        for table in SEARCH_TABLES.values():
+            fts = f'{table}_fts'
+            try:
+                # External content: the index stores tokens only and reads
+                # descriptions back from the table itself
+                cursor.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5 (
+                        description, content='{table}', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                    )
+                ''')
+            except sqlite3.OperationalError as e:
+                # search_transactions falls back to LIKE without the index
+                print(f"⚠️ Full-text search unavailable, skipping {fts}: {e}")
+                continue
+
+            add_new = f"INSERT INTO {fts} (rowid, description) VALUES (NEW.id, NEW.description);"
+            remove_old = (f"INSERT INTO {fts} ({fts}, rowid, description) "
+                          f"VALUES ('delete', OLD.id, OLD.description);")
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert
+                AFTER INSERT ON {table}
+                BEGIN {add_new} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete
+                AFTER DELETE ON {table}
+                BEGIN {remove_old} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update
+                AFTER UPDATE OF description ON {table}
+                BEGIN {remove_old} {add_new} END
+            ''')
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def _migrate_transaction_fingerprints(self, cursor):
+        """Fingerprint transactions so re-imported rows are skipped"""
+        for table in ('transactions', 'archived_transactions'):
+            self._add_missing_columns(cursor, table, {'fingerprint': 'TEXT'})
+            # Amounts are still dollars at this version
+            self._fill_fingerprints(cursor, table, cents=CENTS_FROM_DOLLARS_SQL.format('amount'))
+        # add_transactions_bulk inserts with OR IGNORE against this
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_fingerprint
+            ON transactions (fingerprint)
+        ''')
+        # Archived rows are checked too, but archives may legitimately overlap
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_archived_transactions_fingerprint
+            ON archived_transactions (fingerprint)
+        ''')
+
+    def _fill_fingerprints(self, cursor, table, archive_id=None, cents='amount'):
+        """Fingerprint every row of a table (or of one archive), numbering identical rows by id
+
+        Walks the table in id order, which reads and rewrites pages
+        sequentially, then lets SQLite find the few repeated rows to renumber.
+        `cents` is the SQL for a row's amount in cents.
+        """
+        scope, params = ('archive_id = ?', [archive_id]) if archive_id is not None else ('1', [])
+        last_id = 0
+        while True:
+            rows = cursor.execute(f'''
+                SELECT id, type, {cents}, description, date FROM {table}
+                WHERE {scope} AND id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (*params, last_id, FINGERPRINT_CHUNK)).fetchall()
+            if not rows:
+                break
+            cursor.executemany(f'UPDATE {table} SET fingerprint = ? WHERE id = ?', [
+                (transaction_fingerprint(fingerprint_base(type, date, cents, description), 1), row_id)
+                for row_id, type, cents, description, date in rows
+            ])
+            last_id = rows[-1][0]
+
+        # Identical rows all got occurrence 1 above
+        repeats = cursor.execute(f'''
+            SELECT fingerprint, group_concat(id) FROM {table}
+            WHERE {scope}
+            GROUP BY fingerprint
+            HAVING COUNT(*) > 1
+        ''', params).fetchall()
+        for fingerprint, ids in repeats:
+            base = fingerprint.rsplit(':', 1)[0]
+            cursor.executemany(f'UPDATE {table} SET fingerprint = ? WHERE id = ?', [
+                (transaction_fingerprint(base, occurrence), row_id)
+                for occurrence, row_id in enumerate(sorted(map(int, ids.split(','))), 1)
+            ])
+
+    def _migrate_integer_cents(self, cursor):
+        """Store amounts and archive totals as integer cents"""
+        for table, columns in (
+            ('transactions', ('amount',)),
+            ('archived_transactions', ('amount',)),
+            ('monthly_archives', ('total_income', 'total_expenses', 'net')),
+            ('daily_category_totals', ('total',)),
+        ):
+            self._retype_columns(cursor, table, {
+                column: ('INTEGER', CENTS_FROM_DOLLARS_SQL.format(column)) for column in columns
+            })
+        # Summed again from the converted rows rather than rounding float sums
+        cursor.execute('DELETE FROM daily_category_totals')
+        cursor.execute(
+            'INSERT INTO daily_category_totals (date, category_id, type, total, count) '
+            + self._daily_totals_from_transactions_sql()
+        )
+
+    def _migrate_archive_totals(self, cursor):
+        """Recompute archive totals from their archived transactions"""
+        # Client-created archives stored the totals the client sent
+        self._store_archive_totals(cursor)
+
+    def _migrate_archive_ids(self, cursor):
+        """Key archives on their id, allowing several per month"""
+        # archive_period archives consecutive ranges, often two in one month
+        self._rebuild_table(cursor, 'monthly_archives', lambda create: re.sub(
+            r'(\bmonth_year\s+TEXT\s+NOT NULL)\s+UNIQUE', r'\1', create, count=1))
+        # get_archive_by_month
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_monthly_archives_month_year
+            ON monthly_archives (month_year, id)
+        ''')
+
+    def _retype_columns(self, cursor, table, columns):
+        """Rebuild a table with new declared types for some columns, converting their values
+
+        `columns` maps a column name to (type, SQL computing the new value from
+        the old row).
+        """
+        def retype(create):
+            for name, (type, _) in columns.items():
+                create, found = re.subn(rf'([(,]\s*{name}\s+)\w+', rf'\g<1>{type}', create, count=1)
+                if not found:
+                    raise ValueError(f'Column {table}.{name} not found')
+            return create
+
+        self._rebuild_table(cursor, table, retype, {name: sql for name, (_, sql) in columns.items()})
+
+    def _rebuild_table(self, cursor, table, rewrite, values=None):
+        """Rebuild a table from a rewritten CREATE TABLE statement, copying its rows
+
+        `rewrite` maps the table's CREATE statement to the new one and `values`
+        maps a column name to SQL computing its new value from the old row.
+        SQLite cannot change a column's type or constraints in place, so the
+        rows are copied into a new table that then takes the old one's name;
+        ids, the AUTOINCREMENT sequence, indexes and triggers are kept.
+        """
+        values = values or {}
+        create = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()[0]
+        # Its indexes and triggers, and triggers on other tables that write to
+        # it (those would fail the schema check of the rename below)
+        dependents = []
+        for type, name, owner, sql in cursor.execute('''
+            SELECT type, name, tbl_name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL
+        ''').fetchall():
+            if owner == table or (type == 'trigger' and re.search(rf'\b{table}\b', sql)):
+                dependents.append((type, name, owner, sql))
+        sequence = cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+
+        new_table = f'{table}_rebuilt'
+        create = rewrite(re.sub(rf'^CREATE TABLE "?{table}"?', f'CREATE TABLE {new_table}', create))
+
+        names = [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+        cursor.execute(create)
+        cursor.execute(f'''
+            INSERT INTO {new_table} ({', '.join(names)})
+            SELECT {', '.join(values.get(name, name) for name in names)} FROM {table}
+        ''')
+        for type, name, owner, _ in dependents:
+            if owner != table:
+                cursor.execute(f'DROP TRIGGER {name}')
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+        for *_, sql in dependents:
+            cursor.execute(sql)
+        if sequence is not None:
+            cursor.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+            cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table, sequence[0]))
+
     # ============= TRANSACTION METHODS =============
     
+    @writes
     def add_transaction(self, type, amount, description, category_id=None, date=None):
-        """Add a new transaction"""
+        """Add a new transaction (amount in dollars)"""
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
+        cents = to_cents(amount)
         
         conn = self.get_connection()
         cursor = conn.cursor()
-        
+
+        # Entered by hand, so always kept: it becomes the next occurrence of
+        # its fingerprint and a later import of the same row is skipped
+        base = fingerprint_base(type, date, cents, description)
+        fingerprint = transaction_fingerprint(base, self._last_occurrence(cursor, base) + 1)
+
         cursor.execute('''
-            INSERT INTO transactions (type, amount, description, category_id, date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (type, amount, description, category_id, date))
+            INSERT INTO transactions (type, amount, description, category_id, date, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (type, cents, description, category_id, date, fingerprint))
         
         conn.commit()
-        return cursor.lastrowid
+        transaction_id = cursor.lastrowid
+        self._analytics_apply(cursor, 'id = ?', (transaction_id,))
+        return transaction_id
+
+    def _last_occurrence(self, cursor, base):
+        """Highest occurrence number stored for a fingerprint base, live or archived (0 if none)"""
+        last = 0
+        for table in ('transactions', 'archived_transactions'):
+            # Every fingerprint of the base sorts between 'base:' and 'base;'
+            for (fingerprint,) in cursor.execute(
+                    f'SELECT fingerprint FROM {table} WHERE fingerprint > ? AND fingerprint < ?',
+                    (f'{base}:', f'{base};')):
+                last = max(last, int(fingerprint.rsplit(':', 1)[1]))
+        return last
     
-    def get_transactions(self, limit=100, type=None):
-        """Get transactions with optional filtering"""
+    def get_transactions(self, limit=100, type=None, **filters):
+        """Get transactions with optional filtering (see get_transactions_page)"""
+        return self.get_transactions_page(limit=limit, type=type, **filters)['transactions']
+
+    @reads
+    def get_transactions_page(self, limit=100, type=None, start_date=None, end_date=None,
+                              category_id=None, min_amount=None, max_amount=None,
+                              search=None, cursor=None):
+        """Get one page of transactions, newest first, with keyset pagination
+
+        Rows are ordered by (date, id) descending. Pass the returned
+        `next_cursor` back as `cursor` to fetch the following page; each page
+        is an index range seek, so page N costs the same as page 1.
+
+        Returns {'transactions': [...], 'next_cursor': str or None}
+        """
+        limit = page_limit(limit)
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT t.*, c.name as category_name, c.color, c.icon
+        db_cursor = conn.cursor()
+
+        conditions = []
+        params = []
+
+        if type:
+            conditions.append('t.type = ?')
+            params.append(type)
+        if start_date:
+            conditions.append('t.date >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append('t.date <= ?')
+            params.append(end_date)
+        if category_id is not None:
+            conditions.append('t.category_id = ?')
+            params.append(category_id)
+        # Bounds are dollars, compared against cents
+        if min_amount is not None:
+            conditions.append('t.amount >= ?')
+            params.append(to_cents(min_amount))
+        if max_amount is not None:
+            conditions.append('t.amount <= ?')
+            params.append(to_cents(max_amount))
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append("t.description LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor)
+            conditions.append('(t.date, t.id) < (?, ?)')
+            params.extend([cursor_date, cursor_id])
+
+        query = f'''
+            SELECT {TRANSACTION_COLUMNS}, c.name as category_name, c.color, c.icon
             FROM transactions t
             LEFT JOIN categories c ON t.category_id = c.id
         '''
-        
-        if type:
-            query += ' WHERE t.type = ?'
-            cursor.execute(query + ' ORDER BY t.date DESC LIMIT ?', (type, limit))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        # Fetch one extra row to know whether another page exists
+        db_cursor.execute(query + ' ORDER BY t.date DESC, t.id DESC LIMIT ?', params + [limit + 1])
+        transactions = [dict(row) for row in db_cursor.fetchall()]
+
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last['date'], last['id'])
+
+        return {
+            'transactions': transactions,
+            'next_cursor': next_cursor
+        }
+
+    @reads
+    def search_transactions(self, query, limit=50, scope='transactions', type=None,
+                            category_id=None, start_date=None, end_date=None,
+                            sort='relevance', cursor=None):
+        """Full-text search over transaction descriptions
+
+        Every word of `query` must match the start of a word in the
+        description, so "whole fo" finds "Whole Foods Market #12". `scope` is
+        'transactions', 'archived' or 'all'; `sort` is 'relevance' (bm25 best
+        match first, then newest) or 'date' (newest first). Pages work like
+        get_transactions_page: pass `next_cursor` back as `cursor`.
+
+        Scoring every match does not scale to words found in a large share of
+        the history, so above SEARCH_RANK_LIMIT matches a relevance search is
+        answered newest first; the returned `sort` says which order was used.
+        Archived rows carry their `archive_id`, and `id` is the id the
+        transaction had before it was archived.
+
+        Returns {'transactions': [...], 'next_cursor': str or None, 'sort': str}
+        """
+        limit = page_limit(limit)
+        terms = re.findall(r'\w+', query or '')
+        if not terms:
+            raise ValueError('Search query must contain a letter or number')
+        if scope not in SEARCH_SCOPES:
+            raise ValueError(f"Search scope must be one of {', '.join(SEARCH_SCOPES)}")
+        if sort not in SEARCH_SORTS:
+            raise ValueError(f"Search sort must be one of {', '.join(SEARCH_SORTS)}")
+
+        conn = self.get_connection()
+        indexed = self._search_indexes(conn)
+        # Quoted so words like AND/NEAR are not read as FTS operators
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # Matches before filtering, counted from the index alone and only
+        # as far as needed to pick a plan
+        counts = {}
+        for source in SEARCH_SCOPES[scope]:
+            table = SEARCH_TABLES[source]
+            if table in indexed:
+                counts[source] = conn.execute(
+                    f'SELECT count(*) FROM (SELECT 1 FROM {table}_fts WHERE {table}_fts MATCH ? LIMIT ?)',
+                    (match, SEARCH_RANK_LIMIT + 1)
+                ).fetchone()[0]
+
+        position = None
+        if cursor:
+            # Later pages keep the order the first page was served in
+            sort, *position = decode_search_cursor(cursor)
+        elif sort == 'relevance' and sum(counts.values()) > SEARCH_RANK_LIMIT:
+            sort = 'date'
+
+        if sort == 'relevance':
+            order = 'rank, date DESC, source DESC, row_id DESC'
+            after = '(rank > ? OR (rank = ? AND (date, source, row_id) < (?, ?, ?)))'
         else:
-            cursor.execute(query + ' ORDER BY t.date DESC LIMIT ?', (limit,))
-        
-        return [dict(row) for row in cursor.fetchall()]
-    
+            order = 'date DESC, source DESC, row_id DESC'
+            after = '(date, source, row_id) < (?, ?, ?)'
+
+        arms = []
+        params = []
+        for source in SEARCH_SCOPES[scope]:
+            table = SEARCH_TABLES[source]
+            conditions = []
+            rank = '0.0'
+            if table not in indexed:
+                joins = f'FROM {table} t'
+                for term in terms:
+                    conditions.append("t.description LIKE ? ESCAPE '\\'")
+                    params.append('%' + term.replace('_', '\\_') + '%')
+            elif (sort == 'date' and table == 'transactions' and counts[source] > SEARCH_RANK_LIMIT
+                  and not type and category_id is None):
+                # A common word: walk the date index newest first and stop
+                # once the page is full, rather than sorting every match
+                joins = 'FROM transactions t INDEXED BY idx_transactions_date'
+                conditions.append('t.id IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)')
+                params.append(match)
+            else:
+                joins = f'FROM {table}_fts f JOIN {table} t ON t.id = f.rowid'
+                conditions.append(f'{table}_fts MATCH ?')
+                params.append(match)
+                if sort == 'relevance':
+                    rank = f'bm25({table}_fts)'
+
+            if type:
+                conditions.append('t.type = ?')
+                params.append(type)
+            if category_id is not None:
+                conditions.append('t.category_id = ?')
+                params.append(category_id)
+            if start_date:
+                conditions.append('t.date >= ?')
+                params.append(start_date)
+            if end_date:
+                conditions.append('t.date <= ?')
+                params.append(end_date)
+
+            if source == 'archived':
+                columns = 't.original_id AS id, t.archive_id, IFNULL(c.name, t.category_name) AS category_name'
+            else:
+                columns = 't.id, NULL AS archive_id, c.name AS category_name'
+            arm = f'''
+                SELECT '{source}' AS source, t.id AS row_id, {rank} AS rank, {columns},
+                       t.type, t.amount / 100.0 AS amount, t.description, t.category_id, c.color, c.icon, t.date
+                {joins}
+                LEFT JOIN categories c ON t.category_id = c.id
+                WHERE {' AND '.join(conditions)}
+            '''
+            # Each source is cut to one page before merging
+            arm = f'SELECT * FROM ({arm})'
+            if position:
+                arm += f' WHERE {after}'
+                params.extend(position[:1] * 2 + position[1:] if sort == 'relevance' else position[1:])
+            arms.append(f'SELECT * FROM ({arm} ORDER BY {order} LIMIT ?)')
+            params.append(limit + 1)
+
+        sql = ' UNION ALL '.join(arms)
+        # Fetch one extra row to know whether another page exists
+        rows = conn.execute(f'{sql} ORDER BY {order} LIMIT ?', params + [limit + 1]).fetchall()
+        transactions = [dict(row) for row in rows]
+
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_search_cursor(sort, last['rank'], last['date'], last['source'], last['row_id'])
+
+        for t in transactions:
+            del t['row_id'], t['rank']
+
+        return {
+            'transactions': transactions,
+            'next_cursor': next_cursor,
+            'sort': sort
+        }
+
+    def _search_indexes(self, conn):
+        """Tables with a full-text index; _migrate_transaction_search skips them without FTS5"""
+        if self._search_tables is None:
+            names = [f'{table}_fts' for table in SEARCH_TABLES.values()]
+            found = {row[0] for row in conn.execute(
+                f"SELECT name FROM sqlite_master WHERE name IN ({', '.join('?' * len(names))})", names)}
+            self._search_tables = {table for table in SEARCH_TABLES.values() if f'{table}_fts' in found}
+        return self._search_tables
+
+    @writes
     def delete_transaction(self, transaction_id):
         """Delete a transaction"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM transactions WHERE id = ?', (transaction_id,))
         conn.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+        if deleted:
+            self._analytics_delete([transaction_id])
+        return deleted
     
+    @writes
     def update_transaction(self, transaction_id, type=None, amount=None, description=None, category_id=None, date=None):
         """Update an existing transaction"""
         conn = self.get_connection()
@@ -257,7 +949,7 @@ class EnnaDatabase:
             values.append(type)
         if amount is not None:
             update_fields.append('amount = ?')
-            values.append(amount)
+            values.append(to_cents(amount))
         if description is not None:
             update_fields.append('description = ?')
             values.append(description)
@@ -270,16 +962,164 @@ class EnnaDatabase:
         
         if not update_fields:
             return False
+
+        if any(value is not None for value in (type, amount, description, date)):
+            fingerprint = self._edited_fingerprint(cursor, transaction_id, type, amount, description, date)
+            if fingerprint is not None:
+                update_fields.append('fingerprint = ?')
+                values.append(fingerprint)
         
         values.append(transaction_id)
         query = f'UPDATE transactions SET {", ".join(update_fields)} WHERE id = ?'
         
         cursor.execute(query, values)
         conn.commit()
-        return cursor.rowcount > 0
-    
+        updated = cursor.rowcount > 0
+        if updated:
+            self._analytics_apply(cursor, 'id = ?', (transaction_id,))
+        return updated
+
+    def _edited_fingerprint(self, cursor, transaction_id, type, amount, description, date):
+        """Fingerprint for a transaction after an edit, or None if it keeps its own
+
+        Treated like a row entered by hand: the next occurrence of its new
+        base, so it never collides with a stored row, a later import of the
+        edited values is skipped and one of the original values is not.
+        """
+        row = cursor.execute(
+            'SELECT type, amount, description, date, fingerprint FROM transactions WHERE id = ?',
+            (transaction_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        base = fingerprint_base(
+            row['type'] if type is None else type,
+            row['date'] if date is None else date,
+            row['amount'] if amount is None else to_cents(amount),
+            row['description'] if description is None else description
+        )
+        if row['fingerprint'] and row['fingerprint'].rsplit(':', 1)[0] == base:
+            return None
+        return transaction_fingerprint(base, self._last_occurrence(cursor, base) + 1)
+
+    def _validate_transaction(self, data):
+        """Validate one transaction dict and return its INSERT parameters
+
+        The amount is returned in cents. Raises ValueError with a user-facing
+        message when the row is invalid.
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Transaction must be an object')
+        if 'type' not in data or 'amount' not in data:
+            raise ValueError('Missing required fields: type, amount')
+
+        type = data['type']
+        if type not in ('income', 'expense'):
+            raise ValueError(f"Invalid type '{type}': must be 'income' or 'expense'")
+
+        try:
+            amount = float(data['amount'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid amount '{data['amount']}'")
+        if not math.isfinite(amount):
+            raise ValueError(f"Invalid amount '{data['amount']}'")
+        # From the value as given, so '0.285' is not first rounded to a float
+        amount = to_cents(data['amount'])
+
+        date = data.get('date') or datetime.now().strftime('%Y-%m-%d')
+        try:
+            if len(date) != 10:
+                raise ValueError
+            dt.date.fromisoformat(date)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid date '{date}': expected YYYY-MM-DD")
+
+        category_id = data.get('category_id')
+        if category_id in ('', None):
+            category_id = None
+        else:
+            try:
+                category_id = int(category_id)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid category_id '{category_id}'")
+
+        return (type, amount, data.get('description') or '', category_id, date)
+
+    @writes
+    def add_transactions_bulk(self, transactions, occurrences=None):
+        """Validate and insert many transactions in a single SQLite transaction
+
+        Invalid rows are reported and skipped; all valid rows are written with
+        one executemany and one commit instead of a commit per row.
+
+        Rows already stored - same type, date, amount and normalized
+        description, live or archived - are skipped by the fingerprint index,
+        so re-importing an overlapping export only adds the new rows. The
+        n-th identical row of a day is told apart from the first by its
+        occurrence number; pass the same `occurrences` dict for every chunk
+        of one import so the count carries across chunks.
+
+        Returns a list with one result per input row, in input order:
+            {'index': i, 'status': 'success', 'transaction_id': id},
+            {'index': i, 'status': 'duplicate'} or
+            {'index': i, 'status': 'error', 'message': reason}
+        """
+        if occurrences is None:
+            occurrences = {}
+        results = []
+        rows = []
+
+        for index, data in enumerate(transactions):
+            try:
+                row = self._validate_transaction(data)
+            except ValueError as e:
+                results.append({'index': index, 'status': 'error', 'message': str(e)})
+                continue
+            type, cents, description, category_id, date = row
+            base = fingerprint_base(type, date, cents, description)
+            occurrences[base] = occurrences.get(base, 0) + 1
+            fingerprint = transaction_fingerprint(base, occurrences[base])
+            rows.append((*row, fingerprint, fingerprint))
+            results.append({'index': index, 'status': 'success', 'fingerprint': fingerprint})
+
+        if not rows:
+            return results
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            # New AUTOINCREMENT ids are all above the current maximum
+            last_id = cursor.execute('SELECT IFNULL(MAX(id), 0) FROM transactions').fetchone()[0]
+            cursor.executemany('''
+                INSERT OR IGNORE INTO transactions (type, amount, description, category_id, date, fingerprint)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM archived_transactions WHERE fingerprint = ?)
+            ''', rows)
+            inserted = dict(cursor.execute(
+                'SELECT fingerprint, id FROM transactions WHERE id > ?', (last_id,)
+            ).fetchall())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if inserted:
+            self._analytics_apply(cursor, 'id > ?', (last_id,))
+
+        for result in results:
+            fingerprint = result.pop('fingerprint', None)
+            if fingerprint is None:
+                continue
+            if fingerprint in inserted:
+                result['transaction_id'] = inserted[fingerprint]
+            else:
+                result['status'] = 'duplicate'
+
+        return results
+
     # ============= CATEGORY METHODS =============
     
+    @cached
+    @reads
     def get_categories(self):
         """Get all categories"""
         conn = self.get_connection()
@@ -287,6 +1127,7 @@ class EnnaDatabase:
         cursor.execute('SELECT * FROM categories ORDER BY name')
         return [dict(row) for row in cursor.fetchall()]
     
+    @writes
     def add_category(self, name, color='#34d399', icon='📦'):
         """Add a new category"""
         conn = self.get_connection()
@@ -297,35 +1138,81 @@ class EnnaDatabase:
         )
         conn.commit()
         return cursor.lastrowid
-    
+
+    @reads
+    def get_categorization_state(self):
+        """Row counts the categorizer checks its model against
+
+        Live transactions per category come from the rollup (0 is
+        uncategorized); archived rows are only ever added or removed.
+        """
+        conn = self.get_connection()
+        live = dict(conn.execute('''
+            SELECT category_id, SUM(count) FROM daily_category_totals
+            GROUP BY category_id
+        ''').fetchall())
+        archived = conn.execute('SELECT COUNT(*) FROM archived_transactions').fetchone()[0]
+        return {'live': live, 'archived': archived}
+
+    @reads
+    def get_categorized_descriptions(self, after_id=0, after_archived_id=0):
+        """Distinct (description, category_id, count) among rows past the given ids
+
+        Covers live and archived transactions, uncategorized rows included
+        (category_id None) so the totals line up with get_categorization_state.
+
+        Returns {'live': [...], 'archived': [...], 'last_id': int, 'last_archived_id': int}
+        """
+        conn = self.get_connection()
+        last_id = conn.execute('SELECT IFNULL(MAX(id), 0) FROM transactions').fetchone()[0]
+        last_archived_id = conn.execute('SELECT IFNULL(MAX(id), 0) FROM archived_transactions').fetchone()[0]
+
+        grouped = {}
+        for table, after, last in (('transactions', after_id, last_id),
+                                   ('archived_transactions', after_archived_id, last_archived_id)):
+            grouped[table] = [tuple(row) for row in conn.execute(f'''
+                SELECT description, category_id, COUNT(*) FROM {table}
+                WHERE id > ? AND id <= ?
+                GROUP BY description, category_id
+            ''', (after, last))]
+
+        return {
+            'live': grouped['transactions'],
+            'archived': grouped['archived_transactions'],
+            'last_id': last_id,
+            'last_archived_id': last_archived_id
+        }
+
     # ============= BUDGET METHODS =============
     
+    @writes
     def save_budget_allocation(self, category_id, percentage):
-        """Save or update budget allocation for a category"""
+        """Save or update budget allocation for a category; returns the allocation id"""
+        self.save_budget_allocations([(category_id, percentage)])
+        row = self.get_connection().execute(
+            'SELECT id FROM budget_allocations WHERE category_id = ?', (category_id,)
+        ).fetchone()
+        return row['id']
+
+    @writes
+    def save_budget_allocations(self, allocations):
+        """Upsert many (category_id, percentage) pairs in one transaction
+
+        Returns the number of allocations saved.
+        """
+        rows = [(int(category_id), float(percentage)) for category_id, percentage in allocations]
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if allocation exists
-        cursor.execute('SELECT id FROM budget_allocations WHERE category_id = ?', (category_id,))
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Update existing
-            cursor.execute('''
-                UPDATE budget_allocations 
-                SET percentage = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE category_id = ?
-            ''', (percentage, category_id))
-        else:
-            # Insert new
-            cursor.execute('''
-                INSERT INTO budget_allocations (category_id, percentage)
-                VALUES (?, ?)
-            ''', (category_id, percentage))
-        
+        conn.executemany('''
+            INSERT INTO budget_allocations (category_id, percentage)
+            VALUES (?, ?)
+            ON CONFLICT (category_id)
+            DO UPDATE SET percentage = excluded.percentage, updated_at = CURRENT_TIMESTAMP
+        ''', rows)
         conn.commit()
-        return cursor.lastrowid
+        return len(rows)
     
+    @cached
+    @reads
     def get_budget_allocations(self):
         """Get all budget allocations"""
         conn = self.get_connection()
@@ -338,17 +1225,134 @@ class EnnaDatabase:
         ''')
         return [dict(row) for row in cursor.fetchall()]
     
+    @cached
+    @reads
+    def get_budget_status(self, start_date=None, end_date=None):
+        """Budget vs actual for every category over a period, in one query
+
+        Each category's budget is its allocation percentage of the period's
+        income; spending comes from the daily_category_totals rollup, or the
+        analytics columns when they are loaded. With no dates the period is
+        all time, like get_summary.
+        """
+        if not start_date:
+            end_date = None
+        store = self._analytics_for(start_date, end_date)
+        if store is not None:
+            rows = self._budget_rows(store.grouped(start_date, end_date))
+        else:
+            rows = self._budget_status_rows(start_date, end_date)
+
+        # Totals are on every row; a lone row with no category means there are none
+        total_income, total_expenses = from_cents(rows[0]['total_income']), from_cents(rows[0]['total_expenses'])
+
+        categories = []
+        for row in rows:
+            if row['category_id'] is None:
+                continue
+            budget, spent = row['budget_amount'], row['spent']
+            categories.append({
+                'category_id': row['category_id'],
+                'name': row['name'],
+                'color': row['color'],
+                'icon': row['icon'],
+                'percentage': row['percentage'],
+                'budget_amount': budget,
+                'spent': spent,
+                'remaining': budget - spent,
+                'percent_spent': spent / budget * 100 if budget > 0 else None,
+                'overspent': budget > 0 and spent > budget
+            })
+
+        total_percentage = sum(c['percentage'] for c in categories)
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_income': total_income,
+            'total_expenses': total_expenses,
+            'total_percentage': total_percentage,
+            'total_budgeted': sum(c['budget_amount'] for c in categories),
+            'over_allocated': total_percentage > 100,
+            'categories': categories
+        }
+
+    def _budget_rows(self, groups):
+        """The rows _budget_status_rows returns, from analytics totals per type and category"""
+        income = sum(g['total'] for g in groups if g['type'] == 'income')
+        expenses = sum(g['total'] for g in groups if g['type'] == 'expense')
+        spent = {g['category_id']: g['total'] for g in groups if g['type'] == 'expense'}
+        percentages = dict(self.get_connection().execute(
+            'SELECT category_id, percentage FROM budget_allocations').fetchall())
+        totals = {'total_income': income, 'total_expenses': expenses}
+
+        rows = []
+        for category in sorted(self.get_categories(), key=lambda c: c['id']):
+            percentage = percentages.get(category['id'], 0)
+            rows.append({
+                'category_id': category['id'], 'name': category['name'],
+                'color': category['color'], 'icon': category['icon'],
+                'percentage': percentage,
+                'budget_amount': income * percentage / 10000,
+                'spent': from_cents(spent.get(category['id'], 0)),
+                **totals
+            })
+        return rows or [{'category_id': None, **totals}]
+
+    def _budget_status_rows(self, start_date, end_date):
+        """One row per category with its allocation and spending, plus the period totals"""
+        date_filter = ''
+        params = []
+        if start_date and end_date:
+            date_filter = 'WHERE r.date BETWEEN ? AND ?'
+            params = [start_date, end_date]
+        elif start_date:
+            date_filter = 'WHERE r.date >= ?'
+            params = [start_date]
+
+        conn = self.get_connection()
+        return conn.execute(f'''
+            WITH period AS (
+                SELECT r.type, r.category_id, SUM(r.total) AS total
+                FROM daily_category_totals r
+                {date_filter}
+                GROUP BY r.type, r.category_id
+            ),
+            totals AS (
+                SELECT IFNULL(SUM(CASE WHEN type = 'income' THEN total END), 0) AS income,
+                       IFNULL(SUM(CASE WHEN type = 'expense' THEN total END), 0) AS expenses
+                FROM period
+            )
+            SELECT c.id AS category_id, c.name, c.color, c.icon,
+                   IFNULL(ba.percentage, 0) AS percentage,
+                   totals.income * IFNULL(ba.percentage, 0) / 10000.0 AS budget_amount,
+                   IFNULL(p.total, 0) / 100.0 AS spent,
+                   totals.income AS total_income, totals.expenses AS total_expenses
+            FROM totals
+            LEFT JOIN categories c
+            LEFT JOIN budget_allocations ba ON ba.category_id = c.id
+            LEFT JOIN period p ON p.category_id = c.id AND p.type = 'expense'
+            ORDER BY c.id
+        ''', params).fetchall()
+
+    @reads
     def get_category_spending(self, category_id, days=30):
         """Get daily spending for a category over the last N days"""
+        store = self._analytics_for()
+        if store is not None:
+            # date('now') in SQLite is the UTC date
+            start_date = (datetime.now(dt.timezone.utc).date() - dt.timedelta(days=days)).isoformat()
+            return [{'date': group['period'], 'daily_total': from_cents(group['total'])}
+                    for group in store.grouped(start_date, bucket='day', by_category=False,
+                                               category_id=category_id, type='expense')]
+
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT date, SUM(amount) as daily_total
-            FROM transactions
+            SELECT date, total / 100.0 as daily_total
+            FROM daily_category_totals
             WHERE category_id = ? AND type = 'expense'
             AND date >= date('now', '-' || ? || ' days')
-            GROUP BY date
             ORDER BY date ASC
         ''', (category_id, days))
         
@@ -356,128 +1360,404 @@ class EnnaDatabase:
     
     # ============= SUMMARY METHODS =============
     
+    @cached
+    @reads
     def get_summary(self, start_date=None, end_date=None):
-        """Get financial summary"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Get financial summary
+
+        Reads the daily_category_totals rollup, so any date range is one small
+        grouped query instead of several scans of the raw transactions, or
+        the analytics columns when they are loaded.
+        """
+        # An end date on its own has never narrowed the summary
+        if not start_date:
+            end_date = None
+        store = self._analytics_for(start_date, end_date)
+        if store is not None:
+            categories = {c['id']: c for c in self.get_categories()}
+            rows = []
+            for group in store.grouped(start_date, end_date):
+                category = categories.get(group['category_id'], {})
+                rows.append({**group, 'name': category.get('name'), 'color': category.get('color'),
+                             'icon': category.get('icon')})
+        else:
+            rows = self._summary_rows(start_date, end_date)
+        
+        # Summed in cents, which is exact, and converted once at the end
+        total_income = 0
+        total_expenses = 0
+        expenses_by_category = []
+        
+        for row in rows:
+            if row['type'] == 'income':
+                total_income += row['total']
+                continue
+            total_expenses += row['total']
+            # Uncategorized expenses count towards the total but have no slice
+            if row['name'] is not None and row['total'] > 0:
+                expenses_by_category.append({
+                    'id': row['category_id'],
+                    'name': row['name'],
+                    'color': row['color'],
+                    'icon': row['icon'],
+                    'total': from_cents(row['total'])
+                })
+        
+        expenses_by_category.sort(key=lambda c: c['total'], reverse=True)
         
+        return {
+            'total_income': from_cents(total_income),
+            'total_expenses': from_cents(total_expenses),
+            'net': from_cents(total_income - total_expenses),
+            'expenses_by_category': expenses_by_category
+        }
+
+    def _summary_rows(self, start_date, end_date):
+        """Rollup totals per type and category, with the category's display fields"""
         date_filter = ''
         params = []
         
         if start_date and end_date:
-            date_filter = ' WHERE date BETWEEN ? AND ?'
+            date_filter = ' WHERE r.date BETWEEN ? AND ?'
             params = [start_date, end_date]
         elif start_date:
-            date_filter = ' WHERE date >= ?'
+            date_filter = ' WHERE r.date >= ?'
             params = [start_date]
         
-        # Total income
-        cursor.execute(
-            f"SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE type = 'income'{date_filter}",
-            params
-        )
-        total_income = cursor.fetchone()[0]
-        
-        # Total expenses
-        cursor.execute(
-            f"SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE type = 'expense'{date_filter}",
-            params
-        )
-        total_expenses = cursor.fetchone()[0]
-        
-        # Expenses by category
+        return self.get_connection().execute(f'''
+            SELECT r.type, r.category_id, SUM(r.total) as total, c.name, c.color, c.icon
+            FROM daily_category_totals r
+            LEFT JOIN categories c ON c.id = r.category_id{date_filter}
+            GROUP BY r.type, r.category_id
+        ''', params).fetchall()
+
+    @reads
+    def get_period_totals(self, periods):
+        """Income, expense and transaction count totals for many date ranges at once
+
+        Args:
+            periods: List of (start_date, end_date) tuples; either end may be None
+
+        Every period is answered by one grouped query over the
+        daily_category_totals rollup, or by running totals over the analytics
+        columns. Returns one dict per period, in order.
+        """
+        if not periods:
+            return []
+
+        store = self._analytics_for(*(date for period in periods for date in period))
+        if store is not None:
+            totals = store.range_totals(periods)
+        else:
+            totals = self._period_totals_rows(periods)
+
+        return [{
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_income': from_cents(income),
+            'total_expenses': from_cents(expenses),
+            'transaction_count': count
+        } for (start_date, end_date), (income, expenses, count) in zip(periods, totals)]
+
+    def _period_totals_rows(self, periods):
+        """(income, expenses, count) rollup totals for each period"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        values = ', '.join(['(?, ?, ?)'] * len(periods))
+        params = []
+        for index, (start_date, end_date) in enumerate(periods):
+            params.extend([index, start_date or '0000-01-01', end_date or '9999-12-31'])
+
         cursor.execute(f'''
-            SELECT c.id, c.name, c.color, c.icon, COALESCE(SUM(t.amount), 0) as total
-            FROM categories c
-            LEFT JOIN transactions t ON c.id = t.category_id AND t.type = 'expense'{date_filter}
-            GROUP BY c.id, c.name, c.color, c.icon
-            HAVING total > 0
-            ORDER BY total DESC
+            WITH periods (idx, start_date, end_date) AS (VALUES {values})
+            SELECT p.idx,
+                   IFNULL(SUM(CASE WHEN r.type = 'income' THEN r.total END), 0) as total_income,
+                   IFNULL(SUM(CASE WHEN r.type = 'expense' THEN r.total END), 0) as total_expenses,
+                   IFNULL(SUM(r.count), 0) as transaction_count
+            FROM periods p
+            LEFT JOIN daily_category_totals r ON r.date BETWEEN p.start_date AND p.end_date
+            GROUP BY p.idx
+            ORDER BY p.idx
         ''', params)
-        
-        expenses_by_category = [dict(row) for row in cursor.fetchall()]
-        
-        return {
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net': total_income - total_expenses,
-            'expenses_by_category': expenses_by_category
+        return [tuple(row)[1:] for row in cursor.fetchall()]
+
+    @reads
+    def get_archive_totals(self):
+        """Income, expense and transaction count totals for every archive
+
+        Archived transactions no longer count towards the rollup; an archive's
+        stored totals are summed from its archived rows whenever rows are
+        written (see _store_archive_totals), so they are read as they are.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT id, month_year, name, date_range_start, date_range_end,
+                   total_income / 100.0 as total_income,
+                   total_expenses / 100.0 as total_expenses,
+                   transaction_count
+            FROM monthly_archives
+            ORDER BY month_year DESC, id DESC
+        ''')
+
+        return [dict(row) for row in cursor.fetchall()]
+
+    @cached
+    @reads
+    def get_timeseries(self, start_date, end_date, bucket='day', by_category=False, type='expense'):
+        """Income/expense totals per day, week (starting Monday) or month, zero-filled
+
+        One grouped query over the daily_category_totals rollup, or one
+        bincount over the analytics columns. With by_category, also returns
+        one series per category holding that category's `type` totals,
+        aligned with `points`.
+        """
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValueError(f"Invalid bucket '{bucket}', expected one of: {', '.join(TIMESERIES_BUCKETS)}")
+        if type not in ('income', 'expense'):
+            raise ValueError("Invalid type, expected 'income' or 'expense'")
+        start, end = parse_date(start_date), parse_date(end_date)
+        # Bound as text against the stored YYYY-MM-DD dates
+        start_date, end_date = start.isoformat(), end.isoformat()
+        periods = timeseries_periods(start, end, bucket)
+        if len(periods) > MAX_TIMESERIES_POINTS:
+            raise ValueError(f'Date range spans more than {MAX_TIMESERIES_POINTS} {bucket} buckets')
+
+        store = self._analytics_for(start_date, end_date)
+        if store is not None:
+            rows = store.grouped(start_date, end_date, bucket, by_category)
+        else:
+            group_by = 'period, r.type, r.category_id' if by_category else 'period, r.type'
+            rows = self.get_connection().execute(f'''
+                SELECT {TIMESERIES_BUCKETS[bucket]} as period, r.type, {'r.category_id' if by_category else '0'} as category_id,
+                       SUM(r.total) as total, SUM(r.count) as count
+                FROM daily_category_totals r
+                WHERE r.date BETWEEN ? AND ?
+                GROUP BY {group_by}
+            ''', (start_date, end_date)).fetchall()
+
+        index = {period: i for i, period in enumerate(periods)}
+        points = [{'period': period, 'income': 0, 'expenses': 0, 'net': 0, 'count': 0} for period in periods]
+        by_category_totals = {}
+
+        for row in rows:
+            point = points[index[row['period']]]
+            point['income' if row['type'] == 'income' else 'expenses'] += row['total']
+            point['count'] += row['count']
+            if by_category and row['type'] == type:
+                values = by_category_totals.setdefault(row['category_id'], [0] * len(periods))
+                values[index[row['period']]] += row['total']
+
+        # Summed in cents above, so only the final values are converted
+        for point in points:
+            point['net'] = from_cents(point['income'] - point['expenses'])
+            point['income'] = from_cents(point['income'])
+            point['expenses'] = from_cents(point['expenses'])
+
+        result = {
+            'bucket': bucket,
+            'start_date': start_date,
+            'end_date': end_date,
+            'points': points
         }
+
+        if by_category:
+            categories = {c['id']: c for c in self.get_categories()}
+            series = []
+            for category_id, values in by_category_totals.items():
+                category = categories.get(category_id, {})
+                series.append({
+                    'category_id': category_id or None,
+                    'name': category.get('name', 'Uncategorized'),
+                    'color': category.get('color'),
+                    'icon': category.get('icon'),
+                    'total': from_cents(sum(values)),
+                    'values': [from_cents(value) for value in values]
+                })
+            series.sort(key=lambda s: s['total'], reverse=True)
+            result['type'] = type
+            result['categories'] = series
+
+        return result
+
+    def _daily_totals_from_transactions_sql(self):
+        """SELECT that recomputes daily_category_totals from raw transactions"""
+        return '''
+            SELECT date, IFNULL(category_id, 0), type, SUM(amount), COUNT(*)
+            FROM transactions
+            GROUP BY date, IFNULL(category_id, 0), type
+        '''
+
+    @writes
+    def rebuild_daily_totals(self):
+        """Rebuild the daily_category_totals rollup from raw transactions"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('DELETE FROM daily_category_totals')
+            cursor.execute(
+                'INSERT INTO daily_category_totals (date, category_id, type, total, count) '
+                + self._daily_totals_from_transactions_sql()
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return True
+
+    @reads
+    def check_daily_totals(self, repair=False):
+        """Diff the daily_category_totals rollup against raw transactions
+
+        Returns a list of mismatched (date, category_id, type) keys with the
+        expected and stored total/count; totals are integer cents, so any
+        difference is a mismatch. With repair=True the rollup is rebuilt when
+        any mismatch is found.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        expected = {}
+        for date, category_id, type, total, count in cursor.execute(self._daily_totals_from_transactions_sql()):
+            expected[(date, category_id, type)] = (total, count)
+
+        stored = {}
+        cursor.execute('SELECT date, category_id, type, total, count FROM daily_category_totals')
+        for date, category_id, type, total, count in cursor.fetchall():
+            stored[(date, category_id, type)] = (total, count)
+
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys(), key=lambda k: (k[0], k[1], k[2])):
+            want_total, want_count = expected.get(key, (0, 0))
+            have_total, have_count = stored.get(key, (0, 0))
+            if want_count != have_count or want_total != have_total:
+                mismatches.append({
+                    'date': key[0],
+                    'category_id': key[1],
+                    'type': key[2],
+                    'expected_total': from_cents(want_total),
+                    'expected_count': want_count,
+                    'stored_total': from_cents(have_total),
+                    'stored_count': have_count
+                })
+
+        if mismatches and repair:
+            self.rebuild_daily_totals()
+
+        return mismatches
     
     # ============= STREAK METHODS =============
     
     def record_login(self, login_date=None):
-        """Record that user logged in today (for streak tracking)"""
-        from datetime import datetime
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        """Record that user logged in today (for streak tracking)
+
+        Repeat logins on the same day are recognised in memory and never
+        touch the database.
+        """
         # Use provided date or current date
         if login_date is None:
             login_date = datetime.now().strftime('%Y-%m-%d')
-        
+
+        if login_date == self._recorded_login_date:
+            return False
+
+        self._save_login(dt.date.fromisoformat(login_date).isoformat())
+        self._recorded_login_date = login_date
+        return True
+
+    @writes
+    def _save_login(self, login_date):
+        """Insert a login day and advance the streak state in user_stats"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
         # Insert today's login (ignore if already exists)
         cursor.execute('''
             INSERT OR IGNORE INTO login_days (login_date)
             VALUES (?)
         ''', (login_date,))
-        
-        conn.commit()
-        return True
-    
-    def get_current_streak(self, current_date=None):
-        """Calculate current streak of consecutive login days"""
+        if cursor.rowcount == 0:
+            return
+
+        cursor.execute('SELECT last_login_date, streak_start_date, longest_streak FROM user_stats WHERE id = 1')
+        last, start, longest = cursor.fetchone()
+        day = dt.date.fromisoformat(login_date)
+
+        if last is not None and day < dt.date.fromisoformat(last):
+            # A day before the latest login (dev date override) can join two runs
+            self._rebuild_streak_state(cursor)
+            return
+
+        if last is None or (day - dt.date.fromisoformat(last)).days > 1:
+            start = login_date
+        streak = (day - dt.date.fromisoformat(start)).days + 1
+
+        cursor.execute('''
+            UPDATE user_stats
+            SET last_login_date = ?, streak_start_date = ?, longest_streak = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        ''', (login_date, start, max(longest or 0, streak)))
+
+    def _rebuild_streak_state(self, cursor):
+        """Recompute the streak state in user_stats from every login day"""
+        cursor.execute('SELECT date(login_date) FROM login_days ORDER BY login_date')
+
+        start = last = None
+        longest = 0
+        for (value,) in cursor.fetchall():
+            day = dt.date.fromisoformat(value)
+            if last is not None and day <= last:
+                continue
+            if last is None or (day - last).days > 1:
+                start = day
+            last = day
+            longest = max(longest, (last - start).days + 1)
+
+        cursor.execute('''
+            UPDATE user_stats
+            SET last_login_date = ?, streak_start_date = ?,
+                longest_streak = MAX(IFNULL(longest_streak, 0), ?), updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        ''', (last and last.isoformat(), start and start.isoformat(), longest))
+
+    @writes
+    def rebuild_streak_state(self):
+        """Backfill the streak state from login_days (e.g. after editing it by hand)"""
+        self._rebuild_streak_state(self.get_connection().cursor())
+        self._recorded_login_date = None
+        return self.get_streak_state()
+
+    @reads
+    def get_streak_state(self, current_date=None):
+        """Current and longest streak from the state kept in user_stats"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        
-        # Get all unique login dates, ordered by date descending
-        cursor.execute('''
-            SELECT DISTINCT date(login_date) as login_date
-            FROM login_days
-            ORDER BY date(login_date) DESC
-        ''')
-        
-        dates = [row[0] for row in cursor.fetchall()]
-        
-        if not dates:
-            return 0
-        
+        cursor.execute('SELECT last_login_date, streak_start_date, longest_streak FROM user_stats WHERE id = 1')
+        row = cursor.fetchone()
+        if row is None:
+            return {'current_streak': 0, 'longest_streak': 0}
+        last, start, longest = row
+
         # Get today's date (or override date)
-        from datetime import datetime, timedelta
-        if current_date:
-            today = datetime.strptime(current_date, '%Y-%m-%d').date()
-        else:
-            today = datetime.now().date()
-        
-        # Convert string dates to date objects
-        date_objects = [datetime.strptime(d, '%Y-%m-%d').date() for d in dates]
-        
-        # Check if streak is still active
+        today = dt.date.fromisoformat(current_date) if current_date else datetime.now().date()
+
         # Streak is active if user logged in today OR yesterday
-        most_recent = date_objects[0]
-        days_since_last = (today - most_recent).days
-        
-        if days_since_last > 1:
-            # Streak is broken - no login yesterday or today
-            return 0
-        
-        # Count consecutive days
-        streak = 0
-        expected_date = most_recent
-        
-        for login_date in date_objects:
-            if login_date == expected_date:
-                streak += 1
-                expected_date = login_date - timedelta(days=1)
-            elif login_date == expected_date + timedelta(days=1):
-                # Skip if we're counting backwards and find today again
-                continue
-            else:
-                # Gap found, streak ends
-                break
-        
-        return streak
+        current = 0
+        if last is not None and (today - dt.date.fromisoformat(last)).days <= 1:
+            current = (dt.date.fromisoformat(last) - dt.date.fromisoformat(start)).days + 1
+
+        return {
+            'current_streak': current,
+            'longest_streak': max(longest or 0, current)
+        }
+
+    def get_current_streak(self, current_date=None):
+        """Calculate current streak of consecutive login days"""
+        return self.get_streak_state(current_date)['current_streak']
     
+    @reads
     def get_longest_streak(self):
         """Get the longest streak ever achieved"""
         conn = self.get_connection()
@@ -486,6 +1766,7 @@ class EnnaDatabase:
         result = cursor.fetchone()
         return result[0] if result else 0
     
+    @writes
     def update_longest_streak(self, streak):
         """Update longest streak if current streak is higher"""
         conn = self.get_connection()
@@ -504,21 +1785,11 @@ class EnnaDatabase:
     
     def get_streak_data(self, login_date=None, current_date=None):
         """Get comprehensive streak data and record today's login"""
-        # Record today's login automatically
+        # Record today's login automatically (a no-op after the first call of the day)
         self.record_login(login_date)
-        
-        current_streak = self.get_current_streak(current_date)
-        longest_streak = self.get_longest_streak()
-        
-        # Update longest streak if current is higher
-        self.update_longest_streak(current_streak)
-        longest_streak = max(longest_streak, current_streak)
-        
-        return {
-            'current_streak': current_streak,
-            'longest_streak': longest_streak
-        }
+        return self.get_streak_state(current_date)
     
+    @reads
     def get_login_days(self):
         """Get all login days for calendar display"""
         conn = self.get_connection()
@@ -528,6 +1799,7 @@ class EnnaDatabase:
     
     # ============= USER METHODS =============
     
+    @reads
     def get_user_name(self):
         """Get the user's name"""
         conn = self.get_connection()
@@ -536,6 +1808,7 @@ class EnnaDatabase:
         result = cursor.fetchone()
         return result[0] if result else 'Friend'
     
+    @writes
     def set_user_name(self, name):
         """Set the user's name"""
         conn = self.get_connection()
@@ -548,6 +1821,7 @@ class EnnaDatabase:
         conn.commit()
         return True
     
+    @reads
     def get_user_emoji(self):
         """Get user's profile emoji"""
         conn = self.get_connection()
@@ -556,6 +1830,7 @@ class EnnaDatabase:
         result = cursor.fetchone()
         return result['user_emoji'] if result and result['user_emoji'] else '👤'
     
+    @writes
     def set_user_emoji(self, emoji):
         """Set user's profile emoji"""
         conn = self.get_connection()
@@ -580,63 +1855,40 @@ class EnnaDatabase:
         conn.commit()
         return True
     
+    @writes
     def reset_database(self):
-        """Reset all data in the database and fix schema issues"""
+        """Reset all data in the database"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # First, fix any missing columns before clearing data
-        try:
-            # Check if transactions_json column exists in monthly_archives
-            cursor.execute("PRAGMA table_info(monthly_archives)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'transactions_json' not in columns:
-                cursor.execute('''
-                    ALTER TABLE monthly_archives 
-                    ADD COLUMN transactions_json TEXT
-                ''')
-                conn.commit()
-            
-            if 'date_range_start' not in columns:
-                cursor.execute('''
-                    ALTER TABLE monthly_archives 
-                    ADD COLUMN date_range_start TEXT
-                ''')
-                conn.commit()
-            
-            if 'date_range_end' not in columns:
-                cursor.execute('''
-                    ALTER TABLE monthly_archives 
-                    ADD COLUMN date_range_end TEXT
-                ''')
-                conn.commit()
-                
-        except Exception as e:
-            print(f"Schema check/update: {e}")
-        
-        # Now clear all data
+        # Clear all data
         cursor.execute('DELETE FROM transactions')
         cursor.execute('DELETE FROM budget_allocations')
         cursor.execute('DELETE FROM login_days')
+        cursor.execute('DELETE FROM archived_transactions')
         cursor.execute('DELETE FROM monthly_archives')
         
         # Reset user stats (keep structure, reset data)
         cursor.execute('''
             UPDATE user_stats 
-            SET user_name = 'Friend', longest_streak = 0, updated_at = CURRENT_TIMESTAMP
+            SET user_name = 'Friend', longest_streak = 0, last_login_date = NULL,
+                streak_start_date = NULL, updated_at = CURRENT_TIMESTAMP
             WHERE id = 1
         ''')
+        self._recorded_login_date = None
         
         conn.commit()
+        if self.analytics is not None:
+            self.analytics.clear()
         return True
     
     # ============= MONTHLY ARCHIVE METHODS =============
 
     
     
+    @writes
     def create_monthly_archive(self, month_year, summary_data, scores, transactions_json=None, date_range=None, name=None):
-        """Create a monthly archive snapshot
+        """Create a monthly archive snapshot from client-supplied data (see archive_period)
         
         Args:
             month_year: String in format 'YYYY-MM' (e.g. '2024-11')
@@ -646,54 +1898,214 @@ class EnnaDatabase:
             date_range: Dict with {start, end} date strings (optional)
             name: Custom name for the archive (optional)
         """
+        transactions = []
+        if transactions_json:
+            transactions = json.loads(transactions_json) if isinstance(transactions_json, str) else transactions_json
 
-        # Generate default name if missing
-        if not name and date_range:
-            try:
-                from datetime import datetime
-                start = datetime.strptime(date_range['start'], '%Y-%m-%d')
-                end = datetime.strptime(date_range['end'], '%Y-%m-%d')
-                name = f"{start.strftime('%b %d')} - {end.strftime('%d, %Y')}"
-            except: 
-                name = month_year
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        archive_id = self._write_archive_row(cursor, month_year, name, summary_data, scores, date_range)
+        self._insert_archived_rows(cursor, self._archived_rows(archive_id, transactions))
+        self._fill_fingerprints(cursor, 'archived_transactions', archive_id)
+        if transactions:
+            self._store_archive_totals(cursor, archive_id)
+
+        conn.commit()
+        return archive_id
+
+    @writes
+    def archive_period(self, start_date, end_date, month_year=None, name=None):
+        """Archive every transaction in a date range in one database transaction
+
+        Copies the rows into archived_transactions, computes the totals and
+        scores from the copied rows, writes the archive row and deletes the
+        source transactions. Nothing is committed until all of it succeeded.
+        Each call is its own archive; a range overlapping an archived one
+        raises ArchiveConflict.
+
+        Returns {archive_id, month_year, name, summary_data, scores, transactions_archived}
+        """
+        start = dt.date.fromisoformat(start_date)
+        end = dt.date.fromisoformat(end_date)
+        if start > end:
+            raise ValueError('start_date must not be after end_date')
+        # Compared as text against the stored YYYY-MM-DD dates
+        start_date, end_date = start.isoformat(), end.isoformat()
+        month_year = month_year or start_date[:7]
+        date_range = {'start': start_date, 'end': end_date}
 
         conn = self.get_connection()
         cursor = conn.cursor()
-        
+
+        archive_id = self._write_archive_row(cursor, month_year, name, {}, {}, date_range)
+
+        cursor.execute('''
+            INSERT INTO archived_transactions
+            (archive_id, original_id, type, amount, description, category_id, category_name, date, fingerprint)
+            SELECT ?, t.id, t.type, t.amount, t.description, t.category_id, c.name, t.date, t.fingerprint
+            FROM transactions t
+            LEFT JOIN categories c ON t.category_id = c.id
+            WHERE t.date BETWEEN ? AND ?
+        ''', (archive_id, start_date, end_date))
+
+        cursor.execute('''
+            SELECT IFNULL(SUM(CASE WHEN type = 'income' THEN amount END), 0) as total_income,
+                   IFNULL(SUM(CASE WHEN type = 'expense' THEN amount END), 0) as total_expenses,
+                   COUNT(*) as transaction_count
+            FROM archived_transactions
+            WHERE archive_id = ?
+        ''', (archive_id,))
+        totals = cursor.fetchone()
+        income, expenses = totals['total_income'], totals['total_expenses']
+        summary_data = {
+            'total_income': from_cents(income),
+            'total_expenses': from_cents(expenses),
+            'net': from_cents(income - expenses),
+            'transaction_count': totals['transaction_count']
+        }
+        scores = scoring.calculate_scores(
+            summary_data['total_income'], summary_data['total_expenses'], summary_data['transaction_count']
+        )
+
+        cursor.execute('''
+            UPDATE monthly_archives
+            SET total_income = ?, total_expenses = ?, net = ?, transaction_count = ?,
+                financial_health_score = ?, savings_score = ?, budget_score = ?,
+                consistency_score = ?, balance_score = ?
+            WHERE id = ?
+        ''', (
+            income,
+            expenses,
+            income - expenses,
+            summary_data['transaction_count'],
+            scores['overall'],
+            scores['savings'],
+            scores['budget'],
+            scores['consistency'],
+            scores['balance'],
+            archive_id
+        ))
+
+        archived_ids = self._analytics_ids(cursor, 'date BETWEEN ? AND ?', (start_date, end_date))
+        cursor.execute('DELETE FROM transactions WHERE date BETWEEN ? AND ?', (start_date, end_date))
+
+        conn.commit()
+        self._analytics_delete(archived_ids)
+        return {
+            'archive_id': archive_id,
+            'month_year': month_year,
+            'name': self._archive_name(month_year, name, date_range),
+            'summary_data': summary_data,
+            'scores': scores,
+            'transactions_archived': summary_data['transaction_count']
+        }
+
+    def _archive_name(self, month_year, name, date_range):
+        """Custom name, else one generated from the date range"""
+        if name or not date_range:
+            return name
+        try:
+            start = datetime.strptime(date_range['start'], '%Y-%m-%d')
+            end = datetime.strptime(date_range['end'], '%Y-%m-%d')
+            return f"{start.strftime('%b %d')} - {end.strftime('%d, %Y')}"
+        except (KeyError, TypeError, ValueError):
+            return month_year
+
+    def _write_archive_row(self, cursor, month_year, name, summary_data, scores, date_range):
+        """Insert a new monthly_archives row and return its id
+
+        Archives are keyed on their id, so an existing archive and its rows are
+        never replaced: a date range overlapping a stored archive's range, or a
+        second range-less archive for a month, raises ArchiveConflict.
+        """
+        if date_range:
+            overlap = cursor.execute('''
+                SELECT name, date_range_start, date_range_end FROM monthly_archives
+                WHERE date_range_end >= ? AND date_range_start <= ?
+                LIMIT 1
+            ''', (date_range['start'], date_range['end'])).fetchone()
+            if overlap:
+                raise ArchiveConflict(
+                    f"Date range overlaps archive '{overlap['name']}' "
+                    f"({overlap['date_range_start']} to {overlap['date_range_end']})"
+                )
+        elif cursor.execute('SELECT 1 FROM monthly_archives WHERE month_year = ?', (month_year,)).fetchone():
+            raise ArchiveConflict(f'{month_year} is already archived')
+
         cursor.execute('''
-            INSERT OR REPLACE INTO monthly_archives 
+            INSERT INTO monthly_archives 
             (month_year, name, total_income, total_expenses, net, financial_health_score,
              savings_score, budget_score, consistency_score, balance_score, transaction_count, 
              transactions_json, date_range_start, date_range_end)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             month_year,
-            name,
-            summary_data.get('total_income', 0),
-            summary_data.get('total_expenses', 0),
-            summary_data.get('net', 0),
+            self._archive_name(month_year, name, date_range),
+            to_cents(summary_data.get('total_income') or 0),
+            to_cents(summary_data.get('total_expenses') or 0),
+            to_cents(summary_data.get('net') or 0),
             scores.get('overall', 0),
             scores.get('savings', 0),
             scores.get('budget', 0),
             scores.get('consistency', 0),
             scores.get('balance', 0),
             summary_data.get('transaction_count', 0),
-            transactions_json,
+            None,
             date_range.get('start') if date_range else None,
             date_range.get('end') if date_range else None
         ))
-        
-        conn.commit()
         return cursor.lastrowid
+
+    def _store_archive_totals(self, cursor, archive_id=None):
+        """Set the stored totals of an archive (default: every archive) from its archived rows
+
+        Archives without archived rows keep the summary they were created with.
+        """
+        rows = 'FROM archived_transactions x WHERE x.archive_id = monthly_archives.id'
+        cursor.execute(f'''
+            UPDATE monthly_archives
+            SET total_income = (SELECT IFNULL(SUM(CASE WHEN x.type = 'income' THEN x.amount END), 0) {rows}),
+                total_expenses = (SELECT IFNULL(SUM(CASE WHEN x.type = 'expense' THEN x.amount END), 0) {rows}),
+                net = (SELECT IFNULL(SUM(CASE WHEN x.type = 'income' THEN x.amount ELSE -x.amount END), 0) {rows}),
+                transaction_count = (SELECT COUNT(*) {rows})
+            WHERE EXISTS (SELECT 1 {rows}){' AND id = ?' if archive_id is not None else ''}
+        ''', () if archive_id is None else (archive_id,))
+
+    def _archived_rows(self, archive_id, transactions, amount=None):
+        """Map transaction dicts (as returned by get_transactions) to archived_transactions rows
+
+        `amount` converts the dicts' dollar amounts to the stored value (cents by default).
+        """
+        amount = amount or to_cents
+        return [(
+            archive_id,
+            t.get('id'),
+            t['type'],
+            amount(t['amount']),
+            t.get('description'),
+            t.get('category_id'),
+            t.get('category_name'),
+            t['date']
+        ) for t in transactions]
+
+    def _insert_archived_rows(self, cursor, rows):
+        cursor.executemany('''
+            INSERT INTO archived_transactions
+            (archive_id, original_id, type, amount, description, category_id, category_name, date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
     
+    @cached
+    @reads
     def get_monthly_archives(self, limit=12):
         """Get monthly archives sorted by date (most recent first)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM monthly_archives 
-            ORDER BY month_year DESC 
+        cursor.execute(f'''
+            SELECT {ARCHIVE_SUMMARY_COLUMNS} FROM monthly_archives
+            ORDER BY month_year DESC, id DESC
             LIMIT ?
         ''', (limit,))
         
@@ -703,33 +2115,83 @@ class EnnaDatabase:
         
         return archives
     
+    @cached
+    @reads
     def get_archive_by_month(self, month_year):
-        """Get specific month archive"""
+        """Get a month's archive (its latest, when the month was archived in parts)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM monthly_archives 
+        cursor.execute(f'''
+            SELECT {ARCHIVE_SUMMARY_COLUMNS} FROM monthly_archives
             WHERE month_year = ?
+            ORDER BY id DESC
+            LIMIT 1
         ''', (month_year,))
         
         row = cursor.fetchone()
         return dict(row) if row else None
+
+    @reads
+    def get_archive_transactions(self, archive_id, limit=100, cursor=None):
+        """Get one page of an archive's transactions, newest first
+
+        Same keyset pagination as get_transactions_page: pass the returned
+        `next_cursor` back as `cursor` for the following page.
+
+        Returns {'transactions': [...], 'next_cursor': str or None}
+        """
+        limit = page_limit(limit)
+        conn = self.get_connection()
+        db_cursor = conn.cursor()
+
+        query = '''
+            SELECT id AS row_id, original_id AS id, type, amount / 100.0 AS amount, description,
+                   category_id, category_name, date
+            FROM archived_transactions
+            WHERE archive_id = ?
+        '''
+        params = [archive_id]
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor)
+            query += ' AND (date, archived_transactions.id) < (?, ?)'
+            params.extend([cursor_date, cursor_id])
+
+        # Page on the archived row id, which is unique even when original ids are missing
+        db_cursor.execute(query + ' ORDER BY date DESC, row_id DESC LIMIT ?', params + [limit + 1])
+        transactions = [dict(row) for row in db_cursor.fetchall()]
+
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last['date'], last['row_id'])
+
+        for t in transactions:
+            del t['row_id']
+
+        return {
+            'transactions': transactions,
+            'next_cursor': next_cursor
+        }
     
     def check_if_current_month_archived(self):
         """Check if current month has been archived"""
         current_month = datetime.now().strftime('%Y-%m')
         return self.get_archive_by_month(current_month) is not None
     
+    @cached
+    @reads
     def get_monthly_spending_chart_data(self, months=6):
         """Get monthly spending data for chart (last N months)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT month_year, name, total_income, total_expenses, net
+            SELECT month_year, name, total_income / 100.0 AS total_income,
+                   total_expenses / 100.0 AS total_expenses, net / 100.0 AS net
             FROM monthly_archives 
-            ORDER BY month_year DESC 
+            ORDER BY month_year DESC, id DESC
             LIMIT ?
         ''', (months,))
         
@@ -740,6 +2202,7 @@ class EnnaDatabase:
         # Reverse to show oldest to newest
         return list(reversed(data))
     
+    @writes
     def clear_current_month_transactions(self):
         """Clear all transactions from the current month (used after archiving)"""
         conn = self.get_connection()
@@ -750,6 +2213,7 @@ class EnnaDatabase:
         month_start = f"{now.year}-{now.month:02d}-01"
         
         # Delete all transactions from current month
+        deleted_ids = self._analytics_ids(cursor, 'date >= ?', (month_start,))
         cursor.execute('''
             DELETE FROM transactions 
             WHERE date >= ?
@@ -757,24 +2221,10 @@ class EnnaDatabase:
         
         deleted_count = cursor.rowcount
         conn.commit()
+        self._analytics_delete(deleted_ids)
         return deleted_count
 
-    def _check_schema_updates(self):
-        """Fixes existing databases by adding missing columns"""
-        conn = self.get_connection()
-        try:
-            conn.execute('ALTER TABLE monthly_archives ADD COLUMN name TEXT')
-        except: pass # Column likely exists
-        try:
-            conn.execute('ALTER TABLE monthly_archives ADD COLUMN transactions_json TEXT')
-        except: pass
-        try:
-            conn.execute('ALTER TABLE monthly_archives ADD COLUMN date_range_start TEXT')
-        except: pass
-        try:
-            conn.execute('ALTER TABLE monthly_archives ADD COLUMN date_range_end TEXT')
-        except: pass
-
+    @reads
     def get_next_archive_start_date(self):
         """Calculates start date based on the last archive"""
         conn = self.get_connection()
@@ -789,24 +2239,264 @@ class EnnaDatabase:
         first = cursor.fetchone()
         return first[0] if first and first[0] else datetime.now().strftime('%Y-%m-%d')
 
+    @writes
     def update_archive_name(self, archive_id, new_name):
         conn = self.get_connection()
         conn.execute('UPDATE monthly_archives SET name = ? WHERE id = ?', (new_name, archive_id))
         conn.commit()
         return True
 
+    @writes
     def clear_transactions_in_range(self, start, end):
         conn = self.get_connection()
         cursor = conn.cursor()
+        deleted_ids = self._analytics_ids(cursor, 'date >= ? AND date <= ?', (start, end))
         cursor.execute('DELETE FROM transactions WHERE date >= ? AND date <= ?', (start, end))
         conn.commit()
+        self._analytics_delete(deleted_ids)
         return cursor.rowcount
+
+    # ============= EXPORT METHODS =============
+
+    def iter_transactions(self, start_date=None, end_date=None, category_id=None, type=None,
+                          chunk_size=None):
+        """Yield every matching transaction, oldest first, in lists of up to chunk_size rows
+
+        Rows hold EXPORT_TRANSACTION_COLUMNS, amount in cents. The date index
+        already has the order, so the first chunk comes back without sorting;
+        only a category filter without a type sorts, that category's rows.
+        """
+        conditions, params = self._export_filters('t', start_date, end_date, category_id, type)
+        query = f'''
+            SELECT t.id, t.date, t.type, t.amount, t.category_id, c.name, t.description
+            FROM transactions t
+            LEFT JOIN categories c ON c.id = t.category_id
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY t.date, t.id
+        '''
+        return self._iter_rows(query, params, chunk_size)
+
+    def iter_archived_transactions(self, start_date=None, end_date=None, category_id=None, type=None,
+                                   archive_id=None, chunk_size=None):
+        """Yield every matching archived transaction by archive, then date, in lists of rows
+
+        Rows hold EXPORT_ARCHIVE_COLUMNS, amount in cents, in the order of
+        the (archive_id, date, id) index.
+        """
+        conditions, params = self._export_filters('x', start_date, end_date, category_id, type)
+        if archive_id is not None:
+            conditions.insert(0, 'x.archive_id = ?')
+            params.insert(0, archive_id)
+        query = f'''
+            SELECT x.archive_id, a.name, a.month_year, x.original_id, x.date, x.type, x.amount,
+                   x.category_id, x.category_name, x.description
+            FROM archived_transactions x
+            JOIN monthly_archives a ON a.id = x.archive_id
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY x.archive_id, x.date, x.id
+        '''
+        return self._iter_rows(query, params, chunk_size)
+
+    def _export_filters(self, table, start_date, end_date, category_id, type):
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append(f'{table}.date >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append(f'{table}.date <= ?')
+            params.append(end_date)
+        if category_id is not None:
+            conditions.append(f'{table}.category_id = ?')
+            params.append(category_id)
+        if type:
+            conditions.append(f'{table}.type = ?')
+            params.append(type)
+        return conditions, params
+
+    def _iter_rows(self, query, params, chunk_size):
+        """Step one statement on a pooled reader, yielding fetchmany chunks
+
+        The reader, and the read snapshot the statement started on, are held
+        until the generator is exhausted or closed; iterate it on one thread,
+        as a WSGI server does a streamed response body.
+        """
+        with self.pool.reader() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size or EXPORT_CHUNK)
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                # Ends the snapshot before the reader goes back to the pool
+                cursor.close()
     
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Close all database connections"""
+        self.pool.close()
+
+# Transaction columns as the API returns them, amount in dollars
+TRANSACTION_COLUMNS = '''
+    t.id, t.category_id, t.type, t.amount / 100.0 AS amount, t.description, t.date,
+    t.created_at, t.fingerprint
+'''
+
+# Rows of iter_transactions and iter_archived_transactions, in order
+EXPORT_TRANSACTION_COLUMNS = ('id', 'date', 'type', 'amount', 'category_id', 'category', 'description')
+EXPORT_ARCHIVE_COLUMNS = ('archive_id', 'archive_name', 'month_year', 'id', 'date', 'type', 'amount',
+                          'category_id', 'category', 'description')
+# Rows fetched per step of an export
+EXPORT_CHUNK = 1000
+
+# Archive listing columns; transactions live in archived_transactions
+ARCHIVE_SUMMARY_COLUMNS = '''
+    id, month_year, name, total_income / 100.0 AS total_income,
+    total_expenses / 100.0 AS total_expenses, net / 100.0 AS net, financial_health_score,
+    savings_score, budget_score, consistency_score, balance_score, transaction_count,
+    date_range_start, date_range_end, archived_at
+'''
+
+# Searchable sources and the table each one reads
+SEARCH_TABLES = {
+    'transaction': 'transactions',
+    'archived': 'archived_transactions',
+}
+SEARCH_SCOPES = {
+    'transactions': ('transaction',),
+    'archived': ('archived',),
+    'all': ('transaction', 'archived'),
+}
+SEARCH_SORTS = ('relevance', 'date')
+# Most rows one page of transactions, archived transactions or search results holds
+MAX_PAGE = 1000
+# Above this many matches, scoring and sorting every one costs more than
+# walking the date index, so search falls back to newest first
+SEARCH_RANK_LIMIT = 5000
+
+# SQL expressions mapping a rollup date to the first day of its bucket
+TIMESERIES_BUCKETS = {
+    'day': 'r.date',
+    'week': "date(r.date, printf('-%d days', (CAST(strftime('%w', r.date) AS INTEGER) + 6) % 7))",
+    'month': "substr(r.date, 1, 7) || '-01'",
+}
+
+# Keeps a single timeseries response bounded (about 13 years of days)
+MAX_TIMESERIES_POINTS = 5000
+
+def parse_date(value):
+    """'YYYY-MM-DD' -> date, raising ValueError for any other form
+
+    fromisoformat alone also takes 20240301 and 2024-W09-5, which compare
+    wrongly against the stored dates.
+    """
+    try:
+        if not re.fullmatch(r'[0-9]{4}-[0-9]{2}-[0-9]{2}', value):
+            raise ValueError
+        return dt.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def timeseries_periods(start, end, bucket):
+    """First day of every bucket between two dates, as ISO strings (matches TIMESERIES_BUCKETS)"""
+    if start > end:
+        raise ValueError('start_date must not be after end_date')
+    if bucket == 'week':
+        current = start - dt.timedelta(days=start.weekday())
+    elif bucket == 'month':
+        current = start.replace(day=1)
+    else:
+        current = start
+
+    periods = []
+    while current <= end and len(periods) <= MAX_TIMESERIES_POINTS:
+        periods.append(current.isoformat())
+        if bucket == 'month':
+            current = (current.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+        else:
+            current += dt.timedelta(days=7 if bucket == 'week' else 1)
+    return periods
+
+# Amounts and totals are stored as integer cents; the API takes and returns
+# decimal amounts. SQL converting a dollar column, as the migration did:
+CENTS_FROM_DOLLARS_SQL = 'CAST(ROUND({0} * 100) AS INTEGER)'
+# SQLite integers are 64-bit
+MAX_CENTS = 2 ** 63 - 1
+
+def to_cents(amount):
+    """Decimal amount (number or numeric string) -> integer cents, halves rounded away from zero"""
+    try:
+        cents = int(decimal.Decimal(str(amount).strip()).scaleb(2).quantize(0, decimal.ROUND_HALF_UP))
+    except (decimal.InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount '{amount}'")
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f"Invalid amount '{amount}'")
+    return cents
+
+def from_cents(cents):
+    """Integer cents -> decimal amount, the float closest to the exact value"""
+    return cents / 100
+
+def format_cents(cents):
+    """Integer cents -> exact decimal string with two places, e.g. -1205 -> '-12.05'"""
+    sign = '-' if cents < 0 else ''
+    whole, part = divmod(abs(cents), 100)
+    return f'{sign}{whole}.{part:02d}'
+
+# Rows fingerprinted per statement by _fill_fingerprints
+FINGERPRINT_CHUNK = 10000
+
+# Helper functions for duplicate detection
+def normalize_description(description):
+    """Lowercase with whitespace runs collapsed, so re-exported descriptions compare equal"""
+    return ' '.join((description or '').lower().split())
+
+def fingerprint_base(type, date, cents, description):
+    """Hash of what identifies a transaction across imports: type, date, cents and description"""
+    key = f'{type}|{date}|{cents}|{normalize_description(description)}'
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def transaction_fingerprint(base, occurrence):
+    """Fingerprint of the occurrence-th (from 1) row with this base on its day"""
+    return f'{base}:{occurrence}'
+
+# Helper functions for keyset pagination cursors
+def page_limit(limit):
+    """A page size between 1 and MAX_PAGE; larger ones are clamped, smaller ones raise ValueError"""
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_PAGE)
+
+def encode_cursor(date, row_id):
+    """Encode a (date, id) position as an opaque URL-safe cursor"""
+    return base64.urlsafe_b64encode(f'{date}|{row_id}'.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return date, int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+def encode_search_cursor(sort, rank, date, source, row_id):
+    """Encode a search result position (see search_transactions) as an opaque cursor"""
+    raw = f'{sort}|{float(rank)!r}|{date}|{source}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_search_cursor(cursor):
+    """Decode a cursor from encode_search_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort, rank, date, source, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        if sort not in SEARCH_SORTS or source not in SEARCH_TABLES:
+            raise ValueError(sort)
+        return sort, float(rank), date, source, int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
 
 # Helper function to hash passwords
 def hash_password(password):
@@ -0,0 +1,114 @@
+"""Enna backend launcher
+
+Usage (from enna-backend/):
+    python -m enna serve [--host 127.0.0.1] [--port 5000] [--threads 8] [--db enna.db]
+    python -m enna serve --dev      # Flask development server with debugger and reloader
+    python -m enna serve --profile header --slow-query-ms 50    # diagnostics (see profiling.py)
+    python -m enna serve --analytics numpy    # aggregates from in-memory columns (see analytics.py)
+
+`serve` runs the API on waitress, a pure-Python multi-threaded WSGI server,
+with debug off. The database is warmed up (pool opened, planner statistics
+refreshed, aggregate caches primed) before the first request is accepted.
+"""
+import argparse
+import os
+import sys
+import time
+
+from profiling import PROFILE_HEADER, PROFILE_MODES
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+# One reader connection per worker thread, so requests never queue for a connection
+DEFAULT_THREADS = 8
+
+
+def load_app(args):
+    """Import app.py configured through its environment variables"""
+    os.environ['ENNA_DB_PATH'] = args.db
+    os.environ['ENNA_DB_READERS'] = str(args.threads)
+    os.environ['ENNA_PROFILE'] = args.profile
+    os.environ['ENNA_PROFILE_DIR'] = args.profile_dir
+    os.environ['ENNA_ANALYTICS'] = args.analytics
+    if args.slow_query_ms is not None:
+        os.environ['ENNA_SLOW_QUERY_MS'] = str(args.slow_query_ms)
+        os.environ['ENNA_SLOW_QUERY_LOG'] = args.slow_query_log
+    import app
+    return app
+
+
+def serve(args):
+    if args.dev:
+        app = load_app(args)
+        print(f"🛠️ Development server on http://{args.host}:{args.port} (debug, reloader)")
+        app.app.run(host=args.host, port=args.port, debug=True)
+        return 0
+
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        print("❌ waitress is not installed: pip install -r requirements.txt")
+        return 1
+
+    app = load_app(args)
+
+    started = time.perf_counter()
+    warm = app.db.warm_up()
+    print(f"🔥 Warmed up in {(time.perf_counter() - started) * 1000:.0f}ms: "
+          f"{warm['readers']} reader connections, {warm['cache_entries']} cached aggregates")
+    if args.profile != 'off':
+        print(f"🔬 Profiling {args.profile} requests into {args.profile_dir}/")
+    if args.slow_query_ms is not None:
+        print(f"🐢 Logging statements over {args.slow_query_ms:g}ms to {args.slow_query_log}")
+    print(f"🚀 Serving Enna on http://{args.host}:{args.port} with {args.threads} threads")
+
+    try:
+        waitress_serve(app.app, host=args.host, port=args.port, threads=args.threads, ident='Enna')
+    finally:
+        app.db.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m enna', description='Enna backend launcher')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Run the API server')
+    slow_query_ms = os.environ.get('ENNA_SLOW_QUERY_MS')
+    serve_parser.add_argument('--host', default=os.environ.get('ENNA_HOST', DEFAULT_HOST))
+    serve_parser.add_argument('--port', type=int, default=int(os.environ.get('ENNA_PORT', DEFAULT_PORT)))
+    serve_parser.add_argument('--threads', type=int, default=int(os.environ.get('ENNA_THREADS', DEFAULT_THREADS)),
+                              help='Worker threads (also the number of pooled reader connections)')
+    serve_parser.add_argument('--db', default=os.environ.get('ENNA_DB_PATH', 'enna.db'),
+                              help='SQLite database file')
+    serve_parser.add_argument('--dev', action='store_true',
+                              help="Use Flask's development server with debugger and reloader")
+    serve_parser.add_argument('--profile', choices=PROFILE_MODES,
+                              default=os.environ.get('ENNA_PROFILE', 'off'),
+                              help=f'cProfile requests, one at a time: all of them, or only those sending {PROFILE_HEADER}: 1')
+    serve_parser.add_argument('--profile-dir', default=os.environ.get('ENNA_PROFILE_DIR', 'profiles'),
+                              help='Directory for .pstats files, one subdirectory per endpoint')
+    serve_parser.add_argument('--slow-query-ms', type=float,
+                              default=float(slow_query_ms) if slow_query_ms else None,
+                              help='Log statements slower than this with their query plan')
+    serve_parser.add_argument('--slow-query-log', default=os.environ.get('ENNA_SLOW_QUERY_LOG', 'slow_queries.log'),
+                              help='JSON lines file for the slow-query log')
+    serve_parser.add_argument('--analytics', choices=('sql', 'numpy'),
+                              default=os.environ.get('ENNA_ANALYTICS', 'sql'),
+                              help='Answer summaries, budgets and time series from SQL or from NumPy columns '
+                                   'kept in memory (needs numpy)')
+    serve_parser.set_defaults(handler=serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.threads < 1:
+        print("❌ --threads must be at least 1")
+        return 2
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
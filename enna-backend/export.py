@@ -0,0 +1,88 @@
+"""Streaming CSV and JSON Lines export of transactions and archives
+
+The mirror of ingestion.py: rows come from EnnaDatabase.iter_transactions
+and iter_archived_transactions one fetchmany chunk at a time and leave as
+text one chunk at a time, so a response body built from these generators
+starts with the header straight away and holds at most one chunk in memory
+however many years of history it covers.
+
+Arguments are validated before the generator is returned, so a bad filter
+becomes an error response instead of a broken download.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+from database import EXPORT_ARCHIVE_COLUMNS, EXPORT_TRANSACTION_COLUMNS, format_cents, from_cents
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def _check_filters(format, start_date, end_date, type):
+    if format not in FORMATS:
+        raise ValueError(f"Invalid format '{format}', expected one of: {', '.join(FORMATS)}")
+    for name, value in (('start_date', start_date), ('end_date', end_date)):
+        if value:
+            try:
+                if len(value) != 10:
+                    raise ValueError
+                date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid {name} '{value}': expected YYYY-MM-DD")
+    if type and type not in ('income', 'expense'):
+        raise ValueError("Invalid type, expected 'income' or 'expense'")
+
+
+def export_transactions(db, format='csv', start_date=None, end_date=None, category_id=None, type=None):
+    """Generator of text chunks exporting live transactions, oldest first"""
+    _check_filters(format, start_date, end_date, type)
+    chunks = db.iter_transactions(start_date, end_date, category_id, type)
+    return _render(format, EXPORT_TRANSACTION_COLUMNS, chunks)
+
+
+def export_archives(db, format='csv', start_date=None, end_date=None, category_id=None, type=None,
+                    archive_id=None):
+    """Generator of text chunks exporting archived transactions, archive by archive"""
+    _check_filters(format, start_date, end_date, type)
+    chunks = db.iter_archived_transactions(start_date, end_date, category_id, type, archive_id)
+    return _render(format, EXPORT_ARCHIVE_COLUMNS, chunks)
+
+
+def _render(format, columns, chunks):
+    amount = columns.index('amount')
+    if format == 'csv':
+        return _csv(columns, chunks, amount)
+    return _jsonl(columns, chunks, amount)
+
+
+def _csv(columns, chunks, amount):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            row = list(row)
+            # Exact and positive, so a re-import (ingestion.py reads the type
+            # column) produces the same fingerprints
+            row[amount] = format_cents(row[amount])
+            writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def _jsonl(columns, chunks, amount):
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            record['amount'] = from_cents(record['amount'])
+            lines.append(json.dumps(record, ensure_ascii=False))
+        lines.append('')
+        yield '\n'.join(lines)
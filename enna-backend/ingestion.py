@@ -0,0 +1,296 @@
+"""Streaming CSV ingestion for bank exports
+
+Parses Chase, Wells Fargo and Bank of America CSV exports row by row and
+feeds fixed-size chunks into EnnaDatabase.add_transactions_bulk, so memory
+stays flat no matter how many years of history the file holds.
+"""
+import csv
+import io
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain
+
+CHUNK_SIZE = 1000
+
+# How many leading lines to search for a header (Bank of America puts a
+# summary block above the real header)
+HEADER_SCAN_LINES = 20
+
+DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%m-%d-%Y')
+
+# Category keywords for auto-detection (mirrors CSVImportModal.jsx)
+CATEGORY_KEYWORDS = {
+    'Food & Dining': ['restaurant', 'food', 'grocery', 'cafe', 'coffee', 'dining', 'lunch', 'dinner', 'breakfast', 'mcdonalds', 'burger', 'pizza', 'starbucks', 'supermarket', 'market'],
+    'Transportation': ['gas', 'fuel', 'uber', 'lyft', 'taxi', 'parking', 'transit', 'bus', 'train', 'metro', 'subway', 'car', 'vehicle'],
+    'Shopping': ['amazon', 'target', 'walmart', 'shop', 'store', 'retail', 'purchase', 'clothing', 'shoes', 'electronics'],
+    'Entertainment': ['movie', 'theater', 'cinema', 'netflix', 'spotify', 'game', 'concert', 'ticket', 'entertainment', 'hulu', 'disney'],
+    'Bills & Utilities': ['electric', 'water', 'gas bill', 'internet', 'phone', 'utility', 'bill', 'insurance', 'rent', 'mortgage'],
+    'Healthcare': ['doctor', 'hospital', 'pharmacy', 'medical', 'health', 'clinic', 'dental', 'cvs', 'walgreens', 'medicine'],
+    'Income': ['salary', 'paycheck', 'wage', 'income', 'deposit', 'payment received', 'refund'],
+}
+
+
+class BankProfile:
+    """Column layout of one bank's CSV export"""
+
+    def __init__(self, name, date, description, amount, type_column=None, required=(), has_header=True):
+        self.name = name
+        self.date = date
+        self.description = description
+        self.amount = amount
+        self.type_column = type_column
+        self.required = {h.lower() for h in required}
+        self.has_header = has_header
+
+    def matches(self, header):
+        return self.has_header and self.required <= {h.lower() for h in header}
+
+
+# Ordered most specific first; the generic profile catches everything else
+BANK_PROFILES = [
+    BankProfile('chase_checking', 'Posting Date', 'Description', 'Amount', type_column='Details',
+                required=('Details', 'Posting Date', 'Description', 'Amount')),
+    BankProfile('chase_credit', 'Transaction Date', 'Description', 'Amount', type_column='Type',
+                required=('Transaction Date', 'Post Date', 'Description', 'Amount')),
+    BankProfile('bofa_credit', 'Posted Date', 'Payee', 'Amount',
+                required=('Posted Date', 'Reference Number', 'Payee', 'Amount')),
+    BankProfile('bofa_checking', 'Date', 'Description', 'Amount',
+                required=('Date', 'Description', 'Amount', 'Running Bal.')),
+    # Wells Fargo exports have no header: date, amount, '*', check number, description
+    BankProfile('wells_fargo', 0, 4, 1, has_header=False),
+]
+
+PROFILES_BY_NAME = {p.name: p for p in BANK_PROFILES}
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value):
+    """Normalize a bank date to YYYY-MM-DD (exports repeat the same few dates)"""
+    value = value.strip()
+    parts = value.split('/')
+    if len(parts) == 3 and len(parts[2]) == 4:
+        # MM/DD/YYYY fast path, strptime is slow enough to dominate large imports
+        try:
+            return date(int(parts[2]), int(parts[0]), int(parts[1])).isoformat()
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'")
+
+
+def _parse_amount(value):
+    value = value.strip().replace('$', '').replace(',', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    return float(value)
+
+
+def _is_header(row):
+    line = ','.join(row).lower()
+    return 'date' in line and ('description' in line or 'amount' in line or 'payee' in line)
+
+
+def _looks_like_wells_fargo(row):
+    if len(row) != 5 or row[2].strip() != '*':
+        return False
+    try:
+        _parse_date(row[0])
+        _parse_amount(row[1])
+        return True
+    except ValueError:
+        return False
+
+
+def _generic_profile(header):
+    """Pick date/description/amount columns by name, like the import modal does"""
+    lower = [h.lower().strip() for h in header]
+
+    def pick(exact, contains):
+        for name in exact:
+            if name in lower:
+                return header[lower.index(name)]
+        for i, h in enumerate(lower):
+            if any(word in h for word in contains):
+                return header[i]
+        return None
+
+    date = pick(('date', 'transaction date', 'trans date', 'posting date', 'posted date', 'post date'), ('date',))
+    description = pick(('description', 'memo', 'details', 'merchant', 'payee', 'name'), ('description', 'merchant', 'memo'))
+    amount = pick(('amount',), ('amount',))
+    type_column = pick(('type', 'transaction type'), ())
+    if not (date and description and amount):
+        raise ValueError('Could not find date, description and amount columns in CSV header')
+    return BankProfile('generic', date, description, amount, type_column=type_column)
+
+
+def detect_profile(rows, bank=None):
+    """Consume leading rows until the header and return (profile, header, rows)
+
+    `rows` is the csv.reader iterator; the returned iterator yields the data
+    rows that follow the header (including the first row for headerless
+    Wells Fargo files).
+    """
+    if bank is not None and bank not in PROFILES_BY_NAME:
+        raise ValueError(f"Unknown bank profile '{bank}'")
+
+    for _ in range(HEADER_SCAN_LINES):
+        row = next(rows, None)
+        if row is None:
+            break
+        if not any(cell.strip() for cell in row):
+            continue
+
+        if (bank == 'wells_fargo' or bank is None) and _looks_like_wells_fargo(row):
+            return PROFILES_BY_NAME['wells_fargo'], None, chain([row], rows)
+
+        if _is_header(row):
+            header = [h.strip().strip('"') for h in row]
+            if bank is not None:
+                profile = PROFILES_BY_NAME[bank]
+                if not profile.matches(header):
+                    raise ValueError(f"CSV header does not match the '{bank}' profile")
+                return profile, header, rows
+            for profile in BANK_PROFILES:
+                if profile.matches(header):
+                    return profile, header, rows
+            return _generic_profile(header), header, rows
+
+    raise ValueError('No transaction header found in CSV')
+
+
+def _detect_type(profile, row_value, amount):
+    if profile.type_column is not None and row_value:
+        value = row_value.strip().lower()
+        # Enna's own export (and most budgeting apps) spell the type out
+        if value in ('income', 'expense'):
+            return value
+        if any(word in value for word in ('credit', 'deposit', 'income')):
+            return 'income'
+        if any(word in value for word in ('debit', 'withdrawal')):
+            return 'expense'
+    return 'income' if amount > 0 else 'expense'
+
+
+def default_category_id(categories):
+    """The catch-all category (Other/Misc) id, or None"""
+    return next((c['id'] for c in categories
+                 if 'other' in c['name'].lower() or 'misc' in c['name'].lower()), None)
+
+
+def build_category_matcher(categories, use_default=True):
+    """Return a function mapping a description to a category id (or None)
+
+    Descriptions without a keyword go to the catch-all category unless
+    use_default is False.
+    """
+    by_name = {c['name'].lower(): c['id'] for c in categories}
+    keyword_ids = []
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        category_id = by_name.get(category.lower())
+        if category_id is not None:
+            keyword_ids.append((category_id, keywords))
+
+    fallback = default_category_id(categories) if use_default else None
+
+    def match(description):
+        lower = description.lower()
+        for category_id, keywords in keyword_ids:
+            if any(keyword in lower for keyword in keywords):
+                return category_id
+        return fallback
+
+    return match
+
+
+def parse_transactions(rows, profile, header, categorize, stats):
+    """Yield transaction dicts for each data row, counting skipped rows in stats"""
+    if profile.has_header:
+        index = {h: i for i, h in enumerate(header)}
+        date_i = index[profile.date]
+        desc_i = index[profile.description]
+        amount_i = index[profile.amount]
+        type_i = index.get(profile.type_column) if profile.type_column else None
+    else:
+        date_i, desc_i, amount_i, type_i = profile.date, profile.description, profile.amount, None
+
+    width = max(i for i in (date_i, desc_i, amount_i, type_i) if i is not None) + 1
+
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        stats['rows_parsed'] += 1
+        if len(row) < width:
+            stats['rows_skipped'] += 1
+            continue
+        try:
+            date = _parse_date(row[date_i])
+            amount = _parse_amount(row[amount_i])
+        except ValueError:
+            # Summary lines ("Beginning balance", "Total", ...) and blanks
+            stats['rows_skipped'] += 1
+            continue
+
+        description = row[desc_i].strip()
+        type = _detect_type(profile, row[type_i] if type_i is not None else None, amount)
+        yield {
+            'type': type,
+            'amount': abs(amount),
+            'description': description,
+            'category_id': categorize(description),
+            'date': date,
+        }
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_csv(db, stream, bank=None, chunk_size=CHUNK_SIZE, categorize=None):
+    """Stream a CSV export from a binary file object into the transactions table
+
+    `categorize` maps a description to a category id; the keyword rules are
+    used by default. Returns a dict with the detected profile and rows
+    parsed/skipped/inserted/failed and duplicate (already imported, see
+    EnnaDatabase.add_transactions_bulk).
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    rows = csv.reader(text)
+
+    profile, header, rows = detect_profile(rows, bank)
+    stats = {
+        'profile': profile.name,
+        'rows_parsed': 0,
+        'rows_skipped': 0,
+        'rows_inserted': 0,
+        'rows_failed': 0,
+        'rows_duplicate': 0,
+    }
+
+    if categorize is None:
+        categorize = build_category_matcher(db.get_categories())
+    transactions = parse_transactions(rows, profile, header, categorize, stats)
+
+    # Shared across chunks so identical rows on either side of a chunk
+    # boundary keep distinct fingerprints
+    occurrences = {}
+    for chunk in _chunks(transactions, chunk_size):
+        for result in db.add_transactions_bulk(chunk, occurrences):
+            if result['status'] == 'success':
+                stats['rows_inserted'] += 1
+            elif result['status'] == 'duplicate':
+                stats['rows_duplicate'] += 1
+            else:
+                stats['rows_failed'] += 1
+
+    return stats
@@ -0,0 +1,205 @@
+"""Request and SQL metrics in Prometheus text format
+
+The connection pool reports every statement's execute/fetch time and every
+wait for a connection; app.py brackets each request with start_request()
+and finish_request(). Per-request totals are kept in a thread-local, since
+each request runs start to finish on one worker thread.
+"""
+import threading
+
+# Upper bounds in seconds; the last bucket is always +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Family:
+    """A named metric with one histogram or counter value per label set"""
+
+    def __init__(self, name, kind, help, label_names=(), buckets=None):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = Histogram(self.buckets)
+        series.observe(value)
+
+    def inc(self, labels=(), amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for labels, series in sorted(self.series.items()):
+            if self.kind != 'histogram':
+                lines.append(f'{self.name}{_labels(self.label_names, labels)} {_number(series)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series.counts):
+                cumulative += count
+                le = ('le', _number(float(bound)))
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(series.sum)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {series.count}')
+        return lines
+
+
+class Metrics:
+    """Thread-safe registry of the request, SQL and pool metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (thread, counters list) of each live thread that recorded metrics
+        # (see _counters), and the totals of those that have exited since
+        self._threads = []
+        self._exited = [0, 0.0]
+        endpoint = ('method', 'endpoint')
+        self.requests = Family(
+            'enna_http_requests_total', 'counter',
+            'HTTP requests by route and status code', endpoint + ('status',))
+        self.latency = Family(
+            'enna_http_request_duration_seconds', 'histogram',
+            'Time from routing to response, per route', endpoint, LATENCY_BUCKETS)
+        self.request_statements = Family(
+            'enna_http_request_sql_statements', 'histogram',
+            'SQL statements executed per request', endpoint, STATEMENT_BUCKETS)
+        self.request_sql_time = Family(
+            'enna_http_request_sql_duration_seconds', 'histogram',
+            'Time spent in SQLite execute and fetch calls per request', endpoint, LATENCY_BUCKETS)
+        self.request_wait_time = Family(
+            'enna_http_request_pool_wait_seconds', 'histogram',
+            'Time spent waiting for a database connection per request', endpoint, WAIT_BUCKETS)
+        self.pool_wait = Family(
+            'enna_db_pool_wait_seconds', 'histogram',
+            'Wait for the writer lock or a free reader connection', ('connection',), WAIT_BUCKETS)
+        self.statements = Family(
+            'enna_db_statements_total', 'counter', 'SQL statements executed')
+        self.sql_time = Family(
+            'enna_db_sql_seconds_total', 'counter',
+            'Time spent in SQLite execute, fetch and commit calls')
+        self._families = (self.requests, self.latency, self.request_statements,
+                          self.request_sql_time, self.request_wait_time, self.pool_wait,
+                          self.statements, self.sql_time)
+
+    def _counters(self):
+        """This thread's [statements, sql seconds] since startup and since start_request,
+        plus pool wait seconds since start_request"""
+        try:
+            return self._local.counters
+        except AttributeError:
+            counters = self._local.counters = [0, 0.0, 0, 0.0, 0.0]
+            with self._lock:
+                self._fold_exited()
+                self._threads.append((threading.current_thread(), counters))
+            return counters
+
+    def _fold_exited(self):
+        """Add the totals of threads that have exited to _exited and drop their counters
+
+        Call with the lock held. A thread-per-request server would otherwise
+        leave one counters list behind per request; an exited thread no
+        longer writes to its list, so it can be read without a race.
+        """
+        live = []
+        for thread, counters in self._threads:
+            if thread.is_alive():
+                live.append((thread, counters))
+            else:
+                self._exited[0] += counters[0]
+                self._exited[1] += counters[1]
+        self._threads = live
+
+    def start_request(self):
+        """Begin counting SQL and pool waits for the request on this thread"""
+        counters = self._counters()
+        counters[2:] = [0, 0.0, 0.0]
+
+    def record_sql(self, seconds, statements=1):
+        """Called by the pool's connections after each execute/fetch/commit
+
+        Lock-free: each thread only adds to its own counters, which render()
+        sums up.
+        """
+        counters = self._counters()
+        counters[0] += statements
+        counters[1] += seconds
+        counters[2] += statements
+        counters[3] += seconds
+
+    def record_wait(self, connection, seconds):
+        """Called by the pool after acquiring the writer lock or a reader"""
+        self._counters()[4] += seconds
+        with self._lock:
+            self.pool_wait.observe((connection,), seconds)
+
+    def finish_request(self, method, endpoint, status, seconds):
+        """Record a finished request with the SQL totals gathered since start_request"""
+        counters = self._counters()
+        statements, sql_seconds, wait_seconds = counters[2:]
+        labels = (method, endpoint)
+        with self._lock:
+            self.requests.inc(labels + (str(status),))
+            self.latency.observe(labels, seconds)
+            self.request_statements.observe(labels, statements)
+            self.request_sql_time.observe(labels, sql_seconds)
+            self.request_wait_time.observe(labels, wait_seconds)
+        counters[2:] = [0, 0.0, 0.0]
+        return {'statements': statements, 'sql_seconds': sql_seconds, 'wait_seconds': wait_seconds}
+
+    def render(self, extra=()):
+        """Prometheus text exposition of every metric, plus (name, kind, help, value) samples"""
+        with self._lock:
+            self._fold_exited()
+            self.statements.series[()] = self._exited[0] + sum(counters[0] for _, counters in self._threads)
+            self.sql_time.series[()] = self._exited[1] + sum(counters[1] for _, counters in self._threads)
+            lines = [line for family in self._families for line in family.render()]
+        for name, kind, help, value in extra:
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}', f'{name} {_number(value)}']
+        return '\n'.join(lines) + '\n'
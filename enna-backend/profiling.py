@@ -0,0 +1,142 @@
+"""Opt-in request profiling and slow-query logging
+
+Both are off unless configured (see app.py and `python -m enna serve`):
+
+  * RequestProfiler runs cProfile around a request and writes a .pstats
+    file per request under a directory per endpoint. Open one with
+    `python -m pstats FILE` or snakeviz.
+  * SlowQueryLog receives every statement whose execute + fetch time
+    crosses a threshold from the pool's connections, and appends it as a
+    JSON line with its parameters and EXPLAIN QUERY PLAN.
+
+When disabled the cost is one attribute check per request and per statement.
+"""
+import cProfile
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+
+PROFILE_MODES = ('off', 'header', 'all')
+PROFILE_HEADER = 'X-Enna-Profile'
+# Slow queries kept in memory for /api/debug/slow-queries
+RECENT_SLOW_QUERIES = 100
+
+
+def _endpoint_dirname(method, endpoint):
+    """'GET', '/api/archives/<int:archive_id>' -> 'GET_api_archives_int_archive_id'"""
+    return method + '_' + (re.sub(r'[^A-Za-z0-9]+', '_', endpoint).strip('_') or 'root')
+
+
+class RequestProfiler:
+    """cProfile individual requests, selected by mode
+
+    'header' profiles only requests that send `X-Enna-Profile: 1`, 'all'
+    profiles every request. Only one request is profiled at a time: Python
+    3.12+ allows a single active profiler per process, so a request that
+    arrives while another is being profiled is served unprofiled.
+    """
+
+    def __init__(self, directory='profiles', mode='off'):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {', '.join(PROFILE_MODES)}")
+        self.directory = directory
+        self.mode = mode
+        self.enabled = mode != 'off'
+        self._lock = threading.Lock()
+
+    def wants(self, headers):
+        """Whether to profile a request with these headers"""
+        return self.mode == 'all' or (
+            self.mode == 'header' and headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'))
+
+    def start(self):
+        """Start profiling the current request, or return None if the profiler is busy"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) is active
+            self._lock.release()
+            return None
+        return profile
+
+    def stop(self, profile):
+        """Stop a profile without writing it, e.g. for a request that failed"""
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+
+    def finish(self, profile, method, endpoint, seconds):
+        """Stop profiling and write the stats file; returns its path"""
+        self.stop(profile)
+        directory = os.path.join(self.directory, _endpoint_dirname(method, endpoint))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{seconds * 1000:.0f}ms.pstats")
+        profile.dump_stats(path)
+        return path
+
+
+class SlowQueryLog:
+    """Collects statements slower than a threshold, with their query plans"""
+
+    def __init__(self, threshold_ms, path=None):
+        self.threshold_seconds = threshold_ms / 1000
+        self.path = path
+        self.recent = deque(maxlen=RECENT_SLOW_QUERIES)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _plan(self, conn, sql, parameters):
+        if parameters is None:
+            return None
+        try:
+            # A plain cursor, so the EXPLAIN itself is not timed or logged
+            cursor = sqlite3.Cursor(conn)
+            rows = cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f'unavailable: {e}']
+
+    def record(self, conn, sql, parameters, seconds):
+        """Log a slow statement; parameters is None for executemany/executescript"""
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'duration_ms': round(seconds * 1000, 3),
+            'sql': ' '.join(sql.split()),
+            'parameters': _jsonable(parameters),
+            'plan': self._plan(conn, sql, parameters),
+            'thread': threading.current_thread().name,
+        }
+        with self._lock:
+            self.count += 1
+            self.recent.append(entry)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def get_recent(self):
+        with self._lock:
+            return list(self.recent)
+
+
+def _jsonable(parameters):
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {k: _jsonable_value(v) for k, v in parameters.items()}
+    return [_jsonable_value(v) for v in parameters]
+
+
+def _jsonable_value(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<{len(value)} bytes>'
+    return value
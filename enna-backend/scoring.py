@@ -0,0 +1,150 @@
+"""Financial health scoring
+
+Ports the savings/budget/consistency/balance scores that Archives.jsx used to
+compute in the browser. Scores are derived from three aggregates per period
+(income, expenses, transaction count), which EnnaDatabase computes for any
+number of periods in one query, so scoring never loads individual rows.
+"""
+import calendar
+from datetime import date
+
+# Weights of each component in the overall score
+WEIGHTS = {
+    'savings': 0.35,
+    'budget': 0.25,
+    'consistency': 0.20,
+    'balance': 0.20,
+}
+
+
+def savings_score(income, expenses):
+    """0-100 score from the savings rate"""
+    if income == 0:
+        return 0
+    savings_rate = (income - expenses) / income * 100
+
+    if savings_rate < -50:
+        return 0
+    if savings_rate < -25:
+        return 10
+    if savings_rate < 0:
+        return 25
+    if savings_rate >= 30:
+        return 100
+    if savings_rate >= 20:
+        return 85
+    if savings_rate >= 10:
+        return 70
+    if savings_rate >= 5:
+        return 55
+    return 40
+
+
+def budget_score(income, expenses):
+    """0-100 score from spending as a share of income"""
+    if income == 0:
+        return 50
+    spending_ratio = expenses / income
+
+    if spending_ratio > 2.0:
+        return 10
+    if spending_ratio > 1.5:
+        return 25
+    if spending_ratio > 1.2:
+        return 40
+    if spending_ratio > 1.0:
+        return 60
+    if spending_ratio <= 0.7:
+        return 100
+    if spending_ratio <= 0.8:
+        return 85
+    if spending_ratio <= 0.9:
+        return 75
+    return 65
+
+
+def consistency_score(transaction_count):
+    """0-100 score from how regularly transactions were logged"""
+    if transaction_count >= 30:
+        return 100
+    if transaction_count >= 20:
+        return 85
+    if transaction_count >= 15:
+        return 70
+    if transaction_count >= 10:
+        return 55
+    if transaction_count >= 5:
+        return 40
+    if transaction_count > 0:
+        return 25
+    return 0
+
+
+def balance_score(income, expenses):
+    """0-100 score from the surplus or deficit relative to income"""
+    if income == 0 and expenses == 0:
+        return 50
+    net = income - expenses
+
+    if net < 0:
+        deficit = abs(net)
+        if deficit > income * 0.5:
+            return 10
+        if deficit > income * 0.25:
+            return 30
+        return 40
+
+    if net >= income * 0.3:
+        return 100
+    if net >= income * 0.2:
+        return 85
+    if net >= income * 0.1:
+        return 70
+    return 55
+
+
+def calculate_scores(income, expenses, transaction_count):
+    """All component scores plus the weighted overall score"""
+    scores = {
+        'savings': savings_score(income, expenses),
+        'budget': budget_score(income, expenses),
+        'consistency': consistency_score(transaction_count),
+        'balance': balance_score(income, expenses),
+    }
+    weighted = sum(scores[name] * weight for name, weight in WEIGHTS.items())
+    # Round half up like Math.round so scores match the ones archived by the frontend
+    return {'overall': int(weighted + 0.5), **scores}
+
+
+def score_totals(totals):
+    """Attach net and scores to a totals dict from EnnaDatabase"""
+    income = totals['total_income']
+    expenses = totals['total_expenses']
+    return {
+        **totals,
+        'net': income - expenses,
+        'scores': calculate_scores(income, expenses, totals['transaction_count'])
+    }
+
+
+def score_periods(db, periods):
+    """Score a list of (start_date, end_date) periods against live transactions"""
+    return [score_totals(totals) for totals in db.get_period_totals(periods)]
+
+
+def score_archives(db):
+    """Re-score every archive from its archived transactions"""
+    return [score_totals(totals) for totals in db.get_archive_totals()]
+
+
+def rolling_months(count, today=None):
+    """(first day, last day) of the last `count` calendar months, oldest first,
+    ending with the month containing `today`"""
+    today = today or date.today()
+    year, month = today.year, today.month
+    periods = []
+    for _ in range(count):
+        last_day = calendar.monthrange(year, month)[1]
+        periods.append((f'{year}-{month:02d}-01', f'{year}-{month:02d}-{last_day:02d}'))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(periods))
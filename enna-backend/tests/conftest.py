@@ -0,0 +1,27 @@
+"""Shared fixtures: a fresh database per test and the Flask app on top of it"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from categorizer import Categorizer
+from database import EnnaDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = EnnaDatabase(str(tmp_path / 'enna.db'))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def client(db, monkeypatch, tmp_path_factory):
+    # app.py opens its own database on import; point it somewhere harmless
+    os.environ.setdefault('ENNA_DB_PATH', str(tmp_path_factory.getbasetemp() / 'app.db'))
+    import app
+    monkeypatch.setattr(app, 'db', db)
+    monkeypatch.setattr(app, 'categorizer', Categorizer(db))
+    return app.app.test_client()
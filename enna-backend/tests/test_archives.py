@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from database import ArchiveConflict, EnnaDatabase
+
+
+def test_archive_totals_come_from_archived_rows(db):
+    # The client's summary disagrees with the rows it sends
+    archive_id = db.create_monthly_archive(
+        '2024-01', {'total_income': 999, 'total_expenses': 1, 'net': 998, 'transaction_count': 7}, {},
+        transactions_json=[
+            {'type': 'income', 'amount': 100.10, 'date': '2024-01-02'},
+            {'type': 'expense', 'amount': 20.05, 'date': '2024-01-03'},
+        ])
+    db.create_monthly_archive('2024-02', {'total_income': 50, 'total_expenses': 10, 'transaction_count': 3}, {})
+
+    totals = {t['id']: t for t in db.get_archive_totals()}
+    assert (totals[archive_id]['total_income'], totals[archive_id]['total_expenses'],
+            totals[archive_id]['transaction_count']) == (100.10, 20.05, 2)
+    summary_only = next(t for t in totals.values() if t['month_year'] == '2024-02')
+    assert (summary_only['total_income'], summary_only['total_expenses'],
+            summary_only['transaction_count']) == (50, 10, 3)
+    assert db.get_archive_by_month('2024-01')['net'] == 80.05
+
+
+def test_migration_recomputes_stored_archive_totals(db, tmp_path):
+    db.create_monthly_archive('2024-01', {}, {}, transactions_json=[
+        {'type': 'expense', 'amount': 12.5, 'date': '2024-01-02'},
+    ])
+    path = str(tmp_path / 'enna.db')
+    db.close()
+
+    conn = sqlite3.connect(path)
+    conn.execute('UPDATE monthly_archives SET total_expenses = 1, transaction_count = 9')
+    conn.execute('PRAGMA user_version = 7')
+    conn.commit()
+    conn.close()
+
+    reopened = EnnaDatabase(path)
+    try:
+        [totals] = reopened.get_archive_totals()
+        assert (totals['total_expenses'], totals['transaction_count']) == (12.5, 1)
+    finally:
+        reopened.close()
+
+
+def test_rearchiving_a_month_keeps_its_archived_rows(db):
+    first = db.create_monthly_archive('2024-03', {}, {}, transactions_json=[
+        {'type': 'expense', 'amount': 5, 'date': '2024-03-02'},
+    ])
+    with pytest.raises(ArchiveConflict):
+        db.create_monthly_archive('2024-03', {}, {}, transactions_json=[
+            {'type': 'expense', 'amount': 7, 'date': '2024-03-20'},
+        ])
+
+    rows = db.get_archive_transactions(first)['transactions']
+    assert [t['amount'] for t in rows] == [5]
+    assert db.get_archive_by_month('2024-03')['total_expenses'] == 5
+
+
+def test_two_ranges_in_one_month_are_separate_archives(db):
+    for day in ('2024-03-05', '2024-03-08', '2024-03-20'):
+        db.add_transaction('expense', 10, f'coffee {day}', date=day)
+
+    first = db.archive_period('2024-03-01', '2024-03-10')
+    second = db.archive_period('2024-03-15', '2024-03-31')
+
+    assert first['archive_id'] != second['archive_id']
+    assert (first['transactions_archived'], second['transactions_archived']) == (2, 1)
+    assert db.get_transactions() == []
+    for archive, count in ((first, 2), (second, 1)):
+        rows = db.get_archive_transactions(archive['archive_id'])['transactions']
+        assert len(rows) == count
+    assert [a['month_year'] for a in db.get_monthly_archives()] == ['2024-03', '2024-03']
+    assert db.get_archive_by_month('2024-03')['id'] == second['archive_id']
+
+
+def test_overlapping_range_is_rejected_without_clearing_anything(client):
+    client.post('/api/transactions', json={'type': 'expense', 'amount': 4, 'description': 'tea', 'date': '2024-03-05'})
+    assert client.post('/api/archives', json={'date_range': {'start': '2024-03-01', 'end': '2024-03-10'}}).status_code == 201
+    client.post('/api/transactions', json={'type': 'expense', 'amount': 6, 'description': 'late entry', 'date': '2024-03-09'})
+
+    response = client.post('/api/archives', json={'date_range': {'start': '2024-03-09', 'end': '2024-03-31'}})
+    assert response.status_code == 409
+    assert [t['description'] for t in client.get('/api/transactions').get_json()['transactions']] == ['late entry']
+
+    legacy = {'month_year': '2024-04', 'summary_data': {}, 'scores': {}}
+    assert client.post('/api/archives', json=legacy).status_code == 201
+    assert client.post('/api/archives', json=legacy).status_code == 409
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.mark.parametrize('params', [[1], 'limit=5', 7])
+def test_params_must_be_an_object(client, params):
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'summary'},
+        {'op': 'transactions', 'params': params},
+    ]})
+    assert response.status_code == 400
+    assert 'params must be an object' in response.json['message']
+
+
+def test_missing_or_null_params_default_to_empty(client):
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'categories'},
+        {'op': 'transactions', 'params': None, 'key': 'page'},
+    ]})
+    assert response.status_code == 200
+    results = response.json['results']
+    assert results['categories']['status'] == 'success'
+    assert results['page']['status'] == 'success'
+
+
+def test_one_failing_operation_does_not_fail_the_batch(client):
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'transactions', 'params': {'limit': 0}},
+        {'op': 'categories'},
+    ]})
+    results = response.json['results']
+    assert results['transactions']['status'] == 'error'
+    assert results['categories']['status'] == 'success'
+
+
+@pytest.mark.parametrize('periods, message', [
+    ([['2024-01-01', '2024-01-31']] * 501, 'At most 500 periods'),
+    ([['20240101', '20240131']], 'Invalid period'),
+    ([['2024-01-01']], 'Invalid period'),
+    ([['2024-W01-1', '2024-01-31']], 'Invalid period'),
+    ([["2024-01-01' OR 1=1", '2024-01-31']], 'Invalid period'),
+    ('2024-01-01:2024-01-31', 'must be a list'),
+])
+def test_score_periods_are_validated_like_the_get_route(client, periods, message):
+    response = client.post('/api/batch', json={'operations': [{'op': 'scores', 'params': {'periods': periods}}]})
+    result = response.json['results']['scores']
+    assert result['status'] == 'error' and message in result['message']
+
+    query = ','.join(':'.join(p) for p in periods) if isinstance(periods, list) else periods
+    if message != 'must be a list':
+        assert client.get(f'/api/scores?periods={query}').status_code == 400
+
+
+def test_valid_score_periods_in_a_batch(client):
+    periods = [['2024-01-01', '2024-01-31'], ['2024-02-01', '2024-02-29']]
+    response = client.post('/api/batch', json={'operations': [{'op': 'scores', 'params': {'periods': periods}}]})
+    result = response.json['results']['scores']
+    assert result['status'] == 'success' and len(result['data']) == 2
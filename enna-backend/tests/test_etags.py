@@ -0,0 +1,42 @@
+from datetime import date
+
+import scoring
+
+
+def fixed_today(day):
+    class FixedDate(date):
+        @classmethod
+        def today(cls):
+            return day
+    return FixedDate
+
+
+def test_unchanged_data_revalidates_to_304(client):
+    first = client.get('/api/scores?months=3')
+    assert first.status_code == 200 and first.headers['ETag']
+    again = client.get('/api/scores?months=3', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_score_etag_moves_with_the_month(client, monkeypatch):
+    monkeypatch.setattr(scoring, 'date', fixed_today(date(2024, 1, 31)))
+    january = client.get('/api/scores?months=3')
+    monkeypatch.setattr(scoring, 'date', fixed_today(date(2024, 2, 1)))
+    february = client.get('/api/scores?months=3', headers={'If-None-Match': january.headers['ETag']})
+    assert february.status_code == 200
+    assert february.headers['ETag'] != january.headers['ETag']
+
+
+def test_timeseries_etag_moves_with_today(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'date', fixed_today(date(2024, 3, 10)))
+    before = client.get('/api/reports/timeseries?bucket=day')
+    assert before.json['points'][-1]['period'] == '2024-03-10'
+    monkeypatch.setattr(app, 'date', fixed_today(date(2024, 3, 11)))
+    after = client.get('/api/reports/timeseries?bucket=day', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.json['points'][-1]['period'] == '2024-03-11'
+
+    pinned = '/api/reports/timeseries?bucket=day&end_date=2024-03-10'
+    etag = client.get(pinned).headers['ETag']
+    assert client.get(pinned, headers={'If-None-Match': etag}).status_code == 304
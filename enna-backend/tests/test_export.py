@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+import pytest
+
+from database import EnnaDatabase
+
+ROWS = [
+    {'type': 'expense', 'amount': 12.5, 'description': 'Coffee shop', 'date': '2024-03-01'},
+    {'type': 'expense', 'amount': 12.5, 'description': 'Coffee shop', 'date': '2024-03-01'},
+    {'type': 'income', 'amount': 2500.01, 'description': 'Payroll', 'date': '2024-03-02'},
+    {'type': 'expense', 'amount': 0.29, 'description': 'Fee, "monthly"\nsecond line', 'date': '2024-03-03'},
+]
+
+
+@pytest.fixture
+def transactions(db):
+    db.add_transactions_bulk(ROWS)
+
+
+def import_csv_body(client, body):
+    return client.post('/api/transactions/import', data={
+        'file': (io.BytesIO(body), 'enna-transactions.csv')
+    }, content_type='multipart/form-data')
+
+
+def stored(db):
+    return sorted((t['type'], t['amount'], t['description'], t['date']) for t in db.get_transactions())
+
+
+def test_csv_export(client, transactions):
+    response = client.get('/api/export/transactions')
+    assert response.status_code == 200 and response.mimetype == 'text/csv'
+    assert 'enna-transactions.csv' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r['date'], r['type'], r['amount']) for r in rows] == [
+        ('2024-03-01', 'expense', '12.50'),
+        ('2024-03-01', 'expense', '12.50'),
+        ('2024-03-02', 'income', '2500.01'),
+        ('2024-03-03', 'expense', '0.29'),
+    ]
+
+
+def test_jsonl_export_filters(client, transactions):
+    response = client.get('/api/export/transactions?format=jsonl&start_date=2024-03-02&type=income')
+    assert response.mimetype == 'application/x-ndjson'
+    [record] = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert (record['description'], record['amount']) == ('Payroll', 2500.01)
+
+
+@pytest.mark.parametrize('query', ['format=xml', 'start_date=2024-3-1', 'end_date=2024-02-30', 'type=gift'])
+def test_bad_parameters_are_rejected(client, query):
+    assert client.get(f'/api/export/transactions?{query}').status_code == 400
+    assert client.get(f'/api/export/archives?{query}').status_code == 400
+
+
+def test_reimported_export_is_all_duplicates(client, db, transactions):
+    before = stored(db)
+    response = import_csv_body(client, client.get('/api/export/transactions').get_data())
+    assert response.status_code == 201
+    assert (response.json['rows_inserted'], response.json['rows_duplicate']) == (0, len(ROWS))
+    assert stored(db) == before
+
+
+def test_export_imports_into_a_fresh_database(client, db, transactions, tmp_path, monkeypatch):
+    body = client.get('/api/export/transactions').get_data()
+    fresh = EnnaDatabase(str(tmp_path / 'fresh.db'))
+    try:
+        import app
+        monkeypatch.setattr(app, 'db', fresh)
+        response = import_csv_body(client, body)
+        assert response.json['rows_inserted'] == len(ROWS)
+        assert stored(fresh) == stored(db)
+    finally:
+        fresh.close()
@@ -0,0 +1,39 @@
+def import_rows(db, *rows):
+    return [r['status'] for r in db.add_transactions_bulk([
+        {'type': type, 'amount': amount, 'description': description, 'date': date}
+        for type, amount, description, date in rows
+    ])]
+
+
+COFFEE = ('expense', 4.5, 'Coffee shop', '2024-03-01')
+BAKERY = ('expense', 6.0, 'Bakery', '2024-03-01')
+
+
+def test_edit_moves_the_fingerprint(db):
+    assert import_rows(db, COFFEE) == ['success']
+    [row] = db.get_transactions()
+    assert db.update_transaction(row['id'], amount=5.25)
+
+    # The edited values are now the stored row; the original bank row is not
+    assert import_rows(db, ('expense', 5.25, 'Coffee shop', '2024-03-01')) == ['duplicate']
+    assert import_rows(db, COFFEE) == ['success']
+
+
+def test_edit_onto_an_existing_row_does_not_collide(db):
+    import_rows(db, COFFEE, BAKERY)
+    bakery = next(t for t in db.get_transactions() if t['description'] == 'Bakery')
+    assert db.update_transaction(bakery['id'], amount=4.5, description='Coffee shop')
+
+    fingerprints = sorted(t['fingerprint'] for t in db.get_transactions())
+    assert len(set(fingerprints)) == 2
+    assert [f.rsplit(':', 1)[1] for f in fingerprints] == ['1', '2']
+    # Both coffees are stored, so importing the pair again adds nothing
+    assert import_rows(db, COFFEE, COFFEE) == ['duplicate', 'duplicate']
+
+
+def test_category_only_edit_keeps_the_fingerprint(db):
+    import_rows(db, COFFEE)
+    [row] = db.get_transactions()
+    db.update_transaction(row['id'], category_id=2)
+    assert db.get_transactions()[0]['fingerprint'] == row['fingerprint']
+    assert import_rows(db, COFFEE) == ['duplicate']
@@ -0,0 +1,34 @@
+import io
+
+from ingestion import import_csv
+
+
+def import_text(db, text):
+    return import_csv(db, io.BytesIO(text.encode('utf-8')))
+
+
+def test_literal_type_column_wins_over_amount_sign(db):
+    stats = import_text(db, (
+        'Date,Type,Amount,Description\n'
+        '2024-03-01,expense,12.50,Coffee shop\n'
+        '2024-03-02,income,-3.00,Odd refund\n'
+        '2024-03-03,Expense ,7.25,Spaced and capitalised\n'
+    ))
+    assert stats['rows_inserted'] == 3
+    types = {t['description']: (t['type'], t['amount']) for t in db.get_transactions()}
+    assert types == {
+        'Coffee shop': ('expense', 12.5),
+        'Odd refund': ('income', 3.0),
+        'Spaced and capitalised': ('expense', 7.25),
+    }
+
+
+def test_bank_keywords_and_sign_still_apply(db):
+    import_text(db, (
+        'Date,Type,Amount,Description\n'
+        '2024-03-01,DEBIT,-20.00,Card purchase\n'
+        '2024-03-02,Direct Deposit,900.00,Payroll\n'
+        '2024-03-03,,-4.00,No type\n'
+    ))
+    types = {t['description']: t['type'] for t in db.get_transactions()}
+    assert types == {'Card purchase': 'expense', 'Payroll': 'income', 'No type': 'expense'}
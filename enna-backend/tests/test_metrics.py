@@ -0,0 +1,25 @@
+import threading
+
+from metrics import Metrics
+
+
+def test_exited_threads_are_folded_into_the_totals():
+    metrics = Metrics()
+
+    def request():
+        metrics.start_request()
+        metrics.record_sql(0.5, statements=2)
+        metrics.finish_request('GET', '/api/summary', 200, 0.01)
+
+    # One thread per request, like the Flask dev server
+    for _ in range(50):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+    request()
+
+    assert len(metrics._threads) <= 2
+    text = metrics.render()
+    assert 'enna_db_statements_total 102\n' in text
+    assert 'enna_db_sql_seconds_total 25.5\n' in text
+    assert 'enna_http_requests_total{method="GET",endpoint="/api/summary",status="200"} 51\n' in text
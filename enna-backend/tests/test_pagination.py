@@ -0,0 +1,61 @@
+import pytest
+
+from database import MAX_PAGE
+
+
+@pytest.fixture
+def transactions(db):
+    db.add_transactions_bulk([
+        {'type': 'expense', 'amount': i + 1, 'description': f'Row {i}', 'date': f'2024-01-{i % 28 + 1:02d}'}
+        for i in range(5)
+    ])
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', '-3', str(MAX_PAGE + 1), 'ten'])
+def test_out_of_range_limit_is_rejected(client, transactions, limit):
+    for route in ('/api/transactions', '/api/archives/1/transactions'):
+        response = client.get(f'{route}?limit={limit}')
+        assert response.status_code == 400, (route, limit)
+
+
+def test_page_sizes(client, transactions):
+    page = client.get('/api/transactions?limit=2').json
+    assert page['count'] == 2 and page['next_cursor']
+    rest = client.get(f"/api/transactions?limit={MAX_PAGE}&cursor={page['next_cursor']}").json
+    assert rest['count'] == 3 and rest['next_cursor'] is None
+
+
+def test_methods_guard_the_limit(db, transactions):
+    for limit in (0, -1, -3):
+        with pytest.raises(ValueError):
+            db.get_transactions_page(limit=limit)
+        with pytest.raises(ValueError):
+            db.get_archive_transactions(1, limit=limit)
+    assert len(db.get_transactions_page(limit=MAX_PAGE * 10)['transactions']) == 5
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', '-3', str(MAX_PAGE + 1)])
+def test_search_rejects_out_of_range_limit(client, transactions, limit):
+    assert client.get(f'/api/transactions/search?q=row&limit={limit}').status_code == 400
+
+
+def test_search_method_guards_the_limit(db, transactions):
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            db.search_transactions('row', limit=limit)
+    page = db.search_transactions('row', limit=2)
+    assert len(page['transactions']) == 2 and page['next_cursor']
+    assert len(db.search_transactions('row', limit=MAX_PAGE * 10)['transactions']) == 5
+
+
+def test_amount_bounds_are_exact_to_the_cent(client, db):
+    for amount in (0.29, 0.57, 0.58):
+        db.add_transaction('expense', amount, f'{amount}', date='2024-01-02')
+
+    def amounts(query):
+        return sorted(t['amount'] for t in client.get(f'/api/transactions?{query}').json['transactions'])
+
+    assert amounts('max_amount=0.29') == [0.29]
+    assert amounts('min_amount=0.57&max_amount=0.57') == [0.57]
+    assert amounts('min_amount=0.29&max_amount=0.57') == [0.29, 0.57]
+    assert [t['amount'] for t in db.get_transactions(min_amount=0.58)] == [0.58]
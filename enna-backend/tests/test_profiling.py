@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+import app as app_module
+from profiling import RequestProfiler
+
+
+@pytest.fixture
+def profiler(client, monkeypatch, tmp_path):
+    profiler = RequestProfiler(str(tmp_path / 'profiles'), mode='all')
+    monkeypatch.setattr(app_module, 'profiler', profiler)
+    return profiler
+
+
+def test_requests_arriving_while_one_is_profiled_are_served_unprofiled(client, profiler):
+    # Stands in for a request being profiled on another server thread
+    busy = threading.Thread(target=profiler.start)
+    busy.start()
+    busy.join()
+
+    response = client.get('/api/categories')
+    assert response.status_code == 200
+    assert 'X-Enna-Profile-File' not in response.headers
+
+    profiler._lock.release()
+    response = client.get('/api/categories')
+    assert response.status_code == 200
+    assert response.headers['X-Enna-Profile-File'].endswith('.pstats')
+
+
+def test_failed_request_releases_the_profiler(client, profiler, db, monkeypatch):
+    monkeypatch.setattr(db, 'get_categories', lambda: 1 / 0)
+    assert client.get('/api/categories').status_code == 500
+
+    assert client.get('/api/health').headers['X-Enna-Profile-File'].endswith('.pstats')
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.mark.parametrize('start, end', [('20240301', '2024-03-31'), ('2024-03-01', '20240331'),
+                                        ('2024-W09-5', '2024-03-31'), (None, '2024-03-31')])
+def test_dates_must_be_yyyy_mm_dd(db, start, end):
+    with pytest.raises(ValueError, match='expected YYYY-MM-DD'):
+        db.get_timeseries(start, end)
+
+
+def test_compact_dates_are_rejected_by_the_route(client, db):
+    db.add_transaction('expense', 12.5, 'lunch', date='2024-03-05')
+
+    assert client.get('/api/reports/timeseries?start_date=20240301&end_date=20240331').status_code == 400
+    points = client.get('/api/reports/timeseries?start_date=2024-03-01&end_date=2024-03-31').json['points']
+    assert [p['expenses'] for p in points if p['period'] == '2024-03-05'] == [12.5]
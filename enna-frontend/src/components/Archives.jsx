@@ -12,11 +12,42 @@ const Archives = () => {
   const [editingArchiveId, setEditingArchiveId] = useState(null);
   const [editingName, setEditingName] = useState('');
   const [nextStartDate, setNextStartDate] = useState(null);
+  const [archiveTransactions, setArchiveTransactions] = useState([]);
+  const [archiveCursor, setArchiveCursor] = useState(null);
+  const [isLoadingTransactions, setIsLoadingTransactions] = useState(false);
 
   useEffect(() => {
     fetchArchives();
   }, []);
 
+  // Archived transactions are loaded a page at a time when an archive is opened
+  useEffect(() => {
+    setArchiveTransactions([]);
+    setArchiveCursor(null);
+    if (selectedArchive) {
+      fetchArchiveTransactions(selectedArchive.id, null);
+    }
+  }, [selectedArchive?.id]);
+
+  const fetchArchiveTransactions = async (archiveId, cursor) => {
+    try {
+      setIsLoadingTransactions(true);
+      const params = new URLSearchParams({ limit: '100' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`http://localhost:5000/api/archives/${archiveId}/transactions?${params}`);
+      const data = await response.json();
+
+      if (data.status === 'success') {
+        setArchiveTransactions(prev => cursor ? [...prev, ...data.transactions] : data.transactions);
+        setArchiveCursor(data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Failed to fetch archived transactions:', error);
+    } finally {
+      setIsLoadingTransactions(false);
+    }
+  };
+
   const fetchArchives = async () => {
     try {
       setIsLoading(true);
@@ -109,25 +140,6 @@ const Archives = () => {
       const lastMonth = new Date(today.getFullYear(), today.getMonth() - 1, 1);
       const monthYear = `${lastMonth.getFullYear()}-${String(lastMonth.getMonth() + 1).padStart(2, '0')}`;
       
-      // Fetch current summary and transactions
-      const summaryRes = await fetch('http://localhost:5000/api/summary');
-      const summaryData = await summaryRes.json();
-      
-      const transRes = await fetch('http://localhost:5000/api/transactions?limit=1000');
-      const transData = await transRes.json();
-      
-      if (summaryData.status !== 'success' || transData.status !== 'success') {
-        alert('Failed to fetch data for archiving');
-        return;
-      }
-      
-      // Calculate financial health scores
-      const scores = calculateScores(
-        summaryData.summary.total_income,
-        summaryData.summary.total_expenses,
-        transData.transactions.length
-      );
-      
       // Use dynamic date range: from nextStartDate to today
       const endDateStr = today.toISOString().split('T')[0];
       const startDateStr = nextStartDate || endDateStr; // Fallback to today if no next start date
@@ -142,18 +154,10 @@ const Archives = () => {
       const endDate = new Date(endDateStr);
       const archiveName = `${startDate.toLocaleDateString('en-US', { month: 'short', day: 'numeric' })} - ${endDate.toLocaleDateString('en-US', { day: 'numeric', year: 'numeric' })}`;
       
-      // Create archive
+      // The backend snapshots, scores and clears the date range in one step
       const archiveData = {
         month_year: monthYear,
         name: archiveName,
-        summary_data: {
-          total_income: summaryData.summary.total_income,
-          total_expenses: summaryData.summary.total_expenses,
-          net: summaryData.summary.net,
-          transaction_count: transData.transactions.length
-        },
-        scores: scores,
-        transactions_json: JSON.stringify(transData.transactions),
         date_range: dateRange
       };
       
@@ -230,85 +234,6 @@ const Archives = () => {
     setEditingName('');
   };
 
-  const calculateScores = (income, expenses, transactionCount) => {
-    // Calculate savings score (0-100)
-    const savingsScore = (() => {
-      if (income === 0) return 0;
-      const savingsRate = ((income - expenses) / income) * 100;
-      
-      if (savingsRate < -50) return 0;
-      if (savingsRate < -25) return 10;
-      if (savingsRate < 0) return 25;
-      if (savingsRate >= 30) return 100;
-      if (savingsRate >= 20) return 85;
-      if (savingsRate >= 10) return 70;
-      if (savingsRate >= 5) return 55;
-      return 40;
-    })();
-    
-    // Calculate budget score (simplified - just based on whether spending less than income)
-    const budgetScore = (() => {
-      if (income === 0) return 50;
-      const spendingRatio = expenses / income;
-      
-      if (spendingRatio > 2.0) return 10; // Spending 2x income
-      if (spendingRatio > 1.5) return 25;
-      if (spendingRatio > 1.2) return 40;
-      if (spendingRatio > 1.0) return 60;
-      if (spendingRatio <= 0.7) return 100; // Spending ≤70% of income
-      if (spendingRatio <= 0.8) return 85;
-      if (spendingRatio <= 0.9) return 75;
-      return 65;
-    })();
-    
-    // Calculate consistency score (based on transaction count)
-    const consistencyScore = (() => {
-      if (transactionCount >= 30) return 100; // ~1 per day
-      if (transactionCount >= 20) return 85;
-      if (transactionCount >= 15) return 70;
-      if (transactionCount >= 10) return 55;
-      if (transactionCount >= 5) return 40;
-      if (transactionCount > 0) return 25;
-      return 0;
-    })();
-    
-    // Calculate balance score (based on net income/expenses ratio)
-    const balanceScore = (() => {
-      if (income === 0 && expenses === 0) return 50;
-      const net = income - expenses;
-      
-      if (net < 0) {
-        // Negative balance
-        const deficit = Math.abs(net);
-        if (deficit > income * 0.5) return 10; // Huge deficit
-        if (deficit > income * 0.25) return 30;
-        return 40;
-      } else {
-        // Positive balance
-        if (net >= income * 0.3) return 100; // Great surplus
-        if (net >= income * 0.2) return 85;
-        if (net >= income * 0.1) return 70;
-        return 55;
-      }
-    })();
-    
-    // Calculate overall score (weighted average)
-    const overall = Math.round(
-      (savingsScore * 0.35) +
-      (budgetScore * 0.25) +
-      (consistencyScore * 0.20) +
-      (balanceScore * 0.20)
-    );
-    
-    return {
-      overall,
-      savings: savingsScore,
-      budget: budgetScore,
-      consistency: consistencyScore,
-      balance: balanceScore
-    };
-  };
-
   const formatMonthYear = (archive) => {
     // Prioritize custom name if set
     if (archive.name) {
@@ -508,11 +433,11 @@ const Archives = () => {
           </div>
 
           {/* Transactions List */}
-          {selectedArchive.transactions_json && (
+          {archiveTransactions.length > 0 && (
             <div className="archive-transactions-section">
               <h3>📝 Transactions</h3>
               <div className="archive-transactions-list">
-                {JSON.parse(selectedArchive.transactions_json).map((transaction, index) => (
+                {archiveTransactions.map((transaction, index) => (
                   <div key={index} className={`archive-transaction-item ${transaction.type}`}>
                     <div className="transaction-left">
                       <div className="transaction-type-icon">
@@ -530,6 +455,15 @@ const Archives = () => {
                     </div>
                   </div>
                 ))}
+                {archiveCursor && (
+                  <button
+                    className="btn-load-more-transactions"
+                    onClick={() => fetchArchiveTransactions(selectedArchive.id, archiveCursor)}
+                    disabled={isLoadingTransactions}
+                  >
+                    {isLoadingTransactions ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
               </div>
             </div>
           )}
@@ -1,63 +1,82 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, ReferenceLine, PieChart, Pie, Cell, Legend } from 'recharts';
 import './Budget.css';
 
+// Slider changes are saved together once the user pauses
+const SAVE_DELAY_MS = 400;
+
 const Budget = () => {
   const [summary, setSummary] = useState({
     total_income: 0,
     total_expenses: 0,
     net: 0
   });
-  const [transactions, setTransactions] = useState([]);
   const [categories, setCategories] = useState([]);
   const [budgetAllocations, setBudgetAllocations] = useState({});
+  const [spending, setSpending] = useState({});
+  const [dailySpending, setDailySpending] = useState({ points: [], byCategory: {} });
   const [isLoading, setIsLoading] = useState(true);
+  const pendingSaves = useRef({});
+  const saveTimer = useRef(null);
 
   useEffect(() => {
     fetchData();
+    // Save any slider change still waiting when the page is left
+    return () => {
+      clearTimeout(saveTimer.current);
+      flushBudgetSaves();
+    };
   }, []);
 
   const fetchData = async () => {
     try {
       setIsLoading(true);
       
-      // Fetch summary
-      const summaryRes = await fetch('http://localhost:5000/api/summary');
-      const summaryData = await summaryRes.json();
-      if (summaryData.status === 'success') {
-        setSummary(summaryData.summary);
-      }
+      // Budget vs actual per category and the last 30 days of spending, in one round trip
+      const res = await fetch('http://localhost:5000/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          operations: [
+            { op: 'budget_status' },
+            { op: 'timeseries', params: { bucket: 'day', by_category: true } }
+          ]
+        })
+      });
+      const data = await res.json();
+      if (data.status !== 'success') return;
+      const { budget_status: statusData, timeseries: seriesData } = data.results;
+
+      if (statusData.status === 'success') {
+        const status = statusData.data;
+        setSummary({
+          total_income: status.total_income,
+          total_expenses: status.total_expenses,
+          net: status.total_income - status.total_expenses
+        });
+        setCategories(status.categories.map(c => ({
+          id: c.category_id,
+          name: c.name,
+          color: c.color,
+          icon: c.icon
+        })));
 
-      // Fetch all transactions for spending calculations
-      const transRes = await fetch('http://localhost:5000/api/transactions?limit=1000');
-      const transData = await transRes.json();
-      if (transData.status === 'success') {
-        setTransactions(transData.transactions);
+        const allocations = {};
+        const spent = {};
+        status.categories.forEach(c => {
+          allocations[c.category_id] = c.percentage;
+          spent[c.category_id] = c.spent;
+        });
+        setBudgetAllocations(allocations);
+        setSpending(spent);
       }
 
-      // Fetch categories
-      const catRes = await fetch('http://localhost:5000/api/categories');
-      const catData = await catRes.json();
-      if (catData.status === 'success') {
-        setCategories(catData.categories);
-        
-        // Load saved budgets from database
-        const budgetRes = await fetch('http://localhost:5000/api/budgets');
-        const budgetData = await budgetRes.json();
-        if (budgetData.status === 'success') {
-          const budgets = {};
-          budgetData.budgets.forEach(b => {
-            budgets[b.category_id] = b.percentage;
-          });
-          setBudgetAllocations(budgets);
-        } else {
-          // Initialize with 0% if no budgets exist
-          const initialBudgets = {};
-          catData.categories.forEach(cat => {
-            initialBudgets[cat.id] = 0;
-          });
-          setBudgetAllocations(initialBudgets);
-        }
+      if (seriesData.status === 'success') {
+        const byCategory = {};
+        (seriesData.data.categories || []).forEach(c => {
+          byCategory[c.category_id] = c.values;
+        });
+        setDailySpending({ points: seriesData.data.points, byCategory });
       }
     } catch (error) {
       console.error('Failed to fetch data:', error);
@@ -66,28 +85,38 @@ const Budget = () => {
     }
   };
 
-  const handleBudgetChange = async (categoryId, percentage) => {
-    const newAllocations = {
-      ...budgetAllocations,
-      [categoryId]: parseFloat(percentage) || 0
-    };
-    setBudgetAllocations(newAllocations);
-    
-    // Save to database
+  const flushBudgetSaves = async () => {
+    const budgets = Object.entries(pendingSaves.current).map(([categoryId, percentage]) => ({
+      category_id: Number(categoryId),
+      percentage
+    }));
+    pendingSaves.current = {};
+    if (budgets.length === 0) return;
+
     try {
-      await fetch('http://localhost:5000/api/budgets', {
+      await fetch('http://localhost:5000/api/budgets/bulk', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          category_id: categoryId,
-          percentage: parseFloat(percentage) || 0
-        })
+        body: JSON.stringify({ budgets })
       });
     } catch (error) {
-      console.error('Failed to save budget:', error);
+      console.error('Failed to save budgets:', error);
     }
   };
 
+  const handleBudgetChange = (categoryId, percentage) => {
+    const value = parseFloat(percentage) || 0;
+    setBudgetAllocations(prev => ({
+      ...prev,
+      [categoryId]: value
+    }));
+    
+    // Save to database once the slider settles
+    pendingSaves.current[categoryId] = value;
+    clearTimeout(saveTimer.current);
+    saveTimer.current = setTimeout(flushBudgetSaves, SAVE_DELAY_MS);
+  };
+
   const getTotalBudgetPercentage = () => {
     return Object.values(budgetAllocations).reduce((sum, val) => sum + val, 0);
   };
@@ -98,10 +127,7 @@ const Budget = () => {
   };
 
   const getCategorySpending = (categoryId) => {
-    const categoryTransactions = transactions.filter(
-      t => t.category_id === categoryId && t.type === 'expense'
-    );
-    return categoryTransactions.reduce((sum, t) => sum + t.amount, 0);
+    return spending[categoryId] || 0;
   };
 
   const isCategoryOverspent = (categoryId) => {
@@ -111,49 +137,20 @@ const Budget = () => {
   };
 
   const getCategoryChartData = (categoryId) => {
-    // Get last 30 days
-    const today = new Date();
-    const last30Days = [];
-    
-    for (let i = 29; i >= 0; i--) {
-      const date = new Date(today);
-      date.setDate(date.getDate() - i);
-      // Use local date instead of UTC to avoid timezone issues
-      const year = date.getFullYear();
-      const month = String(date.getMonth() + 1).padStart(2, '0');
-      const day = String(date.getDate()).padStart(2, '0');
-      const dateStr = `${year}-${month}-${day}`;
-      
-      last30Days.push({
-        date: date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-        fullDate: dateStr,
-        spent: 0,
-        cumulative: 0
-      });
-    }
-
-    // Get transactions for this category
-    const categoryTransactions = transactions
-      .filter(t => t.category_id === categoryId && t.type === 'expense')
-      .sort((a, b) => new Date(a.date) - new Date(b.date));
-
-    // Accumulate spending
+    // Daily spending over the last 30 days, zero-filled by the server
+    const values = dailySpending.byCategory[categoryId] || [];
     let cumulative = 0;
-    categoryTransactions.forEach(trans => {
-      const transDate = trans.date.split('T')[0];
-      const dayData = last30Days.find(d => d.fullDate === transDate);
-      if (dayData) {
-        dayData.spent += trans.amount;
-      }
-    });
 
-    // Calculate cumulative
-    last30Days.forEach(day => {
-      cumulative += day.spent;
-      day.cumulative = cumulative;
+    return dailySpending.points.map((point, i) => {
+      const spent = values[i] || 0;
+      cumulative += spent;
+      return {
+        date: new Date(`${point.period}T00:00:00`).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
+        fullDate: point.period,
+        spent,
+        cumulative
+      };
     });
-
-    return last30Days;
   };
 
   const getBudgetPieData = () => {
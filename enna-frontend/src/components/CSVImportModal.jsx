@@ -1,6 +1,9 @@
 import { useState } from 'react';
 import './CSVImportModal.css';
 
+// Matches MAX_CATEGORIZE_DESCRIPTIONS in the backend
+const CATEGORIZE_BATCH_SIZE = 10000;
+
 function CSVImportModal({ isOpen, onClose, onImport, categories }) {
   const [step, setStep] = useState(1); // 1: Upload, 2: Map columns, 3: Preview & Edit
   const [csvData, setCSVData] = useState([]);
@@ -219,12 +222,39 @@ function CSVImportModal({ isOpen, onClose, onImport, categories }) {
     return otherCategory?.id || categories[0]?.id || null;
   };
 
-  const handleMapColumns = () => {
+  // Ask the backend, which learns from the categories you've already assigned;
+  // the keyword rules above are the fallback if it can't be reached
+  const suggestCategories = async (descriptions) => {
+    const unique = [...new Set(descriptions)];
+    const suggestions = new Map();
+    try {
+      for (let i = 0; i < unique.length; i += CATEGORIZE_BATCH_SIZE) {
+        const chunk = unique.slice(i, i + CATEGORIZE_BATCH_SIZE);
+        const response = await fetch('http://localhost:5000/api/categorize/batch', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ descriptions: chunk })
+        });
+        const data = await response.json();
+        if (data.status !== 'success') throw new Error(data.message);
+        chunk.forEach((description, index) => {
+          suggestions.set(description, data.results[index].category_id);
+        });
+      }
+    } catch (error) {
+      console.error('Failed to fetch category suggestions:', error);
+    }
+    return suggestions;
+  };
+
+  const handleMapColumns = async () => {
     if (!columnMapping.date || !columnMapping.description || !columnMapping.amount) {
       alert('Please map at least Date, Description, and Amount columns');
       return;
     }
 
+    const suggestions = await suggestCategories(csvData.map(row => row[columnMapping.description]));
+
     const parsedTransactions = csvData.map((row, index) => {
       const amountStr = row[columnMapping.amount].replace(/[$,]/g, '');
       const amountValue = parseFloat(amountStr);
@@ -239,7 +269,7 @@ function CSVImportModal({ isOpen, onClose, onImport, categories }) {
         description: description,
         amount: absoluteAmount,
         type: type,
-        category_id: detectCategory(description),
+        category_id: suggestions.get(description) ?? detectCategory(description),
         selected: true,
         edited: false
       };
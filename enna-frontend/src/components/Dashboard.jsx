@@ -33,30 +33,34 @@ const Dashboard = () => {
     try {
       setIsLoading(true);
       
-      // Fetch summary
-      const summaryRes = await fetch('http://localhost:5000/api/summary');
-      const summaryData = await summaryRes.json();
+      // Fetch summary, recent transactions and categories in one round trip
+      const res = await fetch('http://localhost:5000/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          operations: [
+            { op: 'summary' },
+            { op: 'transactions', params: { limit: 10 } },
+            { op: 'categories' }
+          ]
+        })
+      });
+      const data = await res.json();
+      if (data.status !== 'success') return;
+      const { summary: summaryData, transactions: transData, categories: catData } = data.results;
+
       if (summaryData.status === 'success') {
-        setSummary(summaryData.summary);
+        setSummary(summaryData.data);
       }
 
-      // Fetch recent transactions
-      const transRes = await fetch('http://localhost:5000/api/transactions?limit=10');
-      const transData = await transRes.json();
       if (transData.status === 'success') {
-        setTransactions(transData.transactions);
+        setTransactions(transData.data.transactions);
+        // Generate chart data after fetching transactions
+        generateChartData(transData.data.transactions);
       }
 
-      // Fetch categories
-      const catRes = await fetch('http://localhost:5000/api/categories');
-      const catData = await catRes.json();
       if (catData.status === 'success') {
-        setCategories(catData.categories);
-      }
-
-      // Generate chart data after fetching transactions
-      if (transData.status === 'success') {
-        generateChartData(transData.transactions);
+        setCategories(catData.data);
       }
     } catch (error) {
       console.error('Failed to fetch data:', error);
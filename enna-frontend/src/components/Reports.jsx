@@ -9,7 +9,7 @@ const Reports = () => {
     net: 0,
     expenses_by_category: []
   });
-  const [transactions, setTransactions] = useState([]);
+  const [dailyActivity, setDailyActivity] = useState([]);
   const [budgets, setBudgets] = useState([]);
   const [monthlySpendingData, setMonthlySpendingData] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
@@ -22,33 +22,36 @@ const Reports = () => {
     try {
       setIsLoading(true);
       
-      // Fetch summary
-      const summaryRes = await fetch('http://localhost:5000/api/summary');
-      const summaryData = await summaryRes.json();
+      // Fetch summary, daily activity for the last 30 days (one zero-filled
+      // point per day), budgets and monthly spending in one round trip
+      const res = await fetch('http://localhost:5000/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          operations: [
+            { op: 'summary' },
+            { op: 'timeseries', params: { bucket: 'day' } },
+            { op: 'budgets' },
+            { op: 'monthly_spending', params: { months: 6 } }
+          ]
+        })
+      });
+      const data = await res.json();
+      if (data.status !== 'success') return;
+      const { summary: summaryData, timeseries, budgets: budgetData, monthly_spending: spendingData } = data.results;
+
       if (summaryData.status === 'success') {
-        setSummary(summaryData.summary);
-        console.log('Summary data:', summaryData.summary);
+        setSummary(summaryData.data);
       }
 
-      // Fetch transactions
-      const transRes = await fetch('http://localhost:5000/api/transactions?limit=1000');
-      const transData = await transRes.json();
-      if (transData.status === 'success') {
-        setTransactions(transData.transactions);
-        console.log('Transactions count:', transData.transactions.length);
+      if (timeseries.status === 'success') {
+        setDailyActivity(timeseries.data.points);
       }
 
-      // Fetch budgets
-      const budgetRes = await fetch('http://localhost:5000/api/budgets');
-      const budgetData = await budgetRes.json();
       if (budgetData.status === 'success') {
-        setBudgets(budgetData.budgets);
-        console.log('Budgets:', budgetData.budgets);
+        setBudgets(budgetData.data);
       }
 
-      // Fetch monthly spending chart data
-      const spendingRes = await fetch('http://localhost:5000/api/archives/monthly-spending?months=6');
-      const spendingData = await spendingRes.json();
       if (spendingData.status === 'success') {
         const formatted = spendingData.data.map(month => {
           // Use archive name if available, otherwise format from month_year
@@ -202,14 +205,10 @@ const Reports = () => {
 
   // Calculate Transaction Consistency Score (0-100)
   const calculateConsistencyScore = () => {
-    if (transactions.length === 0) return { score: 0, rating: 'N/A' };
-
-    // Get last 30 days
-    const thirtyDaysAgo = new Date();
-    thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
+    if (summary.total_income === 0 && summary.total_expenses === 0) return { score: 0, rating: 'N/A' };
 
-    const recentTransactions = transactions.filter(t => new Date(t.date) >= thirtyDaysAgo);
-    const daysWithTransactions = new Set(recentTransactions.map(t => t.date.split('T')[0])).size;
+    // Days in the last 30 with at least one transaction
+    const daysWithTransactions = dailyActivity.filter(day => day.count > 0).length;
     
     const consistencyRate = (daysWithTransactions / 30) * 100;
     let score = 0;
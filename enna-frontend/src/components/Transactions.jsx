@@ -1,7 +1,11 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import './Transactions.css';
 import CSVImportModal from './CSVImportModal';
 
+// Wait for a pause in typing before searching
+const SEARCH_DELAY_MS = 250;
+const SEARCH_PAGE_SIZE = 100;
+
 function Transactions() {
   const [transactions, setTransactions] = useState([]);
   const [categories, setCategories] = useState([]);
@@ -15,6 +19,12 @@ function Transactions() {
   const [filter, setFilter] = useState('all'); // 'all', 'income', 'expense'
   const [sortBy, setSortBy] = useState('date'); // 'date', 'amount'
   const [groupBy, setGroupBy] = useState('date'); // 'date' or 'category'
+  const [searchTerm, setSearchTerm] = useState('');
+  const [searchResults, setSearchResults] = useState(null); // null when not searching
+  const [searchCursor, setSearchCursor] = useState(null);
+  const [searching, setSearching] = useState(false);
+  // Only the latest search may update the results
+  const searchRequest = useRef(0);
   
   // Form state
   const [formData, setFormData] = useState({
@@ -48,6 +58,8 @@ function Transactions() {
       
       if (data.status === 'success') {
         setTransactions(data.transactions);
+        // Edits and deletes change the search results too
+        if (searchTerm.trim()) searchTransactions();
       }
     } catch (error) {
       console.error('Failed to fetch transactions:', error);
@@ -56,6 +68,40 @@ function Transactions() {
     }
   };
 
+  // Search the whole history on the server instead of the loaded page
+  useEffect(() => {
+    if (!searchTerm.trim()) {
+      searchRequest.current += 1;
+      setSearchResults(null);
+      setSearchCursor(null);
+      return;
+    }
+    const timer = setTimeout(() => searchTransactions(), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filter]);
+
+  const searchTransactions = async (cursor = null) => {
+    const request = ++searchRequest.current;
+    const params = new URLSearchParams({ q: searchTerm.trim(), sort: 'date', limit: SEARCH_PAGE_SIZE });
+    if (filter !== 'all') params.set('type', filter);
+    if (cursor) params.set('cursor', cursor);
+
+    try {
+      setSearching(true);
+      const response = await fetch(`http://localhost:5000/api/transactions/search?${params}`);
+      const data = await response.json();
+
+      if (request === searchRequest.current && data.status === 'success') {
+        setSearchResults(prev => (cursor && prev ? [...prev, ...data.transactions] : data.transactions));
+        setSearchCursor(data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Failed to search transactions:', error);
+    } finally {
+      if (request === searchRequest.current) setSearching(false);
+    }
+  };
+
   const fetchCategories = async () => {
     try {
       const response = await fetch('http://localhost:5000/api/categories');
@@ -71,26 +117,25 @@ function Transactions() {
 
   const handleCSVImport = async (importedTransactions) => {
     try {
-      // Bulk import transactions
-      const promises = importedTransactions.map(transaction =>
-        fetch('http://localhost:5000/api/transactions', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify(transaction),
-        })
-      );
-
-      const responses = await Promise.all(promises);
-      const results = await Promise.all(responses.map(r => r.json()));
-      
-      const successCount = results.filter(r => r.status === 'success').length;
-      const failCount = results.length - successCount;
+      // Bulk import transactions in a single request
+      const response = await fetch('http://localhost:5000/api/transactions/bulk', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ transactions: importedTransactions }),
+      });
+      const data = await response.json();
+
+      const successCount = data.status === 'success' ? data.inserted : 0;
+      const duplicateCount = data.status === 'success' ? data.duplicates : 0;
+      const failCount = importedTransactions.length - successCount - duplicateCount;
 
       if (successCount > 0) {
-        alert(`Successfully imported ${successCount} transaction${successCount !== 1 ? 's' : ''}${failCount > 0 ? ` (${failCount} failed)` : ''}!`);
+        alert(`Successfully imported ${successCount} transaction${successCount !== 1 ? 's' : ''}${duplicateCount > 0 ? ` (${duplicateCount} already imported)` : ''}${failCount > 0 ? ` (${failCount} failed)` : ''}!`);
         fetchTransactions();
+      } else if (duplicateCount > 0) {
+        alert(`All ${duplicateCount} transaction${duplicateCount !== 1 ? 's were' : ' was'} already imported.`);
       } else {
         alert('Failed to import transactions. Please try again.');
       }
@@ -228,7 +273,7 @@ function Transactions() {
 
   // Filter and sort transactions
   const getFilteredAndSortedTransactions = () => {
-    let filtered = [...transactions];
+    let filtered = [...(searchResults ?? transactions)];
 
     // Apply filter
     if (filter !== 'all') {
@@ -373,6 +418,16 @@ function Transactions() {
           </div>
         </div>
 
+        <div className="search-group">
+          <input
+            type="search"
+            className="search-input"
+            placeholder="Search all transactions..."
+            value={searchTerm}
+            onChange={(e) => setSearchTerm(e.target.value)}
+          />
+        </div>
+
         <div className="sort-group">
           <label>Sort by:</label>
           <select 
@@ -459,6 +514,21 @@ function Transactions() {
               ))}
             </div>
           ))}
+          {searchResults !== null && searchResults.length === 0 && !searching && (
+            <div className="empty-state">
+              <div className="empty-icon">🔍</div>
+              <h3>No matching transactions</h3>
+            </div>
+          )}
+          {searchResults !== null && searchCursor && (
+            <button
+              className="load-more-btn"
+              onClick={() => searchTransactions(searchCursor)}
+              disabled={searching}
+            >
+              {searching ? 'Searching...' : 'Load more'}
+            </button>
+          )}
         </div>
       )}
 